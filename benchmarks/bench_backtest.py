@@ -0,0 +1,60 @@
+"""Backtest throughput: a decade of synthetic races (~35k) replayed through the box strategy.
+
+The fixture is generated once into a temporary directory (not timed), split into one file per year.
+
+Usage
+-----
+python benchmarks/bench_backtest.py --races 35000 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from itertools import groupby
+from pathlib import Path
+
+from keiba_scraping.backtest.engine import run_backtest
+from keiba_scraping.backtest.history import write_history
+from keiba_scraping.backtest.strategy import BoxStrategy
+from keiba_scraping.backtest.synthetic import synthetic_history
+
+
+def run(races: int, workers: int, select: int) -> dict[str, float]:
+    out: dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        paths = []
+        for year, group in groupby(synthetic_history(races), key=lambda r: r.date // 10000):
+            path = Path(tmp) / f"{year}.ndjson.gz"
+            write_history(path, group)
+            paths.append(path)
+        out["fixture_sec"] = time.perf_counter() - t0
+
+        strategy = BoxStrategy(select=select)
+        for w in sorted({1, workers}):
+            report = run_backtest(paths, strategy, workers=w)
+            out[f"workers_{w}_sec"] = report.elapsed_sec
+            out[f"workers_{w}_races_per_s"] = report.races_per_sec
+        out["roi"] = report.total.roi
+        out["files"] = len(paths)
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--races", type=int, default=35_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--select", type=int, default=5)
+    args = parser.parse_args()
+
+    r = run(args.races, args.workers, args.select)
+    print(f"races={args.races:,} files={r['files']} (fixture {r['fixture_sec']:.1f}s) roi={r['roi']:.1%}")
+    for w in sorted({1, args.workers}):
+        print(f"workers={w:<2}: {r[f'workers_{w}_sec']:7.2f}s {r[f'workers_{w}_races_per_s']:10,.0f} races/s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
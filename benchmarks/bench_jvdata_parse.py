@@ -0,0 +1,67 @@
+"""Records/sec of the JV-Data parser: per-record parse vs bulk NumPy decode.
+
+Usage
+-----
+python benchmarks/bench_jvdata_parse.py --records 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from keiba_scraping.jvdata.layouts import get_layout
+from keiba_scraping.jvdata.parser import decode_bulk, parse_record
+
+
+def synthetic_se(n: int) -> bytes:
+    layout = get_layout("SE")
+    base = []
+    for i in range(min(n, 1000)):
+        base.append(layout.pack({
+            "data_kubun": "7", "year": "2024", "month_day": f"{i // 36 % 12 + 1:02d}05",
+            "jyo_cd": f"{i % 10 + 1:02d}", "kaiji": 1, "nichiji": 1, "race_num": i % 12 + 1,
+            "wakuban": i % 8 + 1, "umaban": i % 18 + 1, "ketto_num": f"2020{i:06d}",
+            "bamei": f"シンセティック{i % 100}", "futan": 55 + i % 4, "ba_taijyu": 440 + i % 60,
+            "odds": 1.5 + i % 90, "ninki": i % 18 + 1, "ijyo_cd": "0",
+        }))
+    blob = b"".join(base)
+    reps, rest = divmod(n, len(base))
+    return blob * reps + b"".join(base[:rest])
+
+
+def run(n: int) -> dict[str, float]:
+    buf = synthetic_se(n)
+    length = get_layout("SE").length
+
+    t0 = time.perf_counter()
+    total = 0.0
+    for off in range(0, len(buf), length):
+        rec = parse_record(buf[off : off + length])
+        total += rec["umaban"] + rec["odds"]  # type: ignore[operator]
+    per_record = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    cols = decode_bulk(buf, "SE")
+    total_bulk = float(cols["umaban"].sum() + cols["odds"].sum())  # type: ignore[union-attr]
+    _ = cols.race_id
+    bulk = time.perf_counter() - t0
+
+    assert abs(total - total_bulk) < 1e-6 * max(1.0, abs(total))
+    return {"records": n, "per_record_rps": n / per_record, "bulk_rps": n / bulk}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=100_000)
+    args = parser.parse_args()
+
+    r = run(args.records)
+    print(f"SE records: {r['records']:,}")
+    print(f"per-record parse : {r['per_record_rps']:>14,.0f} records/s")
+    print(f"bulk decode      : {r['bulk_rps']:>14,.0f} records/s  (x{r['bulk_rps'] / r['per_record_rps']:.0f})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,86 @@
+"""Simultaneous Kelly solver: one 18-horse race with every trio ticket, and a 12-race day on one bankroll.
+
+Also prints the total stake single-bet Kelly (each ticket staked on its own) would put on the same race.
+
+Usage
+-----
+python benchmarks/bench_kelly.py --repeat 5 --day-races 12 --samples 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from keiba_scraping.domain.models import HorseEntry, RaceCard
+from keiba_scraping.logic.kelly import kelly_combos, kelly_day
+from keiba_scraping.logic.trifecta_box import make_trifecta_box
+
+
+def synthetic_race(rng: np.random.Generator, race_id: str, horses: int = 18) -> RaceCard:
+    return RaceCard(race_id, [HorseEntry(f"H{i:02d}", f"Horse{i:02d}", float(p))
+                              for i, p in enumerate(rng.uniform(0.05, 0.7, horses))])
+
+
+def trio_market(rng: np.random.Generator, race: RaceCard, top_k: int | None = None) -> tuple[list, np.ndarray]:
+    combos = make_trifecta_box(race.horses, top_k=top_k, scoring="harville")
+    # 控除率 25% の公正オッズに市場の歪みを乗せる
+    odds = 0.75 / np.array([c.score for c in combos]) * rng.lognormal(0, 0.3, len(combos))
+    return combos, odds
+
+
+def run(repeat: int, day_races: int, samples: int) -> dict[str, float]:
+    rng = np.random.default_rng(0)
+    race = synthetic_race(rng, "R")
+    combos, odds = trio_market(rng, race)
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = kelly_combos(race, combos, odds)
+    race_ms = (time.perf_counter() - t0) / repeat * 1000
+    p = np.array([c.score for c in combos])
+    single = np.clip((p * odds - 1) / (odds - 1), 0, None)
+
+    day = [synthetic_race(rng, f"R{r:02d}") for r in range(day_races)]
+    markets = [trio_market(rng, r, top_k=100) for r in day]
+    tickets = [{"trio": [c.horse_ids for c in combos]} for combos, _ in markets]
+    prices = [{"trio": o} for _, o in markets]
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        results = kelly_day(day, tickets, prices, fraction=0.5, max_total=0.3, n_samples=samples)
+    day_ms = (time.perf_counter() - t0) / repeat * 1000
+
+    return {
+        "race_tickets": len(combos),
+        "race_ms": race_ms,
+        "race_iterations": result.iterations,
+        "joint_total": result.total,
+        "joint_bets": int(np.count_nonzero(result.fractions)),
+        "single_total": float(single.sum()),
+        "day_tickets": sum(len(o) for _, o in markets),
+        "day_ms": day_ms,
+        "day_total": sum(r.total for r in results),
+        "day_converged": all(r.converged for r in results),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--day-races", type=int, default=12)
+    parser.add_argument("--samples", type=int, default=20_000)
+    args = parser.parse_args()
+
+    r = run(args.repeat, args.day_races, args.samples)
+    print(f"1 race, {r['race_tickets']} trio tickets : {r['race_ms']:8.1f} ms ({r['race_iterations']} iterations)")
+    print(f"  joint Kelly stake        : {r['joint_total']:.2%} of bankroll on {r['joint_bets']} tickets")
+    print(f"  sum of single-bet Kelly  : {r['single_total']:.2%} of bankroll")
+    print(f"{args.day_races} races, {r['day_tickets']} tickets, {args.samples:,} samples : {r['day_ms']:8.1f} ms "
+          f"(stake {r['day_total']:.2%}, converged={r['day_converged']})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,132 @@
+"""Memory and scan speed of a season of runners: list[RaceCard] vs the columnar RaceBatch.
+
+Horse ids and names are drawn from a pool of distinct horses (a horse runs several times a season) and are
+built as fresh strings per card, as the parsers do. "legacy" is the pre-slots dataclass layout.
+
+Usage
+-----
+python benchmarks/bench_race_batch.py --runners 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from keiba_scraping.domain.batch import RaceBatch
+from keiba_scraping.domain.models import HorseEntry, RaceCard
+
+
+@dataclass(frozen=True)
+class _LegacyHorse:
+    horse_id: str
+    name: str
+    p_top3: float
+
+
+@dataclass(frozen=True)
+class _LegacyCard:
+    race_id: str
+    horses: list[_LegacyHorse]
+
+
+def _rows(runners: int, pool: int) -> list[tuple[str, list[tuple[int, float]]]]:
+    rng = np.random.default_rng(0)
+    rows = []
+    made = 0
+    while made < runners:
+        n = min(int(rng.integers(8, 19)), runners - made)
+        horses = rng.choice(pool, size=n, replace=False)
+        rows.append((f"R{len(rows):06d}", list(zip(horses.tolist(), rng.uniform(0.05, 0.7, n).tolist()))))
+        made += n
+    return rows
+
+
+def _measure(build: Callable[[], Any]) -> tuple[Any, int, float]:
+    """(結果, 残ったメモリ（バイト）, 秒)"""
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    obj = build()
+    elapsed = time.perf_counter() - t0
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, size, elapsed
+
+
+def _scan_cards(cards: list) -> float:
+    # レースごとの p_top3 合計の最大（各馬を 1 回ずつ読むだけの処理）
+    return max(sum(h.p_top3 for h in c.horses) for c in cards)
+
+
+def _scan_batch(batch: RaceBatch) -> float:
+    return float(np.add.reduceat(batch.p_top3, batch.offsets[:-1]).max())
+
+
+def _time(fn: Callable[[], Any], repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(runners: int, pool: int) -> dict[str, float]:
+    rows = _rows(runners, pool)
+
+    legacy, legacy_bytes, _ = _measure(lambda: [
+        _LegacyCard(rid, [_LegacyHorse(f"{h:010d}", f"Horse{h:05d}", p) for h, p in horses]) for rid, horses in rows
+    ])
+    cards, card_bytes, _ = _measure(lambda: [
+        RaceCard(rid, [HorseEntry(f"{h:010d}", f"Horse{h:05d}", p) for h, p in horses]) for rid, horses in rows
+    ])
+    batch, batch_bytes, from_cards_sec = _measure(lambda: RaceBatch.from_cards(cards))
+
+    t0 = time.perf_counter()
+    back = batch.to_cards()
+    to_cards_sec = time.perf_counter() - t0
+    assert back == cards
+
+    return {
+        "races": len(rows),
+        "runners": batch.runners,
+        "distinct_horses": len(batch.horse_table),
+        "legacy_mb": legacy_bytes / 2**20,
+        "cards_mb": card_bytes / 2**20,
+        "batch_mb": batch_bytes / 2**20,
+        "from_cards_sec": from_cards_sec,
+        "to_cards_sec": to_cards_sec,
+        "scan_legacy_ms": _time(lambda: _scan_cards(legacy)) * 1000,
+        "scan_cards_ms": _time(lambda: _scan_cards(cards)) * 1000,
+        "scan_views_ms": _time(lambda: _scan_cards(batch)) * 1000,
+        "scan_batch_ms": _time(lambda: _scan_batch(batch)) * 1000,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runners", type=int, default=50_000)
+    parser.add_argument("--pool", type=int, default=12_000, help="Distinct horses the runners are drawn from.")
+    args = parser.parse_args()
+
+    r = run(args.runners, args.pool)
+    print(f"races={r['races']:,} runners={r['runners']:,} distinct horses={r['distinct_horses']:,}")
+    print(f"memory: legacy {r['legacy_mb']:.1f} MB, RaceCard(slots) {r['cards_mb']:.1f} MB, "
+          f"RaceBatch {r['batch_mb']:.1f} MB ({r['legacy_mb'] / r['batch_mb']:.0f}x smaller than legacy)")
+    print(f"convert: from_cards {r['from_cards_sec'] * 1000:.0f} ms, to_cards {r['to_cards_sec'] * 1000:.0f} ms")
+    print(f"scan (max per-race sum of p_top3): legacy {r['scan_legacy_ms']:.1f} ms, "
+          f"RaceCard {r['scan_cards_ms']:.1f} ms, views {r['scan_views_ms']:.1f} ms, "
+          f"columns {r['scan_batch_ms']:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
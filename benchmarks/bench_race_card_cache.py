@@ -0,0 +1,83 @@
+"""get_race_card throughput with and without CachedRaceCardSource (offline, stub source).
+
+The stub answers instantly, so --latency-ms adds a sleep per fetch to stand in
+for a DataLab/JV-Link round trip.
+
+Usage
+-----
+python benchmarks/bench_race_card_cache.py --lookups 20000 --races 500 --latency-ms 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from keiba_scraping.data.cache import CachedRaceCardSource
+from keiba_scraping.data.stub_source import StubRaceCardSource
+from keiba_scraping.domain.models import RaceCard
+
+
+class SlowStubRaceCardSource(StubRaceCardSource):
+    def __init__(self, latency_sec: float):
+        self.latency_sec = latency_sec
+
+    def get_race_card(self, race_id: str) -> RaceCard:
+        time.sleep(self.latency_sec)
+        return super().get_race_card(race_id)
+
+
+def _lookups(n: int, races: int) -> list[str]:
+    # 人気レースほどよく引かれる（Zipf 風）
+    rng = np.random.default_rng(0)
+    return [f"R{int(i) % races:05d}" for i in rng.zipf(1.3, n)]
+
+
+def run(lookups: int, races: int, latency_ms: float, max_entries: int) -> dict[str, object]:
+    keys = _lookups(lookups, races)
+    inner = SlowStubRaceCardSource(latency_ms / 1000)
+
+    uncached = keys[: max(1, lookups // 20)]
+    t0 = time.perf_counter()
+    for k in uncached:
+        inner.get_race_card(k)
+    bare = len(uncached) / (time.perf_counter() - t0)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cold = CachedRaceCardSource(inner, max_entries=max_entries, cache_dir=cache_dir)
+        t0 = time.perf_counter()
+        for k in keys:
+            cold.get_race_card(k)
+        cold_rps = lookups / (time.perf_counter() - t0)
+
+        # 別プロセス相当: メモリは空、ディスクは温まっている
+        warm = CachedRaceCardSource(inner, max_entries=max_entries, cache_dir=cache_dir)
+        t0 = time.perf_counter()
+        for k in keys:
+            warm.get_race_card(k)
+        warm_rps = lookups / (time.perf_counter() - t0)
+
+    return {"bare_rps": bare, "cold_rps": cold_rps, "warm_disk_rps": warm_rps,
+            "cold_stats": cold.stats.to_dict(), "warm_stats": warm.stats.to_dict()}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--races", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--max-entries", type=int, default=128)
+    args = parser.parse_args()
+
+    r = run(args.lookups, args.races, args.latency_ms, args.max_entries)
+    print(f"no cache            : {r['bare_rps']:>12,.0f} lookups/s")
+    print(f"cache (cold disk)   : {r['cold_rps']:>12,.0f} lookups/s  {r['cold_stats']}")
+    print(f"cache (warm disk)   : {r['warm_disk_rps']:>12,.0f} lookups/s  {r['warm_stats']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
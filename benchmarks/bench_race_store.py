@@ -0,0 +1,77 @@
+"""Lookups/sec of the local RaceStore (sorted race_id index + memmap columns).
+
+Usage
+-----
+python benchmarks/bench_race_store.py --races 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from keiba_scraping.jvdata.parser import decode_bulk
+from keiba_scraping.store.race_store import RaceStore
+from keiba_scraping.store.source import StoreRaceCardSource
+
+from bench_jvdata_parse import synthetic_se
+
+
+def run(n_races: int, lookups: int = 20_000) -> dict[str, float]:
+    runners = 14
+    se = decode_bulk(synthetic_se(n_races * runners), "SE")
+    # synthetic_se のレースキーは重複するので、行ごとに一意な race_id へ書き換える
+    ids = np.array([f"{2000 + i // 3456:04d}{i // 288 % 12 + 1:02d}{i // 12 % 24 + 1:02d}060101{i % 12 + 1:02d}"
+                    for i in range(n_races)], dtype="S16")
+    u8 = np.array(se.records).view(np.uint8).reshape(len(se), -1)
+    u8[:, 11:27] = np.repeat(ids, runners).view(np.uint8).reshape(-1, 16)
+    u8[:, 28:30] = np.frombuffer(b"".join(f"{i % runners + 1:02d}".encode() for i in range(runners)), np.uint8).reshape(
+        runners, 2
+    )[np.arange(len(se)) % runners]
+    se = decode_bulk(u8.tobytes(), "SE")
+
+    with tempfile.TemporaryDirectory() as root:
+        store = RaceStore(root)
+        t0 = time.perf_counter()
+        store.ingest(se)
+        ingest = time.perf_counter() - t0
+
+        source = StoreRaceCardSource(store_dir=root)
+        rng = np.random.default_rng(0)
+        picks = [ids[i].decode() for i in rng.integers(0, n_races, lookups)]
+        t0 = time.perf_counter()
+        for race_id in picks:
+            source.store.get_race(race_id)
+        raw = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for race_id in picks[: lookups // 10]:
+            source.get_race_card(race_id)
+        cards = time.perf_counter() - t0
+        del source, store
+
+    return {
+        "races": n_races,
+        "ingest_rps": n_races / ingest,
+        "get_race_per_s": lookups / raw,
+        "race_card_per_s": (lookups // 10) / cards,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--races", type=int, default=50_000)
+    args = parser.parse_args()
+
+    r = run(args.races)
+    print(f"races: {r['races']:,}")
+    print(f"ingest          : {r['ingest_rps']:>12,.0f} races/s")
+    print(f"get_race        : {r['get_race_per_s']:>12,.0f} lookups/s")
+    print(f"get_race_card   : {r['race_card_per_s']:>12,.0f} cards/s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
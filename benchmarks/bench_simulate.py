@@ -0,0 +1,61 @@
+"""Monte Carlo simulator throughput: samples/s per race and races/s across worker processes.
+
+Usage
+-----
+python benchmarks/bench_simulate.py --races 64 --samples 200000 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from keiba_scraping.domain.models import HorseEntry, RaceCard
+from keiba_scraping.logic.simulate import SimulationConfig, combo_tickets, simulate_races
+from keiba_scraping.logic.trifecta_box import make_trifecta_box
+
+
+def synthetic_races(n: int, horses: int = 18) -> list[RaceCard]:
+    rng = np.random.default_rng(0)
+    return [
+        RaceCard(f"R{r:05d}", [HorseEntry(f"H{i:02d}", f"Horse{i:02d}", float(p))
+                               for i, p in enumerate(rng.uniform(0.05, 0.7, horses))])
+        for r in range(n)
+    ]
+
+
+def run(races: int, samples: int, workers: int) -> dict[str, float]:
+    cards = synthetic_races(races)
+    tickets = [combo_tickets(make_trifecta_box(c.horses, top_k=50)) for c in cards]
+    # 収束で止めずに samples 回ちょうど引く
+    config = SimulationConfig(max_samples=samples, tol=0.0)
+
+    out = {}
+    for w in sorted({1, workers}):
+        t0 = time.perf_counter()
+        results = simulate_races(cards, tickets, config, seed=0, workers=w)
+        elapsed = time.perf_counter() - t0
+        out[f"workers_{w}_races_per_s"] = races / elapsed
+        out[f"workers_{w}_samples_per_s"] = sum(r.n_samples for r in results) / elapsed
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--races", type=int, default=64)
+    parser.add_argument("--samples", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    r = run(args.races, args.samples, args.workers)
+    print(f"races={args.races} samples/race={args.samples:,} (18 horses, 50 trio tickets each)")
+    for w in sorted({1, args.workers}):
+        print(f"workers={w:<3}: {r[f'workers_{w}_races_per_s']:>8,.1f} races/s "
+              f"{r[f'workers_{w}_samples_per_s']:>14,.0f} samples/s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,93 @@
+"""Output sink throughput: a season of box predictions (3,456 races x 10 tickets by default) per sink.
+
+"sqlite_row_commit" is the naive baseline (one INSERT + commit per row) the chunked executemany replaces;
+it only writes the first --naive-races races and is scaled to rows/s. "sqlite_upsert_rerun" rewrites every
+race a second time into the same file.
+
+Usage
+-----
+python benchmarks/bench_sinks.py --races 3456
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from keiba_scraping.app.predict import CSV_HEADER, CSV_TYPES
+from keiba_scraping.app.sinks import open_sink
+
+SINKS = ("predictions.csv", "predictions.csv.gz", "predictions.csv.xz", "predictions.ndjson", "predictions.sqlite")
+
+
+def _races(n: int, tickets: int) -> list[tuple[str, list[list[str]]]]:
+    rng = np.random.default_rng(0)
+    out = []
+    for r in range(n):
+        race_id = f"{20240106 + r // 36:08d}{r % 10 + 1:02d}0101{r % 12 + 1:02d}"
+        scores = rng.uniform(0, 0.3, tickets)
+        out.append((race_id, [[race_id, f"Horse{i}", f"Horse{i + 1}", f"Horse{i + 2}", f"{s:.6f}"]
+                              for i, s in enumerate(scores)]))
+    return out
+
+
+def _write(path: Path, races: list[tuple[str, list[list[str]]]], mode: str | None = None) -> float:
+    t0 = time.perf_counter()
+    with open_sink(path, CSV_HEADER, mode, types=CSV_TYPES) as sink:
+        for race_id, rows in races:
+            sink.write_race(race_id, rows)
+    return time.perf_counter() - t0
+
+
+def _naive(path: Path, races: list[tuple[str, list[list[str]]]]) -> float:
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE predictions (race_id TEXT, horse1 TEXT, horse2 TEXT, horse3 TEXT, score REAL)")
+    t0 = time.perf_counter()
+    for _, rows in races:
+        for row in rows:
+            conn.execute("INSERT INTO predictions VALUES (?, ?, ?, ?, ?)", row)
+            conn.commit()
+    elapsed = time.perf_counter() - t0
+    conn.close()
+    return elapsed
+
+
+def run(races: int, tickets: int, naive_races: int) -> dict[str, dict[str, float]]:
+    data = _races(races, tickets)
+    n_rows = races * tickets
+    out: dict[str, dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in SINKS:
+            path = Path(tmp) / name
+            sec = _write(path, data)
+            out[name] = {"sec": sec, "rows_per_s": n_rows / sec, "mb": path.stat().st_size / 2**20}
+        path = Path(tmp) / "predictions.sqlite"
+        sec = _write(path, data)
+        out["sqlite_upsert_rerun"] = {"sec": sec, "rows_per_s": n_rows / sec, "mb": path.stat().st_size / 2**20}
+        naive = data[:naive_races]
+        sec = _naive(Path(tmp) / "naive.sqlite", naive)
+        out["sqlite_row_commit"] = {"sec": sec, "rows_per_s": len(naive) * tickets / sec, "mb": float("nan")}
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--races", type=int, default=3_456, help="Default: a JRA season (288 days x 12 races).")
+    parser.add_argument("--tickets", type=int, default=10)
+    parser.add_argument("--naive-races", type=int, default=50)
+    args = parser.parse_args()
+
+    r = run(args.races, args.tickets, args.naive_races)
+    print(f"races={args.races:,} rows={args.races * args.tickets:,}")
+    for name, m in r.items():
+        print(f"{name:<22} {m['sec']:7.3f}s {m['rows_per_s']:12,.0f} rows/s {m['mb']:8.2f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,71 @@
+"""Trio box scaling from 5 to 18 horses: per-combo objects + full sort vs the vectorized engine.
+
+Usage
+-----
+python benchmarks/bench_trifecta_box.py --repeat 2000 --top-k 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import time
+from math import comb
+
+import numpy as np
+
+from keiba_scraping.domain.models import HorseEntry
+from keiba_scraping.logic.trifecta_box import TrifectaCombo, make_trifecta_box, score_trifecta_box
+
+
+def _legacy_box(horses: list[HorseEntry]) -> list[TrifectaCombo]:
+    # 以前の実装（組合せごとに TrifectaCombo を作って全件ソート）
+    combos = [
+        TrifectaCombo((a.horse_id, b.horse_id, c.horse_id), (a.name, b.name, c.name), a.p_top3 * b.p_top3 * c.p_top3)
+        for a, b, c in itertools.combinations(horses, 3)
+    ]
+    combos.sort(key=lambda x: x.score, reverse=True)
+    return combos
+
+
+def _per_sec(fn, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return repeat / (time.perf_counter() - t0)
+
+
+def run(repeat: int, top_k: int) -> list[dict[str, float]]:
+    rng = np.random.default_rng(0)
+    rows = []
+    for n in (5, 8, 10, 12, 14, 16, 18):
+        p = rng.uniform(0.05, 0.7, n)
+        horses = [HorseEntry(f"H{i:02d}", f"Horse{i:02d}", float(x)) for i, x in enumerate(p)]
+        rows.append({
+            "horses": n,
+            "tickets": comb(n, 3),
+            "legacy_per_s": _per_sec(lambda: _legacy_box(horses), repeat),
+            "objects_per_s": _per_sec(lambda: make_trifecta_box(horses), repeat),
+            "arrays_per_s": _per_sec(lambda: score_trifecta_box(p), repeat),
+            "top_k_per_s": _per_sec(lambda: score_trifecta_box(p, top_k), repeat),
+        })
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'horses':>6} {'tickets':>7} {'legacy':>10} {'objects':>10} {'arrays':>10} {'top-' + str(args.top_k):>10}  (boxes/s)")
+    for r in run(args.repeat, args.top_k):
+        print(
+            f"{r['horses']:>6} {r['tickets']:>7} {r['legacy_per_s']:>10,.0f} {r['objects_per_s']:>10,.0f}"
+            f" {r['arrays_per_s']:>10,.0f} {r['top_k_per_s']:>10,.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
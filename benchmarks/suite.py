@@ -0,0 +1,324 @@
+"""Benchmark suite: times the hot paths at several scales, saves JSON, and compares against a baseline.
+
+Cases (all offline: stub source, fake_bridge.py, temporary files):
+  trifecta_box    make_trifecta_box for 5-18 horse fields
+  run_prediction  stub source end to end (1 race via run_prediction, more via run_batch with one worker)
+  bridge_run      jvread_via_bridge.run_bridge against fake_bridge.py (spawn + JSON parse)
+  bridge_drain    jvread_via_bridge.iter_bridge drain output parsing, 1k-100k records
+  csv_write       prediction CSV rows (10 combos per race) for 1-100k races
+
+Usage
+-----
+python benchmarks/suite.py run                                  # quick scales -> benchmarks/results/<time>.json
+python benchmarks/suite.py run --scale full --out baseline.json
+python benchmarks/suite.py run --only trifecta_box csv_write --compare baseline.json
+python benchmarks/suite.py compare baseline.json benchmarks/results/20240101T000000.json --threshold 0.15
+
+compare (and run --compare) exit with status 1 when a case is slower than the baseline by more than the threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from keiba_scraping.app.batch import run_batch
+from keiba_scraping.app.predict import CSV_HEADER, combo_rows, run_prediction
+from keiba_scraping.domain.models import HorseEntry
+from keiba_scraping.logic.trifecta_box import make_trifecta_box
+
+_ROOT = Path(__file__).resolve().parent.parent
+_TOOLS = _ROOT / "tools" / "jvlink32"
+_RESULTS = Path(__file__).resolve().parent / "results"
+
+SUITE_VERSION = 1
+
+# 規模: quick は 1 分以内、full は依頼どおり 10 万件まで
+SCALES: dict[str, dict[str, list[int]]] = {
+    "quick": {
+        "trifecta_box": [5, 8, 12, 18],
+        "run_prediction": [1, 100, 1_000],
+        "bridge_run": [1],
+        "bridge_drain": [1_000, 10_000],
+        "csv_write": [1, 1_000, 10_000],
+    },
+    "full": {
+        "trifecta_box": [5, 8, 10, 12, 14, 16, 18],
+        "run_prediction": [1, 100, 1_000, 10_000, 100_000],
+        "bridge_run": [1],
+        "bridge_drain": [1_000, 10_000, 100_000],
+        "csv_write": [1, 100, 1_000, 10_000, 100_000],
+    },
+}
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    # 規模の名前と値（"horses" / "races" / "records"）
+    param: str
+    size: int
+    # 1 回の計測で処理する単位の名前と数（per_unit_sec の分母）
+    unit: str
+    units: int
+    # 準備（計測しない）をして、計測する関数を返す。一時ファイルは run() の一時ディレクトリに置く
+    setup: Callable[[], Callable[[], object]]
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}[{self.param}={self.size}]"
+
+
+@dataclass
+class Timing:
+    samples: list[float] = field(default_factory=list)
+
+    def to_dict(self, units: int) -> dict[str, float]:
+        median = statistics.median(self.samples)
+        return {
+            "n": len(self.samples),
+            "min_sec": min(self.samples),
+            "median_sec": median,
+            "mean_sec": statistics.fmean(self.samples),
+            "stdev_sec": statistics.stdev(self.samples) if len(self.samples) > 1 else 0.0,
+            "units": units,
+            "per_unit_sec": median / units,
+        }
+
+
+# ── cases ────────────────────────────────────────────────────────────────────
+
+
+def _horses(n: int) -> list[HorseEntry]:
+    rng = np.random.default_rng(n)
+    return [HorseEntry(f"H{i:02d}", f"Horse{i:02d}", float(p)) for i, p in enumerate(rng.uniform(0.05, 0.7, n))]
+
+
+def _trifecta_box(horses: int, tmp: Path) -> Callable[[], object]:
+    entries = _horses(horses)
+    return lambda: make_trifecta_box(entries)
+
+
+def _run_prediction(races: int, tmp: Path) -> Callable[[], object]:
+    out = str(tmp / "predictions.csv")
+    if races == 1:
+        return lambda: run_prediction("2024010605010101", select=5, out_path=out, source="stub")
+    race_ids = [f"2024010605{i // 12:04d}{i % 12 + 1:02d}" for i in range(races)]
+    return lambda: run_batch(race_ids, select=5, out_path=out, source="stub", workers=1)
+
+
+def _bridge_env(records: int) -> dict[str, str]:
+    files = max(1, records // 1000)
+    return {
+        "JVLINK_BRIDGE_EXE": str(_TOOLS / "fake_bridge.py"),
+        "FAKE_BRIDGE_FILES": str(files),
+        "FAKE_BRIDGE_RECORDS_PER_FILE": str(records // files),
+        "FAKE_BRIDGE_FILE_TYPES": "RA,SE",
+    }
+
+
+def _bridge_module():
+    if str(_TOOLS) not in sys.path:
+        sys.path.insert(0, str(_TOOLS))
+    import jvread_via_bridge
+
+    return jvread_via_bridge
+
+
+def _bridge_run(records: int, tmp: Path) -> Callable[[], object]:
+    bridge = _bridge_module()
+    env = _bridge_env(records)
+    # _find_bridge() は extra_env ではなくこのプロセスの環境変数を見る
+    os.environ["JVLINK_BRIDGE_EXE"] = env["JVLINK_BRIDGE_EXE"]
+    return lambda: bridge.run_bridge("RACE", "20240101000000", "1", extra_env=env)
+
+
+def _bridge_drain(records: int, tmp: Path) -> Callable[[], object]:
+    bridge = _bridge_module()
+    env = _bridge_env(records)
+    os.environ["JVLINK_BRIDGE_EXE"] = env["JVLINK_BRIDGE_EXE"]
+
+    def drain() -> int:
+        n = sum(1 for e in bridge.iter_bridge("RACE", "20240101000000", "1", extra_env=env) if e["type"] == "record")
+        assert n == records, f"drained {n} of {records} records"
+        return n
+
+    return drain
+
+
+def _csv_write(races: int, tmp: Path) -> Callable[[], object]:
+    combos = make_trifecta_box(_horses(5))
+    rows = [combo_rows(f"2024010605{i // 12:04d}{i % 12 + 1:02d}", combos) for i in range(races)]
+    out = tmp / "rows.csv"
+
+    def write() -> None:
+        with open(out, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(CSV_HEADER)
+            for r in rows:
+                w.writerows(r)
+
+    return write
+
+
+# ケース名 -> (規模の名前, 単位, 単位が規模と同じ数か, 準備関数)
+CASES: dict[str, tuple[str, str, bool, Callable[[int, Path], Callable[[], object]]]] = {
+    "trifecta_box": ("horses", "box", False, _trifecta_box),
+    "run_prediction": ("races", "race", True, _run_prediction),
+    "bridge_run": ("records", "call", False, _bridge_run),
+    "bridge_drain": ("records", "record", True, _bridge_drain),
+    "csv_write": ("races", "race", True, _csv_write),
+}
+
+
+def iter_cases(scale: str, tmp: Path, only: list[str] | None = None) -> Iterator[Case]:
+    for name, sizes in SCALES[scale].items():
+        if only and name not in only:
+            continue
+        param, unit, per_size, factory = CASES[name]
+        for size in sizes:
+            yield Case(name, param, size, unit, size if per_size else 1, lambda f=factory, s=size: f(s, tmp))
+
+
+# ── run ──────────────────────────────────────────────────────────────────────
+
+
+def measure(fn: Callable[[], object], min_time: float, min_repeat: int, max_repeat: int) -> Timing:
+    """1 回目は捨て（import・キャッシュの温め）、min_time 秒か max_repeat 回まで繰り返す。"""
+    timing = Timing()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+        started = time.perf_counter()
+        while len(timing.samples) < max_repeat:
+            t0 = time.perf_counter()
+            fn()
+            timing.samples.append(time.perf_counter() - t0)
+            if len(timing.samples) >= min_repeat and time.perf_counter() - started >= min_time:
+                break
+    return timing
+
+
+def _git_revision() -> dict[str, object]:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "HEAD"], cwd=_ROOT, capture_output=True, text=True, timeout=10)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=_ROOT,
+                               capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return {}
+    if rev.returncode != 0:
+        return {}
+    return {"commit": rev.stdout.strip(), "dirty": bool(dirty.stdout.strip())}
+
+
+def environment() -> dict[str, object]:
+    return {
+        "suite_version": SUITE_VERSION,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "git": _git_revision(),
+    }
+
+
+def run(scale: str = "quick", only: list[str] | None = None, min_time: float = 0.5, min_repeat: int = 3,
+        max_repeat: int = 1000) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="keiba_bench_") as tmp:
+        for case in iter_cases(scale, Path(tmp), only):
+            timing = measure(case.setup(), min_time, min_repeat, max_repeat)
+            r = results[case.key] = timing.to_dict(case.units)
+            print(f"{case.key:<32} median={r['median_sec'] * 1000:10.3f} ms  {r['per_unit_sec'] * 1e6:12.2f} us/"
+                  f"{case.unit}  (n={r['n']})", flush=True)
+    return {"meta": {**environment(), "scale": scale, "min_time": min_time}, "results": results}
+
+
+# ── compare ──────────────────────────────────────────────────────────────────
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.10) -> list[str]:
+    """中央値の比（今回 / 基準）を表にして、threshold を超えて遅くなったケース名を返す。"""
+    base, cur = baseline["results"], current["results"]
+    for key in ("python", "numpy", "machine", "cpu_count"):
+        a, b = baseline["meta"].get(key), current["meta"].get(key)
+        if a != b:
+            print(f"note: {key} differs (baseline={a}, current={b})")
+
+    regressions = []
+    print(f"{'case':<32} {'baseline ms':>12} {'current ms':>12} {'ratio':>7}")
+    for key in dict.fromkeys([*cur, *base]):  # 今回の実行順、基準にしかないものは最後
+        if key not in cur or key not in base:
+            print(f"{key:<32} {'(only in ' + ('baseline' if key in base else 'current') + ')':>33}")
+            continue
+        b, c = base[key]["median_sec"], cur[key]["median_sec"]
+        ratio = c / b if b > 0 else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{key:<32} {b * 1000:12.3f} {c * 1000:12.3f} {ratio:7.2f}{flag}")
+    print(f"\n{len(regressions)} regression(s) beyond {threshold:.0%}")
+    return regressions
+
+
+def _load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="Run the suite and save the results as JSON.")
+    p_run.add_argument("--scale", default="quick", choices=sorted(SCALES))
+    p_run.add_argument("--only", nargs="+", choices=sorted(CASES), help="Run only these cases.")
+    p_run.add_argument("--min-time", type=float, default=0.5, help="Seconds to spend per case (at least 3 runs).")
+    p_run.add_argument("--out", help="Result JSON (default: benchmarks/results/<UTC time>.json).")
+    p_run.add_argument("--compare", metavar="BASELINE", help="Compare with this result JSON after the run.")
+    p_run.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown ratio (0.10 = 10%%).")
+
+    p_cmp = sub.add_parser("compare", help="Compare two result JSON files.")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+    p_cmp.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown ratio (0.10 = 10%%).")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        return 1 if compare(_load(args.baseline), _load(args.current), args.threshold) else 0
+
+    result = run(args.scale, args.only, args.min_time)
+    out = Path(args.out) if args.out else _RESULTS / f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+    print(f"Saved: {out}")
+    if args.compare:
+        print()
+        return 1 if compare(_load(args.compare), result, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
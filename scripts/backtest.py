@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+
+from keiba_scraping.backtest.engine import BacktestReport, run_backtest
+from keiba_scraping.backtest.history import write_history
+from keiba_scraping.backtest.strategy import load_strategy
+from keiba_scraping.backtest.synthetic import synthetic_history
+
+
+def _print_report(report: BacktestReport) -> None:
+    t = report.total
+    print(f"races={t.races} failed={report.failed} bets={t.bets:,}")
+    print(f"stake={t.stake:,}円 payout={t.payout:,}円 profit={t.profit:+,}円")
+    print(f"回収率={t.roi:.1%} 的中率={t.hit_rate:.1%} (馬券 {t.ticket_hit_rate:.2%}) 最大ドローダウン={t.max_drawdown:,}円")
+    print("\n場  races   stake(円)   回収率  的中率  最大DD(円)")
+    for venue, s in sorted(report.by_venue.items()):
+        print(f"{venue:>2} {s.races:>6} {s.stake:>11,} {s.roi:>8.1%} {s.hit_rate:>7.1%} {s.max_drawdown:>11,}")
+    for race_id, error in report.errors:
+        print(f"error: {race_id or '(unreadable line)'}: {error}")
+    print(f"\nelapsed={report.elapsed_sec:.2f}s ({report.races_per_sec:,.0f} races/sec)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("history", nargs="+", help="History NDJSON files (.gz ok, globs are expanded).")
+    parser.add_argument("--synthetic", type=int, help="Write N synthetic races to the (single) history path first.")
+    parser.add_argument("--strategy", default="box", help="'box' or 'package.module:name' (class or function).")
+    parser.add_argument(
+        "--strategy-arg", action="append", default=[], metavar="KEY=VALUE", help="Option for a custom strategy class."
+    )
+    parser.add_argument("--select", type=int, default=5, help="box: number of horses to box.")
+    parser.add_argument("--top-k", type=int, help="box: keep only the K highest-scoring tickets.")
+    parser.add_argument("--scoring", default="product", choices=["product", "harville"], help="box: ticket score.")
+    parser.add_argument("--stake", type=int, default=100, help="box: stake per ticket in yen.")
+    parser.add_argument("--workers", type=int, default=0, help="Pool size (0 = CPU count, 1 = no pool).")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Races per task sent to a worker.")
+    parser.add_argument("--out", help="Per-race settlement CSV.")
+    parser.add_argument("--report", help="Write the summary as JSON.")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        if len(args.history) != 1:
+            parser.error("--synthetic takes exactly one history path")
+        n = write_history(args.history[0], synthetic_history(args.synthetic))
+        print(f"Wrote {n} synthetic races: {args.history[0]}")
+
+    # cmd.exe はワイルドカードを展開しないのでここで展開する
+    paths = [p for pat in args.history for p in (sorted(glob.glob(pat)) if glob.has_magic(pat) else [pat])]
+    if args.strategy == "box":
+        options = {"select": args.select, "top_k": args.top_k, "scoring": args.scoring, "stake": args.stake}
+    else:
+        options = {}
+        for item in args.strategy_arg:
+            key, sep, value = item.partition("=")
+            if not sep:
+                parser.error(f"--strategy-arg expects KEY=VALUE, got {item!r}")
+            try:
+                options[key] = json.loads(value)
+            except json.JSONDecodeError:
+                options[key] = value
+    strategy = load_strategy(args.strategy, **options)
+
+    report = run_backtest(paths, strategy, workers=args.workers, chunk_size=args.chunk_size, out_path=args.out)
+    _print_report(report)
+    if args.out:
+        print(f"Saved: {args.out}")
+    if args.report:
+        os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, ensure_ascii=False, indent=2)
+        print(f"Saved: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import argparse
+import json
+
+from keiba_scraping.app.daemon import DEFAULT_PORT, DaemonClient, serve
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Resident prediction daemon (HTTP/JSON on localhost or Unix socket).")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("serve", help="Run the daemon until Ctrl+C or 'stop'.")
+    p.add_argument("--source", default="stub", choices=["stub", "datalab", "store"], help="Data source backend.")
+    p.add_argument(
+        "--cache", action=argparse.BooleanOptionalAction, default=True, help="Keep race cards cached (default: on)."
+    )
+    p.add_argument("--host", default="127.0.0.1", help="TCP host (keep it on localhost: there is no auth).")
+    p.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port (0 = any free port).")
+    p.add_argument("--unix", help="Listen on this Unix socket path instead of TCP.")
+    p.add_argument("--verbose", action="store_true", help="Log every request.")
+
+    for name, help_ in (("stats", "Print latency percentiles and cache stats as JSON."), ("stop", "Stop the daemon.")):
+        p = sub.add_parser(name, help=help_)
+        p.add_argument(
+            "--daemon", default=f"http://127.0.0.1:{DEFAULT_PORT}", help="http://HOST:PORT or unix:/path/to/socket."
+        )
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(
+            source=args.source,
+            cache=args.cache,
+            host=args.host,
+            port=args.port,
+            unix_path=args.unix,
+            verbose=args.verbose,
+            ready=lambda address: print(f"listening on {address} (source={args.source})", flush=True),
+        )
+    elif args.command == "stats":
+        print(json.dumps(DaemonClient(args.daemon).stats(), ensure_ascii=False, indent=2))
+    else:
+        DaemonClient(args.daemon).shutdown()
+        print("stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,19 +2,198 @@ from __future__ import annotations
 
 import argparse
 
-from keiba_scraping.app.predict import run_prediction
+from keiba_scraping.app.batch import read_race_ids_file, resolve_race_ids, run_batch
+from keiba_scraping.app.daemon import run_remote_prediction
+from keiba_scraping.app.predict import run_ev_prediction, run_kelly_prediction, run_prediction
+from keiba_scraping.app.sinks import output_root
+from keiba_scraping.data.factory import create_source
+from keiba_scraping.profiling import trace
 
 
 def main() -> None:
     parser = argparse.ArgumentParser()
-    parser.add_argument("--race-id", required=True, help="Race identifier.")
-    parser.add_argument("--select", type=int, default=5, help="Number of horses to box (default=5 -> 10 combos).")
-    parser.add_argument("--out", default="outputs/predictions.csv", help="Output CSV path.")
-    parser.add_argument("--source", default="stub", choices=["stub", "datalab"], help="Data source backend.")
+    parser.add_argument("--race-id", nargs="+", default=[], help="Race identifier(s). More than one runs a batch.")
+    parser.add_argument("--race-ids-file", help="Batch: file with one race id per line.")
+    parser.add_argument("--date-from", type=int, help="Batch: first race date (YYYYMMDD).")
+    parser.add_argument("--date-to", type=int, help="Batch: last race date (YYYYMMDD, inclusive).")
+    parser.add_argument("--workers", type=int, default=0, help="Batch: pool size (0 = CPU count, 1 = no pool).")
+    parser.add_argument(
+        "--executor",
+        default="process",
+        choices=["process", "thread", "async"],
+        help="Batch: process or thread pool, or async fetches (--workers at a time) with boxing in this process.",
+    )
+    parser.add_argument(
+        "--select", type=int, default=5, help="Number of horses to box, 3 up to the full field (default=5 -> 10 combos)."
+    )
+    parser.add_argument("--top-k", type=int, help="Keep only the K highest-scoring tickets (default: all).")
+    parser.add_argument(
+        "--scoring",
+        default="product",
+        choices=["product", "harville"],
+        help="Ticket score: product of p_top3, or the Harville hit probability of the trio.",
+    )
+    parser.add_argument(
+        "--out",
+        default="outputs/predictions.csv",
+        help="Output path: .csv / .ndjson (optionally .gz or .xz) or .sqlite (one queryable file per season).",
+    )
+    parser.add_argument(
+        "--out-mode",
+        choices=["overwrite", "append", "upsert"],
+        help="overwrite (default for files), append, or upsert = replace rows of the same race_id (SQLite default).",
+    )
+    parser.add_argument("--source", default="stub", choices=["stub", "datalab", "store"], help="Data source backend.")
+    parser.add_argument(
+        "--cache", action="store_true", help="Cache race cards in memory and on disk (data/cache or KEIBA_CACHE_DIR)."
+    )
+    parser.add_argument(
+        "--strategy",
+        default="box",
+        choices=["box", "ev", "kelly"],
+        help="box: trio box of the top --select horses. ev: expected-value tickets from --odds-csv. "
+        "kelly: joint Kelly stakes for the --odds-csv tickets (several races share one bankroll).",
+    )
+    parser.add_argument("--odds-csv", help="EV: odds CSV (bet_type,horse1,horse2,horse3,odds[,race_id]).")
+    parser.add_argument("--budget", type=int, default=1000, help="EV: total stake in yen (100-yen units).")
+    parser.add_argument("--max-tickets", type=int, default=10, help="EV: maximum number of tickets.")
+    parser.add_argument(
+        "--max-stake", type=int, help="EV/Kelly: maximum stake per ticket in yen (default: EV budget, no Kelly limit)."
+    )
+    parser.add_argument("--min-ev", type=float, default=1.0, help="EV/Kelly: minimum expected return per yen.")
+    parser.add_argument("--bankroll", type=int, default=100_000, help="Kelly: bankroll in yen.")
+    parser.add_argument("--kelly-fraction", type=float, default=0.5, help="Kelly: fraction of full Kelly (0-1].")
+    parser.add_argument(
+        "--max-exposure", type=float, default=0.2, help="Kelly: maximum total stake as a fraction of the bankroll."
+    )
+    parser.add_argument("--samples", type=int, default=20_000, help="Kelly: joint samples for several races.")
+    parser.add_argument(
+        "--daemon",
+        metavar="ADDRESS",
+        help="Box only: ask a running scripts/daemon.py (http://HOST:PORT or unix:/path) instead of loading a source.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time each stage (with tracemalloc peaks) and write <out>.profile.json and <out>.trace.json "
+        "(Chrome trace). Process-pool batch workers are not traced; use --workers 1, --executor thread or "
+        "--executor async (concurrent fetches are traced separately, but share tracemalloc peaks).",
+    )
     args = parser.parse_args()
 
-    run_prediction(race_id=args.race_id, select=args.select, out_path=args.out, source=args.source)
+    if not args.profile:
+        _run(parser, args)
+        return
+
+    trace.enable(memory=True)
+    try:
+        _run(parser, args)
+    finally:
+        tracer = trace.disable()
+        stem = output_root(args.out)
+        tracer.write_json(f"{stem}.profile.json")
+        tracer.write_chrome_trace(f"{stem}.trace.json")
+        print(f"\n{tracer.format_summary()}")
+        print(f"Saved: {stem}.profile.json, {stem}.trace.json")
+
+
+def _run(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    if args.daemon:
+        if args.strategy != "box" or args.race_ids_file is None and not args.race_id:
+            parser.error("--daemon takes --strategy box with --race-id or --race-ids-file")
+        race_ids = [*args.race_id, *(read_race_ids_file(args.race_ids_file) if args.race_ids_file else [])]
+        run_remote_prediction(
+            args.daemon,
+            list(dict.fromkeys(race_ids)),
+            select=args.select,
+            out_path=args.out,
+            top_k=args.top_k,
+            scoring=args.scoring,
+            out_mode=args.out_mode,
+        )
+        return
+
+    batch = args.race_ids_file or args.date_from or args.date_to or len(args.race_id) > 1
+    if args.strategy == "ev":
+        if batch or not args.race_id or not args.odds_csv:
+            parser.error("--strategy ev takes a single --race-id and --odds-csv")
+        run_ev_prediction(
+            race_id=args.race_id[0],
+            odds_csv=args.odds_csv,
+            out_path=args.out,
+            source=args.source,
+            cache=args.cache,
+            budget=args.budget,
+            max_tickets=args.max_tickets,
+            max_stake_per_ticket=args.max_stake,
+            min_ev=args.min_ev,
+            out_mode=args.out_mode,
+        )
+        return
+
+    if args.strategy == "kelly":
+        if not args.odds_csv:
+            parser.error("--strategy kelly needs --odds-csv")
+        race_ids = resolve_race_ids(
+            create_source(args.source),
+            race_ids=args.race_id,
+            race_ids_file=args.race_ids_file,
+            date_from=args.date_from,
+            date_to=args.date_to,
+        )
+        if not race_ids:
+            parser.error("--race-id, --race-ids-file or --date-from/--date-to is required")
+        run_kelly_prediction(
+            race_ids,
+            odds_csv=args.odds_csv,
+            out_path=args.out,
+            source=args.source,
+            cache=args.cache,
+            bankroll=args.bankroll,
+            fraction=args.kelly_fraction,
+            max_exposure=args.max_exposure,
+            max_stake_per_ticket=args.max_stake,
+            min_ev=args.min_ev,
+            n_samples=args.samples,
+            out_mode=args.out_mode,
+        )
+        return
+
+    if not batch:
+        if not args.race_id:
+            parser.error("--race-id, --race-ids-file or --date-from/--date-to is required")
+        run_prediction(
+            race_id=args.race_id[0],
+            select=args.select,
+            out_path=args.out,
+            source=args.source,
+            cache=args.cache,
+            top_k=args.top_k,
+            scoring=args.scoring,
+            out_mode=args.out_mode,
+        )
+        return
+
+    race_ids = resolve_race_ids(
+        create_source(args.source),
+        race_ids=args.race_id,
+        race_ids_file=args.race_ids_file,
+        date_from=args.date_from,
+        date_to=args.date_to,
+    )
+    run_batch(
+        race_ids,
+        select=args.select,
+        out_path=args.out,
+        source=args.source,
+        cache=args.cache,
+        workers=args.workers,
+        executor=args.executor,
+        top_k=args.top_k,
+        scoring=args.scoring,
+        out_mode=args.out_mode,
+    )
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import csv
+import os
+import time
+from collections.abc import Iterator, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any
+
+from keiba_scraping.app.predict import CSV_HEADER, CSV_TYPES, box_for_race, check_select, combo_rows, predict_race
+from keiba_scraping.app.sinks import open_sink, output_root
+from keiba_scraping.data.async_source import AsyncRaceCardSource, BlockingRaceCardSource
+from keiba_scraping.data.factory import create_async_source, create_source
+from keiba_scraping.data.source import RaceCardSource
+
+
+@dataclass(frozen=True)
+class RaceOutcome:
+    race_id: str
+    rows: list[list[str]]
+    # 失敗したレースは rows が空で error に "例外名: メッセージ"
+    error: str | None
+    elapsed_sec: float
+
+
+@dataclass(frozen=True)
+class BatchReport:
+    races: int
+    ok: int
+    failed: int
+    rows: int
+    elapsed_sec: float
+    out_path: str
+    errors_path: str
+
+    @property
+    def races_per_sec(self) -> float:
+        return self.races / self.elapsed_sec if self.elapsed_sec > 0 else 0.0
+
+
+def read_race_ids_file(path: str | Path) -> list[str]:
+    """1 行 1 race_id。空行と # 以降は無視。"""
+    race_ids = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.split("#", 1)[0].strip()
+        if line:
+            race_ids.append(line)
+    return race_ids
+
+
+def resolve_race_ids(
+    race_source: RaceCardSource,
+    race_ids: Sequence[str] = (),
+    race_ids_file: str | Path | None = None,
+    date_from: int | None = None,
+    date_to: int | None = None,
+) -> list[str]:
+    """指定順（引数 → ファイル → 日付範囲）に並べ、重複は最初の 1 回だけ残す。"""
+    out = list(race_ids)
+    if race_ids_file is not None:
+        out.extend(read_race_ids_file(race_ids_file))
+    if date_from is not None or date_to is not None:
+        between = getattr(race_source, "race_ids_between", None)
+        if between is None:
+            raise ValueError(f"{type(race_source).__name__} cannot list races by date; pass race ids instead")
+        date_from = date_from if date_from is not None else date_to
+        date_to = date_to if date_to is not None else date_from
+        out.extend(between(date_from, date_to))
+    return list(dict.fromkeys(out))
+
+
+def _predict_one(
+    race_source: RaceCardSource, select: int, top_k: int | None, scoring: str, race_id: str
+) -> RaceOutcome:
+    t0 = time.perf_counter()
+    try:
+        _, combos = predict_race(race_source, race_id, select, top_k, scoring)
+    except Exception as e:  # 1 レースの失敗でバッチ全体は止めない
+        return RaceOutcome(race_id, [], f"{type(e).__name__}: {e}", time.perf_counter() - t0)
+    return RaceOutcome(race_id, combo_rows(race_id, combos), None, time.perf_counter() - t0)
+
+
+def _iter_async(
+    race_source: AsyncRaceCardSource, race_ids: Sequence[str], select: int, top_k: int | None, scoring: str
+) -> Iterator[RaceOutcome]:
+    # 出馬表は max_concurrency 件ずつ同時に取り、BOX はこのスレッドで作る。
+    # 順序どおりに返せるよう max_concurrency * 4 件ごとに区切る（elapsed_sec は取得時間の按分 + BOX）
+    blocking = BlockingRaceCardSource(race_source)
+    chunk_size = race_source.max_concurrency * 4
+    for lo in range(0, len(race_ids), chunk_size):
+        chunk = race_ids[lo : lo + chunk_size]
+        t0 = time.perf_counter()
+        cards = blocking.get_race_cards(chunk, return_exceptions=True)
+        fetch_sec = (time.perf_counter() - t0) / len(chunk)
+        for race_id, card in zip(chunk, cards):
+            t1 = time.perf_counter()
+            try:
+                if isinstance(card, BaseException):
+                    raise card
+                _, combos = box_for_race(card, select, top_k, scoring)
+            except Exception as e:
+                yield RaceOutcome(race_id, [], f"{type(e).__name__}: {e}", fetch_sec + time.perf_counter() - t1)
+                continue
+            yield RaceOutcome(race_id, combo_rows(race_id, combos), None, fetch_sec + time.perf_counter() - t1)
+
+
+# プロセスプールの各ワーカーが持つ (source, select, top_k, scoring)
+_worker: tuple[RaceCardSource, int, int | None, str] | None = None
+
+
+def _init_worker(source: str, cache: bool, select: int, top_k: int | None, scoring: str) -> None:
+    global _worker
+    _worker = (create_source(source, cache=cache), select, top_k, scoring)
+
+
+def _predict_in_worker(race_id: str) -> RaceOutcome:
+    assert _worker is not None
+    return _predict_one(*_worker, race_id)
+
+
+def iter_outcomes(
+    race_ids: Sequence[str],
+    select: int,
+    source: str = "stub",
+    cache: bool = False,
+    workers: int = 0,
+    executor: str = "process",
+    top_k: int | None = None,
+    scoring: str = "product",
+) -> Iterator[RaceOutcome]:
+    """race_ids の順に結果を返す（並列に処理しても順序は入力どおり）。
+
+    workers=0 は CPU 数、workers=1 はプールを使わずこのプロセスで順に処理する。
+    executor は "process"（box 計算など CPU 主体）か "thread"（DataLab など待ち主体）、
+    "async" は出馬表の取得だけを asyncio で workers 件まで同時に行う（DataLab はヘルパーのサブプロセスを並べる）。
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(race_ids) <= 1:
+        race_source = create_source(source, cache=cache)
+        for race_id in race_ids:
+            yield _predict_one(race_source, select, top_k, scoring, race_id)
+        return
+
+    pool: Executor
+    if executor == "process":
+        pool = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(source, cache, select, top_k, scoring)
+        )
+        chunksize = max(1, len(race_ids) // (workers * 8))
+        with pool:
+            yield from pool.map(_predict_in_worker, race_ids, chunksize=chunksize)
+    elif executor == "async":
+        yield from _iter_async(
+            create_async_source(source, cache=cache, max_concurrency=workers), race_ids, select, top_k, scoring
+        )
+    elif executor == "thread":
+        # スレッド間でソース（とキャッシュ）を共有する
+        race_source = create_source(source, cache=cache)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            yield from pool.map(lambda race_id: _predict_one(race_source, select, top_k, scoring, race_id), race_ids)
+    else:
+        raise ValueError(f"Unknown executor: {executor!r} (expected 'process', 'thread' or 'async')")
+
+
+class _ErrorLog:
+    """<out>.errors.csv。最初の失敗で初めて開く（失敗が無ければファイルを作らない）。"""
+
+    def __init__(self, path: str, append: bool = False) -> None:
+        self.path = path
+        self.append = append
+        self._f: IO[str] | None = None
+        self._writer: Any = None
+        if not append and os.path.exists(path):
+            # 上書きの実行で前回の失敗一覧が残っていると紛らわしい
+            os.remove(path)
+
+    def write(self, race_id: str, error: str) -> None:
+        if self._f is None:
+            has_data = self.append and os.path.exists(self.path) and os.path.getsize(self.path) > 0
+            self._f = open(self.path, "a" if self.append else "w", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._f)
+            if not has_data:
+                self._writer.writerow(["race_id", "error"])
+        self._writer.writerow([race_id, error])
+
+    def __enter__(self) -> _ErrorLog:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        if self._f is not None:
+            self._f.close()
+
+
+def run_batch(
+    race_ids: Sequence[str],
+    select: int,
+    out_path: str,
+    source: str = "stub",
+    cache: bool = False,
+    workers: int = 0,
+    executor: str = "process",
+    errors_path: str | None = None,
+    top_k: int | None = None,
+    scoring: str = "product",
+    out_mode: str | None = None,
+) -> BatchReport:
+    """複数レースを並列に予想し、1 つの出力（CSV / NDJSON / SQLite）に入力順で書く。失敗は errors_path に記録する。
+
+    SQLite（既定 upsert）なら同じファイルにシーズン分を足していけ、再実行したレースは行が置き換わる。
+    """
+    check_select(select, top_k, scoring)
+    if errors_path is None:
+        errors_path = f"{output_root(out_path)}.errors.csv"
+    os.makedirs(os.path.dirname(errors_path) or ".", exist_ok=True)
+
+    ok = failed = rows = 0
+    t0 = time.perf_counter()
+    # append / upsert はシーズン分を足していく使い方なので、失敗の一覧も前回分を残して足す
+    with open_sink(out_path, CSV_HEADER, out_mode, types=CSV_TYPES) as sink, _ErrorLog(
+        errors_path, append=sink.mode in ("append", "upsert")
+    ) as errors:
+        for outcome in iter_outcomes(race_ids, select, source, cache, workers, executor, top_k, scoring):
+            if outcome.error is None:
+                ok += 1
+                rows += len(outcome.rows)
+                sink.write_race(outcome.race_id, outcome.rows)
+            else:
+                failed += 1
+                errors.write(outcome.race_id, outcome.error)
+    elapsed = time.perf_counter() - t0
+
+    report = BatchReport(len(race_ids), ok, failed, rows, elapsed, out_path, errors_path)
+    print(f"races={report.races} ok={report.ok} failed={report.failed} rows={report.rows}")
+    print(f"elapsed={report.elapsed_sec:.2f}s ({report.races_per_sec:,.1f} races/sec)")
+    print(f"Saved: {out_path}")
+    if failed:
+        print(f"Errors: {errors_path}")
+    return report
@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+import http.client
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from collections.abc import Callable, Hashable, Sequence
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, TypeVar
+from urllib.parse import urlsplit
+
+from keiba_scraping.app.predict import CSV_HEADER, CSV_TYPES, check_select, combo_rows, predict_race, print_box
+from keiba_scraping.app.sinks import open_sink
+from keiba_scraping.data.cache import CachedRaceCardSource
+from keiba_scraping.data.factory import create_source
+from keiba_scraping.domain.models import HorseEntry
+from keiba_scraping.logic.trifecta_box import TrifectaCombo
+from keiba_scraping.profiling.latency import LatencyStats
+
+# 常駐する予想デーモン。ソース（とキャッシュ）を 1 回だけ作り、HTTP/JSON で予想を返す。
+# 待ち受けは localhost の TCP か Unix ソケット（どちらも同じ HTTP）。
+#
+#   POST /predict   {"race_id": ..., "select": 5, "top_k": null, "scoring": "product"}
+#   GET  /stats     レイテンシの分位点・キャッシュの統計・まとめた件数
+#   GET  /health
+#   POST /shutdown
+#
+# 同じ (race_id, select, top_k, scoring) の要求が処理中に重なったら 1 回だけ計算して結果を共有する。
+
+DEFAULT_PORT = 8765
+T = TypeVar("T")
+
+
+class Coalescer:
+    """同じキーの計算が進行中なら、新しく始めずにその結果を待つ。"""
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def run(self, key: Hashable, fn: Callable[[], T]) -> tuple[T, bool]:
+        """(結果, 他の要求の計算を待っただけか)"""
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if future is None:
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if leader:
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    del self._inflight[key]
+        return future.result(), not leader
+
+
+# ── server ───────────────────────────────────────────────────────────────────
+
+
+class PredictionService:
+    def __init__(self, source: str = "stub", cache: bool = True) -> None:
+        self.source_name = source
+        self.race_source = create_source(source, cache=cache)
+        self.coalescer = Coalescer()
+        self.latency = {"predict": LatencyStats(), "stats": LatencyStats()}
+        self.started = time.time()
+        self.errors = 0
+
+    def predict(self, race_id: str, select: int = 5, top_k: int | None = None, scoring: str = "product") -> dict:
+        check_select(select, top_k, scoring)
+        (top, combos), coalesced = self.coalescer.run(
+            (race_id, select, top_k, scoring), lambda: predict_race(self.race_source, race_id, select, top_k, scoring)
+        )
+        return {
+            "race_id": race_id,
+            "select": select,
+            "top_k": top_k,
+            "scoring": scoring,
+            "selected": [[h.horse_id, h.name, h.p_top3] for h in top],
+            "combos": [[*c.horse_ids, *c.horse_names, c.score] for c in combos],
+            "coalesced": coalesced,
+        }
+
+    def stats(self) -> dict:
+        out: dict[str, Any] = {
+            "source": self.source_name,
+            "pid": os.getpid(),
+            "uptime_sec": time.time() - self.started,
+            "errors": self.errors,
+            "coalesced": self.coalescer.coalesced,
+            "latency": {name: s.to_dict() for name, s in self.latency.items()},
+        }
+        inner = self.race_source
+        if isinstance(inner, CachedRaceCardSource):
+            out["cache"] = {
+                **inner.stats.to_dict(),
+                "entries": len(inner),
+                "bytes": inner.nbytes,
+            }
+            inner = inner.inner
+        pool = getattr(inner, "pool", None)
+        if pool is not None:
+            # 32bit ヘルパーの常駐ワーカー（KEIBA_DATALAB_WORKERS）
+            out["workers"] = pool.metrics()
+        return out
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _TcpServer | _UnixServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def address_string(self) -> str:
+        # Unix ソケットでは client_address が空
+        return self.client_address[0] if self.client_address else "unix"
+
+    def _reply(self, status: int, obj: dict) -> None:
+        body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, endpoint: str, fn: Callable[[], dict]) -> None:
+        service = self.server.service
+        t0 = time.perf_counter()
+        try:
+            obj, status = fn(), 200
+        except (ValueError, TypeError) as e:
+            obj, status = {"error": f"{type(e).__name__}: {e}"}, 400
+        except LookupError as e:
+            obj, status = {"error": f"{type(e).__name__}: {e}"}, 404
+        except Exception as e:
+            obj, status = {"error": f"{type(e).__name__}: {e}"}, 500
+        if status != 200:
+            service.errors += 1
+        self._reply(status, obj)
+        if endpoint in service.latency:
+            service.latency[endpoint].record((time.perf_counter() - t0) * 1000)
+
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        obj = json.loads(self.rfile.read(length) or b"{}")
+        if not isinstance(obj, dict):
+            raise ValueError("request body must be a JSON object")
+        return obj
+
+    def do_GET(self) -> None:
+        service = self.server.service
+        if self.path == "/health":
+            self._handle("health", lambda: {"ok": True})
+        elif self.path == "/stats":
+            self._handle("stats", service.stats)
+        else:
+            self._reply(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self) -> None:
+        service = self.server.service
+        if self.path == "/predict":
+            self._handle("predict", lambda: service.predict(**self._body()))
+        elif self.path == "/shutdown":
+            self._reply(200, {"ok": True})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        else:
+            self._reply(404, {"error": f"unknown path {self.path}"})
+
+
+class _TcpServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], service: PredictionService, verbose: bool = False) -> None:
+        self.service = service
+        self.verbose = verbose
+        super().__init__(address, _Handler)
+
+
+if hasattr(socket, "AF_UNIX"):
+
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+        def __init__(self, path: str, service: PredictionService, verbose: bool = False) -> None:
+            self.service = service
+            self.verbose = verbose
+            super().__init__(path, _Handler)
+
+
+def serve(
+    source: str = "stub",
+    cache: bool = True,
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+    unix_path: str | None = None,
+    verbose: bool = False,
+    ready: Callable[[str], None] | None = None,
+) -> None:
+    """止める（Ctrl+C か POST /shutdown）まで要求を受ける。ready には接続先の文字列を渡す。"""
+    service = PredictionService(source, cache)
+    server: _TcpServer | _UnixServer
+    if unix_path is not None:
+        if not hasattr(socket, "AF_UNIX"):
+            raise RuntimeError("Unix sockets are not available on this platform; use --port")
+        if Path(unix_path).is_socket():
+            Path(unix_path).unlink()  # 前回の残り
+        server = _UnixServer(unix_path, service, verbose)
+        address = f"unix:{unix_path}"
+    else:
+        server = _TcpServer((host, port), service, verbose)
+        address = f"http://{host}:{server.server_address[1]}"
+    try:
+        if ready is not None:
+            ready(address)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if unix_path is not None:
+            Path(unix_path).unlink(missing_ok=True)
+
+
+# ── client ───────────────────────────────────────────────────────────────────
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.unix_path)
+        self.sock = sock
+
+
+class DaemonClient:
+    """address は "http://127.0.0.1:8765" か "unix:/path/to/socket"。接続はスレッドごとに使い回す。"""
+
+    def __init__(self, address: str, timeout: float = 120.0) -> None:
+        self.address = address
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.address.startswith("unix:"):
+                conn = _UnixHTTPConnection(self.address[len("unix:") :], self.timeout)
+            else:
+                url = urlsplit(self.address if "://" in self.address else f"http://{self.address}")
+                conn = http.client.HTTPConnection(url.hostname or "127.0.0.1", url.port or DEFAULT_PORT,
+                                                  timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _request(self, method: str, path: str, body: dict | None = None) -> dict:
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        headers = {"Content-Type": "application/json"} if data is not None else {}
+        for attempt in (0, 1):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=data, headers=headers)
+                resp = conn.getresponse()
+                payload = json.loads(resp.read() or b"{}")
+                break
+            except (ConnectionError, http.client.RemoteDisconnected, http.client.CannotSendRequest):
+                # 切れた keep-alive 接続を張り直して 1 回だけやり直す
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+        if resp.status == 400:
+            raise ValueError(payload.get("error"))
+        if resp.status == 404:
+            raise LookupError(payload.get("error"))
+        if resp.status != 200:
+            raise RuntimeError(f"daemon returned {resp.status}: {payload.get('error')}")
+        return payload
+
+    def predict(self, race_id: str, select: int = 5, top_k: int | None = None, scoring: str = "product") -> dict:
+        return self._request("POST", "/predict", {"race_id": race_id, "select": select, "top_k": top_k,
+                                                  "scoring": scoring})
+
+    def predict_race(
+        self, race_id: str, select: int = 5, top_k: int | None = None, scoring: str = "product"
+    ) -> tuple[list[HorseEntry], list[TrifectaCombo]]:
+        """app.predict.predict_race と同じ形で返す。"""
+        r = self.predict(race_id, select, top_k, scoring)
+        top = [HorseEntry(i, n, p) for i, n, p in r["selected"]]
+        combos = [TrifectaCombo(tuple(c[0:3]), tuple(c[3:6]), c[6]) for c in r["combos"]]  # type: ignore[arg-type]
+        return top, combos
+
+    def stats(self) -> dict:
+        return self._request("GET", "/stats")
+
+    def health(self) -> dict:
+        return self._request("GET", "/health")
+
+    def shutdown(self) -> dict:
+        return self._request("POST", "/shutdown")
+
+
+def run_remote_prediction(
+    address: str,
+    race_ids: Sequence[str],
+    select: int,
+    out_path: str,
+    top_k: int | None = None,
+    scoring: str = "product",
+    out_mode: str | None = None,
+) -> None:
+    """デーモンに予想させ、run_prediction / run_batch と同じ行を out_path に書く。"""
+    check_select(select, top_k, scoring)
+    client = DaemonClient(address)
+    failed = 0
+    t0 = time.perf_counter()
+    with open_sink(out_path, CSV_HEADER, out_mode, types=CSV_TYPES) as sink:
+        for race_id in race_ids:
+            try:
+                top, combos = client.predict_race(race_id, select, top_k, scoring)
+            except (ValueError, LookupError) as e:
+                if len(race_ids) == 1:
+                    raise
+                failed += 1
+                print(f"error: {race_id}: {e}")
+                continue
+            sink.write_race(race_id, combo_rows(race_id, combos))
+            if len(race_ids) == 1:
+                print(f"race_id={race_id}")
+                print(f"daemon={address}")
+                print_box(top, combos, scoring)
+    if len(race_ids) > 1:
+        print(f"races={len(race_ids)} ok={len(race_ids) - failed} failed={failed} "
+              f"elapsed={time.perf_counter() - t0:.2f}s daemon={address}")
+    print(f"\nSaved: {out_path}")
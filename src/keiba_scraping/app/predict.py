@@ -1,43 +1,318 @@
 from __future__ import annotations
 
-import csv
-import os
+from collections.abc import Sequence
+from dataclasses import dataclass
+from math import comb
 
+import numpy as np
+
+from keiba_scraping.app.sinks import open_sink
+from keiba_scraping.data.cache import CachedRaceCardSource
 from keiba_scraping.data.factory import create_source
-from keiba_scraping.logic.trifecta_box import make_trifecta_box
+from keiba_scraping.data.odds import OddsTable, read_odds_csv
+from keiba_scraping.data.source import RaceCardSource
+from keiba_scraping.domain.models import HorseEntry, RaceCard
+from keiba_scraping.logic.harville import ticket_probabilities
+from keiba_scraping.logic.kelly import KellyResult, kelly_stakes, race_scenarios, sampled_scenarios, solve_kelly
+from keiba_scraping.logic.optimizer import optimize_ev
+from keiba_scraping.logic.simulate import race_strength, ticket_indices
+from keiba_scraping.logic.trifecta_box import SCORINGS, TrifectaCombo, make_trifecta_box
+from keiba_scraping.profiling.trace import counter, span, traced
+
+
+CSV_HEADER = ["race_id", "horse1", "horse2", "horse3", "score"]
+# SQLite に書くときの列の型（ほかは TEXT）
+CSV_TYPES = {"score": "REAL"}
 
 
-def run_prediction(race_id: str, select: int, out_path: str, source: str = "stub") -> None:
+def check_select(select: int, top_k: int | None = None, scoring: str = "product") -> None:
     if select < 3:
         raise ValueError("--select must be >= 3")
-    if select != 5:
-        raise ValueError("MVP currently supports --select 5 only (10 tickets).")
+    if top_k is not None and top_k < 1:
+        raise ValueError("--top-k must be >= 1")
+    if scoring not in SCORINGS:
+        raise ValueError(f"--scoring must be one of {SCORINGS}")
+
+
+def predict_race(
+    race_source: RaceCardSource,
+    race_id: str,
+    select: int,
+    top_k: int | None = None,
+    scoring: str = "product",
+) -> tuple[list[HorseEntry], list[TrifectaCombo]]:
+    """1 レース分: 出馬表を取り、p_top3 上位 select 頭（頭数が少なければ全頭）の BOX を作る。"""
+    with span("get_race_card", race_id=race_id):
+        race = race_source.get_race_card(race_id)
+    return box_for_race(race, select, top_k, scoring)
+
 
-    race_source = create_source(source)
-    race = race_source.get_race_card(race_id)
+def box_for_race(
+    race: RaceCard,
+    select: int,
+    top_k: int | None = None,
+    scoring: str = "product",
+) -> tuple[list[HorseEntry], list[TrifectaCombo]]:
+    if len(race.horses) < 3:
+        raise ValueError(f"race_id={race.race_id} has only {len(race.horses)} runners")
 
-    top = sorted(race.horses, key=lambda h: h.p_top3, reverse=True)[:select]
+    with span("select", runners=len(race.horses)):
+        ranked = sorted(race.horses, key=lambda h: h.p_top3, reverse=True)
+        top = ranked[:select]
 
-    combos = make_trifecta_box(top)
-    if len(combos) != 10:
-        raise RuntimeError(f"Expected 10 combos, got {len(combos)}")
+    with span("make_trifecta_box", selected=len(top), scoring=scoring):
+        combos = make_trifecta_box(top, top_k, scoring, others=ranked[select:])
+    counter("tickets", len(combos))
+    return top, combos
 
-    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
 
-    with open(out_path, "w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(["race_id", "horse1", "horse2", "horse3", "score"])
-        for c in combos:
-            w.writerow([race_id, *c.horse_names, f"{c.score:.6f}"])
+def combo_rows(race_id: str, combos: list[TrifectaCombo]) -> list[list[str]]:
+    return [[race_id, *c.horse_names, f"{c.score:.6f}"] for c in combos]
+
+
+def run_prediction(
+    race_id: str,
+    select: int,
+    out_path: str,
+    source: str = "stub",
+    cache: bool = False,
+    top_k: int | None = None,
+    scoring: str = "product",
+    out_mode: str | None = None,
+) -> None:
+    """1 レースの BOX を out_path（拡張子で CSV / NDJSON / SQLite、out_mode は app/sinks.py）に書く。"""
+    check_select(select, top_k, scoring)
+
+    with span("run_prediction", race_id=race_id):
+        race_source = create_source(source, cache=cache)
+        with span("predict_race"):
+            top, combos = predict_race(race_source, race_id, select, top_k, scoring)
+
+        with span("write_output", rows=len(combos)):
+            with open_sink(out_path, CSV_HEADER, out_mode, types=CSV_TYPES) as sink:
+                sink.write_race(race_id, combo_rows(race_id, combos))
 
     print(f"race_id={race_id}")
     print(f"source={source}")
+    if isinstance(race_source, CachedRaceCardSource):
+        print(f"cache={race_source.stats.to_dict()}")
+    print_box(top, combos, scoring)
+
+    print(f"\nSaved: {out_path}")
+
+
+def print_box(top: Sequence[HorseEntry], combos: Sequence[TrifectaCombo], scoring: str) -> None:
     print("selected horses:")
     for h in top:
         print(f"- {h.name} (p_top3={h.p_top3:.2f})")
 
-    print("\n3連複 5頭BOX (10点):")
+    n_box = comb(len(top), 3)
+    shown = f"上位 {len(combos)} 点" if len(combos) < n_box else f"{n_box}点"
+    print(f"\n3連複 {len(top)}頭BOX ({shown}, score={scoring}):")
     for i, c in enumerate(combos, start=1):
         print(f"{i:02d}. {' - '.join(c.horse_names)}  score={c.score:.6f}")
 
-    print(f"\nSaved: {out_path}")
\ No newline at end of file
+
+# ── EV strategy ──────────────────────────────────────────────────────────────
+
+EV_CSV_HEADER = ["race_id", "bet_type", "horse1", "horse2", "horse3", "prob", "odds", "ev", "stake"]
+EV_CSV_TYPES = {"prob": "REAL", "odds": "REAL", "ev": "REAL", "stake": "INTEGER"}
+
+
+@dataclass(frozen=True)
+class EvTicket:
+    bet_type: str
+    horse_ids: tuple[str, ...]
+    horse_names: tuple[str, ...]
+    # Harville モデルでの的中確率、オッズ、1 円あたり期待払戻、購入額（円）
+    prob: float
+    odds: float
+    ev: float
+    stake: int
+
+
+def ticket_candidates(race: RaceCard, odds: OddsTable) -> tuple[list[str], list[tuple[str, ...]], np.ndarray, np.ndarray]:
+    """オッズのある全馬券を 1 列に並べ、(券種, horse_id の組, 的中確率, オッズ) を返す。"""
+    strength = race_strength(race)
+    bet_types: list[str] = []
+    tickets: list[tuple[str, ...]] = []
+    probs, prices = [], []
+    for bet_type, horse_ids in odds.tickets.items():
+        probs.append(ticket_probabilities(strength, bet_type, ticket_indices(race, horse_ids)))
+        prices.append(odds.odds_array(bet_type))
+        bet_types.extend([bet_type] * len(horse_ids))
+        tickets.extend(horse_ids)
+    return bet_types, tickets, np.concatenate(probs), np.concatenate(prices)
+
+
+@traced()
+def plan_ev_tickets(
+    race: RaceCard,
+    odds: OddsTable,
+    budget: int,
+    max_tickets: int = 10,
+    max_stake_per_ticket: int | None = None,
+    min_ev: float = 1.0,
+    unit: int = 100,
+) -> list[EvTicket]:
+    bet_types, tickets, p, prices = ticket_candidates(race, odds)
+    plan = optimize_ev(p, prices, budget, unit, max_tickets, max_stake_per_ticket, min_ev)
+    names = {h.horse_id: h.name for h in race.horses}
+    return [
+        EvTicket(bet_types[i], tickets[i], tuple(names[h] for h in tickets[i]), float(p[i]), float(prices[i]),
+                 float(ev), int(stake))
+        for i, stake, ev in zip(plan.indices.tolist(), plan.stakes.tolist(), plan.ev.tolist())
+    ]
+
+
+def write_ticket_plan(out_path: str, plans: dict[str, list[EvTicket]], out_mode: str | None = None) -> None:
+    """race_id -> 馬券のリストを EV_CSV_HEADER の行で書く（SQLite なら tickets テーブル）。"""
+    with open_sink(out_path, EV_CSV_HEADER, out_mode, table="tickets", types=EV_CSV_TYPES) as sink:
+        for race_id, plan in plans.items():
+            rows = []
+            for t in plan:
+                names = list(t.horse_names) + [""] * (3 - len(t.horse_names))
+                rows.append([race_id, t.bet_type, *names, f"{t.prob:.6f}", f"{t.odds:.1f}", f"{t.ev:.4f}", t.stake])
+            sink.write_race(race_id, rows)
+
+
+def print_ticket_plan(plan: list[EvTicket]) -> None:
+    for i, t in enumerate(plan, start=1):
+        print(f"{i:02d}. {t.bet_type:<8} {' - '.join(t.horse_names)}  p={t.prob:.4f} odds={t.odds:.1f} "
+              f"ev={t.ev:.3f} stake={t.stake:,}")
+
+
+def run_ev_prediction(
+    race_id: str,
+    odds_csv: str,
+    out_path: str,
+    source: str = "stub",
+    cache: bool = False,
+    budget: int = 1000,
+    max_tickets: int = 10,
+    max_stake_per_ticket: int | None = None,
+    min_ev: float = 1.0,
+    out_mode: str | None = None,
+) -> list[EvTicket]:
+    """オッズ CSV を読み、予算内で期待払戻が最大の馬券と購入額を出す（BOX の代わり）。"""
+    race = create_source(source, cache=cache).get_race_card(race_id)
+    odds = read_odds_csv(odds_csv, race_id)
+    plan = plan_ev_tickets(race, odds, budget, max_tickets, max_stake_per_ticket, min_ev)
+
+    write_ticket_plan(out_path, {race_id: plan}, out_mode)
+
+    print(f"race_id={race_id}")
+    print(f"source={source}")
+    print(f"odds={odds_csv} ({len(odds)} tickets)")
+    total = sum(t.stake for t in plan)
+    expected = sum(t.stake * t.ev for t in plan)
+    print(f"\n期待値最大化 (予算 {budget:,}円, 最大 {max_tickets}点):")
+    if not plan:
+        print(f"期待値 {min_ev} を超える馬券なし")
+    print_ticket_plan(plan)
+    print(f"total={total:,}円 expected_return={expected:,.0f}円")
+
+    print(f"\nSaved: {out_path}")
+    return plan
+
+
+# ── Kelly strategy ───────────────────────────────────────────────────────────
+
+
+@traced()
+def plan_kelly_tickets(
+    races: Sequence[RaceCard],
+    odds: Sequence[OddsTable],
+    bankroll: int,
+    fraction: float = 0.5,
+    max_exposure: float = 0.2,
+    max_stake_per_ticket: int | None = None,
+    min_ev: float = 1.0,
+    unit: int = 100,
+    n_samples: int = 20_000,
+    seed: int = 0,
+) -> tuple[list[list[EvTicket]], KellyResult]:
+    """同じ資金で races の馬券を同時ケリーで張る。購入額はレースごとのリストで返す。
+
+    1 レースなら着順分布を厳密に列挙し、複数レースなら n_samples 回の同時サンプルで解く。
+    候補は期待値 p*odds が min_ev を超える馬券に絞る（控除のある市場では、互いに排他な
+    馬券の最適解に期待値 1 以下の馬券は入らない）。
+    """
+    if len(races) != len(odds):
+        raise ValueError(f"{len(races)} races but {len(odds)} odds tables")
+    candidates = []
+    strengths, tickets, prices = [], [], []
+    for race, table in zip(races, odds):
+        bet_types, horse_ids, p, o = ticket_candidates(race, table)
+        keep = np.flatnonzero(p * o > min_ev)
+        candidates.append((race, [bet_types[i] for i in keep], [horse_ids[i] for i in keep], p[keep], o[keep]))
+        # keep は券種ごとにまとまった並びのままなので、券種 -> 添字の dict と列の順が一致する
+        by_type: dict[str, list[tuple[str, ...]]] = {}
+        for i in keep.tolist():
+            by_type.setdefault(bet_types[i], []).append(horse_ids[i])
+        strengths.append(race_strength(race))
+        tickets.append({b: ticket_indices(race, t) for b, t in by_type.items()})
+        prices.append(o[keep])
+
+    if len(races) == 1:
+        probs, hits = race_scenarios(strengths[0], tickets[0])
+    else:
+        probs, hits = sampled_scenarios(strengths, tickets, n_samples, seed)
+    per_ticket = max_stake_per_ticket / bankroll if max_stake_per_ticket is not None else None
+    result = solve_kelly(probs, hits, np.concatenate(prices), fraction, max_exposure, per_ticket)
+    stakes = kelly_stakes(result.fractions, bankroll, unit)
+
+    plans = []
+    start = 0
+    for race, bet_types, horse_ids, p, o in candidates:
+        names = {h.horse_id: h.name for h in race.horses}
+        s = stakes[start : start + len(p)]
+        start += len(p)
+        order = np.flatnonzero(s > 0)
+        order = order[np.argsort(-s[order], kind="stable")]
+        plans.append([
+            EvTicket(bet_types[i], horse_ids[i], tuple(names[h] for h in horse_ids[i]), float(p[i]), float(o[i]),
+                     float(p[i] * o[i]), int(s[i]))
+            for i in order.tolist()
+        ])
+    return plans, result
+
+
+def run_kelly_prediction(
+    race_ids: Sequence[str],
+    odds_csv: str,
+    out_path: str,
+    source: str = "stub",
+    cache: bool = False,
+    bankroll: int = 100_000,
+    fraction: float = 0.5,
+    max_exposure: float = 0.2,
+    max_stake_per_ticket: int | None = None,
+    min_ev: float = 1.0,
+    n_samples: int = 20_000,
+    out_mode: str | None = None,
+) -> list[list[EvTicket]]:
+    """オッズ CSV の馬券に、資金 bankroll の分数ケリーで購入額を付ける（複数レースは 1 日分をまとめて）。"""
+    race_source = create_source(source, cache=cache)
+    races = [race_source.get_race_card(race_id) for race_id in race_ids]
+    odds = [read_odds_csv(odds_csv, race_id) for race_id in race_ids]
+    plans, result = plan_kelly_tickets(
+        races, odds, bankroll, fraction, max_exposure, max_stake_per_ticket, min_ev, n_samples=n_samples
+    )
+    write_ticket_plan(out_path, dict(zip(race_ids, plans)), out_mode)
+
+    print(f"source={source}")
+    print(f"odds={odds_csv} ({sum(len(o) for o in odds)} tickets)")
+    print(f"\n同時ケリー (資金 {bankroll:,}円, fraction={fraction}, 上限 {max_exposure:.0%}):")
+    for race_id, plan in zip(race_ids, plans):
+        print(f"[{race_id}]")
+        if not plan:
+            print("賭けない")
+        print_ticket_plan(plan)
+    total = sum(t.stake for plan in plans for t in plan)
+    expected = sum(t.stake * t.ev for plan in plans for t in plan)
+    print(f"total={total:,}円 expected_return={expected:,.0f}円 growth={result.growth:.6f} "
+          f"(iterations={result.iterations}, converged={result.converged})")
+
+    print(f"\nSaved: {out_path}")
+    return plans
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import csv
+import gzip
+import json
+import lzma
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import IO, Any
+
+# 予想結果の書き出し先。行はレース単位で write_race() に渡し、chunk_rows 行たまるごとにまとめて書く。
+# 先頭の列は race_id。
+#
+#   mode="overwrite"  既存の内容を捨てて書き直す（CSV の従来の動き）
+#   mode="append"     既存の行はそのままで後ろに足す
+#   mode="upsert"     同じ race_id の既存の行を置き換える（SQLite のみ。ファイルは書き直さないとできない）
+#
+# 拡張子で選ぶ: .sqlite / .db / .sqlite3 -> SQLite、.ndjson / .jsonl -> NDJSON、それ以外は CSV。
+# ファイル系は末尾の .gz / .xz で圧縮する（追記は圧縮ストリームを足していく形で、読むときは 1 本に見える）。
+
+SINK_MODES = ("overwrite", "append", "upsert")
+SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+COMPRESSED_SUFFIXES = (".gz", ".xz")
+
+
+class RowSink(ABC):
+    def __init__(self, path: str | Path, header: Sequence[str], mode: str, chunk_rows: int = 10_000) -> None:
+        if mode not in SINK_MODES:
+            raise ValueError(f"mode must be one of {SINK_MODES}, got {mode!r}")
+        if not header or header[0] != "race_id":
+            raise ValueError(f"the first column must be race_id, got {list(header)}")
+        self.path = Path(path)
+        self.header = list(header)
+        self.mode = mode
+        self.chunk_rows = chunk_rows
+        self.rows_written = 0
+        # race_id -> 行（挿入順 = 書く順）
+        self._buffer: dict[str, list[Sequence[Any]]] = {}
+        self._buffered = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def write_race(self, race_id: str, rows: Sequence[Sequence[Any]]) -> None:
+        """1 レース分の行。upsert で同じ race_id を 2 回渡したら後のものが残る。"""
+        for row in rows:
+            if len(row) != len(self.header):
+                raise ValueError(f"race_id={race_id}: row has {len(row)} columns, header has {len(self.header)}")
+        if self.mode == "upsert":
+            self._buffered -= len(self._buffer.pop(race_id, ()))
+            self._buffer[race_id] = list(rows)
+        else:
+            self._buffer.setdefault(race_id, []).extend(rows)
+        self._buffered += len(rows)
+        if self._buffered >= self.chunk_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._write(self._buffer)
+            self.rows_written += self._buffered
+            self._buffer = {}
+            self._buffered = 0
+
+    @abstractmethod
+    def _write(self, races: dict[str, list[Sequence[Any]]]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> RowSink:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+# ── files ────────────────────────────────────────────────────────────────────
+
+
+def _open_text(path: Path, mode: str) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", compresslevel=6, encoding="utf-8", newline="")
+    if path.suffix == ".xz":
+        return lzma.open(path, mode + "t", encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def _has_data(path: Path) -> bool:
+    return path.exists() and path.stat().st_size > 0
+
+
+class _FileSink(RowSink):
+    def __init__(
+        self, path: str | Path, header: Sequence[str], mode: str = "overwrite", chunk_rows: int = 10_000
+    ) -> None:
+        super().__init__(path, header, mode, chunk_rows)
+        if mode == "upsert":
+            raise ValueError(f"{self.path}: upsert needs a SQLite sink ({', '.join(SQLITE_SUFFIXES)})")
+        self._appending = mode == "append" and _has_data(self.path)
+        self._f = _open_text(self.path, "a" if mode == "append" else "w")
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self._f.close()
+
+
+class CsvSink(_FileSink):
+    def __init__(
+        self, path: str | Path, header: Sequence[str], mode: str = "overwrite", chunk_rows: int = 10_000
+    ) -> None:
+        super().__init__(path, header, mode, chunk_rows)
+        if self._appending:
+            with _open_text(self.path, "r") as f:
+                existing = next(csv.reader(f), [])
+            if existing != self.header:
+                self._f.close()
+                raise ValueError(f"{self.path}: existing header {existing} does not match {self.header}")
+        self._writer = csv.writer(self._f)
+        if not self._appending:
+            self._writer.writerow(self.header)
+
+    def _write(self, races: dict[str, list[Sequence[Any]]]) -> None:
+        for rows in races.values():
+            self._writer.writerows(rows)
+
+
+class NdjsonSink(_FileSink):
+    """1 行 1 オブジェクト（列名 -> 値）。"""
+
+    def _write(self, races: dict[str, list[Sequence[Any]]]) -> None:
+        header = self.header
+        self._f.writelines(
+            json.dumps(dict(zip(header, row)), ensure_ascii=False) + "\n" for rows in races.values() for row in rows
+        )
+
+
+# ── SQLite ───────────────────────────────────────────────────────────────────
+
+
+def _ident(name: str) -> str:
+    if not name.isidentifier():
+        raise ValueError(f"not a valid SQL identifier: {name!r}")
+    return f'"{name}"'
+
+
+class SqliteSink(RowSink):
+    """WAL モードの SQLite。chunk_rows 行ごとに 1 トランザクションで executemany する。
+
+    types は列名 -> SQLite の型（"REAL" など）。指定しない列は TEXT（"0001" のような番号も文字列のまま残る）。
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        header: Sequence[str],
+        mode: str = "upsert",
+        table: str = "predictions",
+        types: Mapping[str, str] | None = None,
+        chunk_rows: int = 10_000,
+    ) -> None:
+        super().__init__(path, header, mode, chunk_rows)
+        types = types or {}
+        self.table = table
+        self._conn = sqlite3.connect(self.path)
+        try:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            t = _ident(table)
+            with self._conn:
+                if mode == "overwrite":
+                    self._conn.execute(f"DROP TABLE IF EXISTS {t}")
+                cols = ", ".join(f"{_ident(c)} {types.get(c, 'TEXT')}" for c in self.header)
+                self._conn.execute(f"CREATE TABLE IF NOT EXISTS {t} ({cols})")
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS {_ident(table + '_race_id')} ON {t} (race_id)")
+            existing = [r[1] for r in self._conn.execute(f"PRAGMA table_info({t})")]
+            if existing != self.header:
+                raise ValueError(f"{self.path}: table {table} has columns {existing}, expected {self.header}")
+        except BaseException:
+            self._conn.close()
+            raise
+        marks = ", ".join("?" * len(self.header))
+        self._insert = f"INSERT INTO {t} VALUES ({marks})"
+        self._delete = f"DELETE FROM {t} WHERE race_id = ?"
+
+    def _write(self, races: dict[str, list[Sequence[Any]]]) -> None:
+        with self._conn:
+            if self.mode == "upsert":
+                self._conn.executemany(self._delete, ((race_id,) for race_id in races))
+            self._conn.executemany(self._insert, (row for rows in races.values() for row in rows))
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self._conn.close()
+
+
+# ── factory ──────────────────────────────────────────────────────────────────
+
+
+def _kind(path: str | Path) -> str:
+    p = Path(path)
+    if p.suffix in COMPRESSED_SUFFIXES:
+        p = p.with_suffix("")
+    if p.suffix in SQLITE_SUFFIXES:
+        return "sqlite"
+    if p.suffix in NDJSON_SUFFIXES:
+        return "ndjson"
+    return "csv"
+
+
+def output_root(path: str | Path) -> str:
+    """拡張子（圧縮も含む）を除いたパス。付随ファイル（<root>.errors.csv など）の名前に使う。"""
+    p = str(path)
+    for suffix in COMPRESSED_SUFFIXES:
+        if p.endswith(suffix):
+            p = p[: -len(suffix)]
+    return os.path.splitext(p)[0]
+
+
+def open_sink(
+    path: str | Path,
+    header: Sequence[str],
+    mode: str | None = None,
+    table: str = "predictions",
+    types: Mapping[str, str] | None = None,
+    chunk_rows: int = 10_000,
+) -> RowSink:
+    """拡張子で sink を選ぶ。mode の既定は SQLite が upsert、ファイルは overwrite。"""
+    kind = _kind(path)
+    if kind == "sqlite":
+        if Path(path).suffix in COMPRESSED_SUFFIXES:
+            raise ValueError(f"{path}: SQLite output cannot be compressed")
+        return SqliteSink(path, header, mode or "upsert", table, types, chunk_rows)
+    if kind == "ndjson":
+        return NdjsonSink(path, header, mode or "overwrite", chunk_rows)
+    return CsvSink(path, header, mode or "overwrite", chunk_rows)
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import csv
+import json
+import os
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from itertools import islice
+from pathlib import Path
+
+from keiba_scraping.backtest.history import HistoricalRace, iter_history_lines, race_from_json
+from keiba_scraping.backtest.strategy import Bet, Strategy
+
+
+@dataclass(frozen=True)
+class RaceSettlement:
+    race_id: str
+    date: int
+    venue: str
+    bets: int
+    hits: int
+    stake: int
+    payout: int
+    # 失敗したレース（壊れた行・戦略の例外）は bets=0 で error に "例外名: メッセージ"
+    error: str | None = None
+
+    @property
+    def profit(self) -> int:
+        return self.payout - self.stake
+
+
+SETTLEMENT_CSV_HEADER = ["race_id", "date", "venue", "bets", "hits", "stake", "payout", "profit"]
+
+
+def settle(race: HistoricalRace, bets: Sequence[Bet]) -> RaceSettlement:
+    """確定した払戻で精算する（払戻は 100 円あたりなので stake / 100 倍）。"""
+    hits = payout = stake = 0
+    for bet in bets:
+        stake += bet.stake
+        per_100 = race.payout(bet.bet_type, bet.horse_ids)
+        if per_100:
+            hits += 1
+            payout += per_100 * bet.stake // 100
+    return RaceSettlement(race.race_id, race.date, race.venue, len(bets), hits, stake, payout)
+
+
+@dataclass
+class Summary:
+    races: int = 0
+    # 1 点以上買ったレース、1 点以上当たったレース
+    bet_races: int = 0
+    hit_races: int = 0
+    bets: int = 0
+    hits: int = 0
+    stake: int = 0
+    payout: int = 0
+    # 累積収支の最大の落ち込み（円）。日付順に足したときの値
+    max_drawdown: int = 0
+    _peak: int = field(default=0, repr=False)
+
+    @property
+    def profit(self) -> int:
+        return self.payout - self.stake
+
+    @property
+    def roi(self) -> float:
+        """回収率（払戻 / 購入額）。"""
+        return self.payout / self.stake if self.stake else 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """的中率（当たったレース / 買ったレース）。"""
+        return self.hit_races / self.bet_races if self.bet_races else 0.0
+
+    @property
+    def ticket_hit_rate(self) -> float:
+        return self.hits / self.bets if self.bets else 0.0
+
+    def add(self, s: RaceSettlement) -> None:
+        self.races += 1
+        self.bet_races += s.bets > 0
+        self.hit_races += s.hits > 0
+        self.bets += s.bets
+        self.hits += s.hits
+        self.stake += s.stake
+        self.payout += s.payout
+        self._peak = max(self._peak, self.profit)
+        self.max_drawdown = max(self.max_drawdown, self._peak - self.profit)
+
+    def to_dict(self) -> dict[str, float]:
+        d = {k: v for k, v in asdict(self).items() if not k.startswith("_")}
+        d.update(profit=self.profit, roi=self.roi, hit_rate=self.hit_rate, ticket_hit_rate=self.ticket_hit_rate)
+        return d
+
+
+@dataclass
+class BacktestReport:
+    total: Summary
+    by_venue: dict[str, Summary]
+    failed: int
+    elapsed_sec: float
+    # 失敗したレースの最初の数件（race_id, error）
+    errors: list[tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def races_per_sec(self) -> float:
+        return (self.total.races + self.failed) / self.elapsed_sec if self.elapsed_sec > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "total": self.total.to_dict(),
+            "by_venue": {v: s.to_dict() for v, s in sorted(self.by_venue.items())},
+            "failed": self.failed,
+            "errors": self.errors,
+            "elapsed_sec": self.elapsed_sec,
+            "races_per_sec": self.races_per_sec,
+        }
+
+
+# ── workers ──────────────────────────────────────────────────────────────────
+
+
+def _run_line(strategy: Strategy, line: str) -> RaceSettlement:
+    try:
+        race = race_from_json(json.loads(line))
+    except Exception as e:  # 壊れた行は飛ばして数える
+        return RaceSettlement("", 0, "", 0, 0, 0, 0, f"{type(e).__name__}: {e}")
+    try:
+        return settle(race, strategy(race.card))
+    except Exception as e:  # 1 レースの失敗で全体は止めない
+        return RaceSettlement(race.race_id, race.date, race.venue, 0, 0, 0, 0, f"{type(e).__name__}: {e}")
+
+
+def run_chunk(strategy: Strategy, lines: Sequence[str]) -> list[RaceSettlement]:
+    return [_run_line(strategy, line) for line in lines]
+
+
+# プロセスプールの各ワーカーが持つ戦略
+_worker: Strategy | None = None
+
+
+def _init_worker(strategy: Strategy) -> None:
+    global _worker
+    _worker = strategy
+
+
+def _run_chunk_in_worker(lines: list[str]) -> list[RaceSettlement]:
+    assert _worker is not None
+    return run_chunk(_worker, lines)
+
+
+def _chunks(lines: Iterable[str], size: int) -> Iterator[list[str]]:
+    it = iter(lines)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def iter_settlements(
+    paths: Sequence[str | Path],
+    strategy: Strategy,
+    workers: int = 0,
+    chunk_size: int = 500,
+) -> Iterator[RaceSettlement]:
+    """過去レースのファイルを読みながら精算結果をファイル順に返す。
+
+    行を chunk_size 件ずつワーカーに渡し、処理中のチャンクは workers * 2 個までに抑えるので、
+    メモリはファイルの大きさによらない。workers=0 は CPU 数、1 はプールなし。
+    """
+    chunks = _chunks(iter_history_lines(paths), chunk_size)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in chunks:
+            yield from run_chunk(strategy, chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(strategy,)) as pool:
+        pending: deque[Future[list[RaceSettlement]]] = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_run_chunk_in_worker, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def run_backtest(
+    paths: Sequence[str | Path],
+    strategy: Strategy,
+    workers: int = 0,
+    chunk_size: int = 500,
+    out_path: str | None = None,
+    max_errors: int = 20,
+) -> BacktestReport:
+    """戦略で過去レースを買い、回収率・的中率・最大ドローダウン・場別の成績をまとめる。
+
+    ドローダウンは結果を (日付, race_id) 順に並べ直して計算するので、ファイルの並びは問わない。
+    out_path を渡すとレースごとの精算結果を CSV に書く。
+    """
+    t0 = time.perf_counter()
+    settled: list[RaceSettlement] = []
+    errors: list[tuple[str, str]] = []
+    failed = 0
+    for s in iter_settlements(paths, strategy, workers, chunk_size):
+        if s.error is None:
+            settled.append(s)
+        else:
+            failed += 1
+            if len(errors) < max_errors:
+                errors.append((s.race_id, s.error))
+    settled.sort(key=lambda s: (s.date, s.race_id))
+
+    total = Summary()
+    by_venue: dict[str, Summary] = {}
+    for s in settled:
+        total.add(s)
+        by_venue.setdefault(s.venue, Summary()).add(s)
+
+    if out_path is not None:
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        with open(out_path, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(SETTLEMENT_CSV_HEADER)
+            for s in settled:
+                w.writerow([s.race_id, s.date, s.venue, s.bets, s.hits, s.stake, s.payout, s.profit])
+    return BacktestReport(total, by_venue, failed, time.perf_counter() - t0, errors)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import gzip
+import json
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO
+
+from keiba_scraping.domain.models import HorseEntry, RaceCard
+from keiba_scraping.logic.simulate import BET_TYPES
+
+# 過去レースのファイルは 1 行 1 レースの NDJSON（.gz なら gzip）:
+#   {"race_id": "2024010606010101", "date": 20240106, "venue": "06",
+#    "horses": [["H01", "HorseA", 0.62], ...],        # horse_id, 馬名, p_top3（予想時点の値）
+#    "finish": ["H03", "H01", "H07"],                  # 確定着順の上位（horse_id）
+#    "payouts": {"trio": [[["H01", "H03", "H07"], 1230]], "wide": [...], ...}}
+# 払戻は 100 円あたりの金額（円）。券種名は logic.simulate.BET_TYPES と同じ。
+# date / venue は省略すると race_id（JV レースキー）の先頭 8 桁・9〜10 桁目から取る。
+
+
+def payout_key(bet_type: str, horse_ids: Iterable[str]) -> tuple[str, ...]:
+    """払戻表の検索キー。順不同の券種は horse_id を並べ替える。"""
+    try:
+        _, ordered = BET_TYPES[bet_type]
+    except KeyError:
+        raise ValueError(f"Unknown bet type: {bet_type!r} (expected one of {tuple(BET_TYPES)})") from None
+    ids = tuple(horse_ids)
+    return ids if ordered else tuple(sorted(ids))
+
+
+@dataclass(frozen=True)
+class HistoricalRace:
+    card: RaceCard
+    date: int
+    venue: str
+    # 確定着順（1 着から）
+    finish: tuple[str, ...]
+    # 券種 -> payout_key -> 100 円あたり払戻（円）
+    payouts: dict[str, dict[tuple[str, ...], int]] = field(default_factory=dict)
+
+    @property
+    def race_id(self) -> str:
+        return self.card.race_id
+
+    def payout(self, bet_type: str, horse_ids: Iterable[str]) -> int:
+        """100 円あたりの払戻。外れは 0。"""
+        return self.payouts.get(bet_type, {}).get(payout_key(bet_type, horse_ids), 0)
+
+
+def race_from_json(obj: dict) -> HistoricalRace:
+    race_id = str(obj["race_id"])
+    card = RaceCard(race_id, [HorseEntry(str(h), str(n), float(p)) for h, n, p in obj["horses"]])
+    payouts = {
+        bet_type: {payout_key(bet_type, ids): int(yen) for ids, yen in rows}
+        for bet_type, rows in obj.get("payouts", {}).items()
+    }
+    return HistoricalRace(
+        card=card,
+        date=int(obj.get("date") or race_id[:8]),
+        venue=str(obj.get("venue") or race_id[8:10]),
+        finish=tuple(obj.get("finish", ())),
+        payouts=payouts,
+    )
+
+
+def race_to_json(race: HistoricalRace) -> dict:
+    return {
+        "race_id": race.race_id,
+        "date": race.date,
+        "venue": race.venue,
+        "horses": [[h.horse_id, h.name, h.p_top3] for h in race.card.horses],
+        "finish": list(race.finish),
+        "payouts": {b: [[list(k), yen] for k, yen in rows.items()] for b, rows in race.payouts.items()},
+    }
+
+
+def _open_text(path: Path, mode: str) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8", newline="\n")
+
+
+def iter_history_lines(paths: Iterable[str | Path]) -> Iterator[str]:
+    """ファイルの順・行の順にレースの行を返す（空行は飛ばす）。ファイル全体は読み込まない。"""
+    for path in paths:
+        with _open_text(Path(path), "r") as f:
+            for line in f:
+                if line.strip():
+                    yield line
+
+
+def iter_history(paths: Iterable[str | Path]) -> Iterator[HistoricalRace]:
+    for line in iter_history_lines(paths):
+        yield race_from_json(json.loads(line))
+
+
+def write_history(path: str | Path, races: Iterable[HistoricalRace]) -> int:
+    """races を NDJSON（.gz なら gzip）に書き、書いたレース数を返す。"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    n = 0
+    with _open_text(path, "w") as f:
+        for race in races:
+            f.write(json.dumps(race_to_json(race), ensure_ascii=False, separators=(",", ":")) + "\n")
+            n += 1
+    return n
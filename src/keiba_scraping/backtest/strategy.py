@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import importlib
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from keiba_scraping.app.predict import box_for_race, check_select
+from keiba_scraping.domain.models import RaceCard
+
+
+@dataclass(frozen=True)
+class Bet:
+    bet_type: str
+    horse_ids: tuple[str, ...]
+    # 購入額（円）
+    stake: int
+
+
+# 戦略: 出馬表（予想時点の情報だけ）-> 買う馬券。ワーカープロセスに渡すので pickle できること
+# （モジュール直下の関数か、dataclass などのインスタンス）。
+Strategy = Callable[[RaceCard], list[Bet]]
+
+
+@dataclass(frozen=True)
+class BoxStrategy:
+    """app/predict.py と同じ 3 連複 BOX を 1 点 stake 円ずつ買う。"""
+
+    select: int = 5
+    top_k: int | None = None
+    scoring: str = "product"
+    stake: int = 100
+
+    def __post_init__(self) -> None:
+        check_select(self.select, self.top_k, self.scoring)
+
+    def __call__(self, race: RaceCard) -> list[Bet]:
+        _, combos = box_for_race(race, self.select, self.top_k, self.scoring)
+        return [Bet("trio", c.horse_ids, self.stake) for c in combos]
+
+
+STRATEGIES: dict[str, type] = {"box": BoxStrategy}
+
+
+def load_strategy(spec: str, **kwargs: object) -> Strategy:
+    """"box" などの登録名か "パッケージ.モジュール:名前" から戦略を作る。
+
+    名前がクラスなら kwargs で作り、関数などはそのまま使う（kwargs は渡せない）。
+    """
+    if spec in STRATEGIES:
+        return STRATEGIES[spec](**kwargs)
+    module_name, sep, attr = spec.partition(":")
+    if not sep:
+        raise ValueError(f"Unknown strategy: {spec!r} (expected one of {tuple(STRATEGIES)} or 'module:name')")
+    obj = getattr(importlib.import_module(module_name), attr)
+    if isinstance(obj, type):
+        return obj(**kwargs)
+    if kwargs:
+        raise ValueError(f"strategy {spec!r} is not a class and takes no options")
+    return obj
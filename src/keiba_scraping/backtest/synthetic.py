@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from datetime import date, timedelta
+from itertools import combinations, permutations
+
+import numpy as np
+
+from keiba_scraping.backtest.history import HistoricalRace, payout_key
+from keiba_scraping.domain.models import HorseEntry, RaceCard
+from keiba_scraping.logic.harville import trifecta_probabilities, win_strength_from_p_top3
+from keiba_scraping.logic.simulate import sample_top3
+
+# テスト・ベンチマーク用の架空の過去レース。
+# 予想（p_top3）・実際の強さ・市場（オッズ）はそれぞれ少しずつずらしてあるので、
+# 予想が当たりすぎず、払戻も控除率どおりにはならない。
+
+_VENUES = ("01", "02", "03", "04", "05", "06", "07", "08", "09", "10")
+_TAKEOUT = {"win": 0.8, "show": 0.8, "quinella": 0.775, "exacta": 0.75, "wide": 0.775, "trio": 0.75, "trifecta": 0.725}
+
+
+def _winning_probs(market: np.ndarray, top3: list[int]) -> dict[str, list[tuple[tuple[int, ...], float]]]:
+    """実際の上位 3 頭で当たる馬券と、その市場での的中確率（Harville）。
+
+    ticket_probabilities を券種ごとに呼ぶと 3 連単テンソルを毎回作るので、ここでは 1 回で済ませる。
+    """
+    T = trifecta_probabilities(market)
+    a, b, c = top3
+    first, second, third = T.sum(axis=(1, 2)), T.sum(axis=(0, 2)), T.sum(axis=(0, 1))
+    runners = int(np.count_nonzero(market))
+    show = first + second + (third if runners > 7 else 0.0)
+    exacta = T.sum(axis=2)
+    both = exacta + T.sum(axis=1) + T.sum(axis=0)
+    return {
+        "win": [((a,), first[a])],
+        "show": [((h,), show[h]) for h in (top3 if runners > 7 else top3[:2])],
+        "quinella": [((a, b), exacta[a, b] + exacta[b, a])],
+        "exacta": [((a, b), exacta[a, b])],
+        "wide": [((i, j), both[i, j] + both[j, i]) for i, j in combinations(top3, 2)],
+        "trio": [((a, b, c), sum(T[i, j, k] for i, j, k in permutations(top3)))],
+        "trifecta": [((a, b, c), T[a, b, c])],
+    }
+
+
+def synthetic_history(
+    races: int,
+    seed: int = 0,
+    start: date = date(2014, 1, 5),
+    venues_per_day: int = 3,
+    noise: float = 0.3,
+) -> Iterator[HistoricalRace]:
+    """1 日 venues_per_day 場 × 12R で races 件の過去レースを作る（同じ seed なら同じ内容）。"""
+    rng = np.random.default_rng(seed)
+    day = start
+    made = 0
+    while made < races:
+        venues = rng.choice(_VENUES, size=venues_per_day, replace=False)
+        for venue in sorted(venues):
+            for r in range(1, 13):
+                if made >= races:
+                    return
+                yield _race(rng, f"{day:%Y%m%d}{venue}0101{r:02d}", int(f"{day:%Y%m%d}"), str(venue), noise)
+                made += 1
+        day += timedelta(days=7 if day.weekday() == 6 else 1)  # 土日開催
+
+
+def _race(rng: np.random.Generator, race_id: str, race_date: int, venue: str, noise: float) -> HistoricalRace:
+    n = int(rng.integers(8, 19))
+    p_top3 = rng.uniform(0.05, 0.7, n)
+    strength = win_strength_from_p_top3(p_top3)
+    true = strength * rng.lognormal(0, noise, n)
+    market = strength * rng.lognormal(0, noise, n)
+
+    top3 = sample_top3(true, 1, rng)[0].tolist()
+    ids = [f"H{i + 1:02d}" for i in range(n)]
+    payouts: dict[str, dict[tuple[str, ...], int]] = {}
+    for bet_type, winners in _winning_probs(market, top3).items():
+        # 払戻は 10 円単位、最低 100 円（元返し）
+        payouts[bet_type] = {
+            payout_key(bet_type, (ids[i] for i in t)): max(int(_TAKEOUT[bet_type] / p * 10) * 10, 100)
+            for t, p in winners
+        }
+
+    card = RaceCard(race_id, [HorseEntry(ids[i], f"Horse{i + 1:02d}", round(float(p_top3[i]), 4)) for i in range(n)])
+    return HistoricalRace(card, race_date, venue, tuple(ids[i] for i in top3), payouts)
+
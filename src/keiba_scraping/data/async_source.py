@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import weakref
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from concurrent.futures import Executor
+
+from keiba_scraping.data.source import RaceCardSource
+from keiba_scraping.domain.models import RaceCard
+
+# asyncio 版の RaceCardSource。
+# get_race_card() は同時実行数（max_concurrency）と 1 件ごとの制限時間（timeout 秒）をかけて fetch_race_card() を呼ぶ。
+# 制限時間を過ぎた取得はキャンセルされ（サブプロセスなら kill）、TimeoutError になる。
+# 待ち時間は枠を取ってから数えるので、順番待ちで時間切れになることはない。
+
+
+class AsyncRaceCardSource(ABC):
+    def __init__(self, max_concurrency: int = 4, timeout: float | None = None) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        # Semaphore はイベントループごとに作る（asyncio.run を何度呼んでも使えるように）
+        self._semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @abstractmethod
+    async def fetch_race_card(self, race_id: str) -> RaceCard:
+        """1 件取得する（同時実行数・制限時間は呼び出し側でかける）。"""
+        raise NotImplementedError
+
+    def data_version(self) -> str | None:
+        return None
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        sem = self._semaphores.get(loop)
+        if sem is None:
+            sem = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return sem
+
+    async def get_race_card(self, race_id: str) -> RaceCard:
+        async with self._semaphore():
+            try:
+                async with asyncio.timeout(self.timeout):
+                    return await self.fetch_race_card(race_id)
+            except TimeoutError:
+                raise TimeoutError(f"race_id={race_id}: no response within {self.timeout}s") from None
+
+    async def get_race_cards(
+        self, race_ids: Sequence[str], return_exceptions: bool = False
+    ) -> list[RaceCard | BaseException]:
+        """race_ids の順に返す。return_exceptions=False なら最初の失敗で残りをキャンセルして例外を投げる。"""
+        tasks = [asyncio.ensure_future(self.get_race_card(race_id)) for race_id in race_ids]
+        try:
+            return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class ThreadedRaceCardSource(AsyncRaceCardSource):
+    """同期の RaceCardSource をスレッドで動かす async 版。
+
+    スレッドは止められないので、時間切れの取得は結果を捨てるだけで裏では最後まで走る。
+    """
+
+    def __init__(
+        self,
+        source: RaceCardSource,
+        max_concurrency: int = 4,
+        timeout: float | None = None,
+        executor: Executor | None = None,
+    ) -> None:
+        super().__init__(max_concurrency, timeout)
+        self.source = source
+        self.executor = executor
+
+    def data_version(self) -> str | None:
+        return self.source.data_version()
+
+    async def fetch_race_card(self, race_id: str) -> RaceCard:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.source.get_race_card, race_id)
+
+
+class BlockingRaceCardSource(RaceCardSource):
+    """AsyncRaceCardSource を同期の RaceCardSource として使う（呼ぶたびに asyncio.run）。
+
+    イベントループの中からは呼べない。そこでは元の async 版を await すること。
+    """
+
+    def __init__(self, source: AsyncRaceCardSource) -> None:
+        self.source = source
+
+    def data_version(self) -> str | None:
+        return self.source.data_version()
+
+    def get_race_card(self, race_id: str) -> RaceCard:
+        return asyncio.run(self.source.get_race_card(race_id))
+
+    def get_race_cards(
+        self, race_ids: Sequence[str], return_exceptions: bool = False
+    ) -> list[RaceCard | BaseException]:
+        return asyncio.run(self.source.get_race_cards(race_ids, return_exceptions))
+
+
+def as_async(source: RaceCardSource | AsyncRaceCardSource, max_concurrency: int = 4) -> AsyncRaceCardSource:
+    if isinstance(source, AsyncRaceCardSource):
+        return source
+    if isinstance(source, BlockingRaceCardSource):
+        return source.source
+    return ThreadedRaceCardSource(source, max_concurrency=max_concurrency)
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from keiba_scraping.data.source import RaceCardSource
+from keiba_scraping.domain.models import HorseEntry, RaceCard
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    disk_hits: int = 0
+    disk_writes: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+def _card_size(card: RaceCard) -> int:
+    """メモリ上のおおよそのバイト数（上限判定用の見積もり）。"""
+    return 200 + sum(120 + len(h.horse_id) + 2 * len(h.name) for h in card.horses)
+
+
+def _card_to_json(card: RaceCard) -> dict:
+    return {"race_id": card.race_id, "horses": [[h.horse_id, h.name, h.p_top3] for h in card.horses]}
+
+
+def _card_from_json(obj: dict) -> RaceCard:
+    return RaceCard(race_id=obj["race_id"], horses=[HorseEntry(i, n, float(p)) for i, n, p in obj["horses"]])
+
+
+class CachedRaceCardSource(RaceCardSource):
+    """任意の RaceCardSource を包む 2 段キャッシュ。
+
+    1 段目はプロセス内の LRU（件数・見積もりバイト数の上限と TTL 付き）。
+    2 段目は cache_dir 以下の JSON で、キーは race_id + 元ソースの data_version()。
+    data_version() が None のソースは 2 段目を使わない。
+    """
+
+    def __init__(
+        self,
+        inner: RaceCardSource,
+        max_entries: int = 256,
+        max_bytes: int = 16 * 1024 * 1024,
+        ttl_sec: float | None = 300.0,
+        cache_dir: str | Path | None = None,
+    ):
+        self.inner = inner
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_sec = ttl_sec
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, tuple[float, int, RaceCard]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def data_version(self) -> str | None:
+        return self.inner.data_version()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    # ── memory tier ──────────────────────────────────────────────────────────
+
+    def _memory_get(self, race_id: str) -> RaceCard | None:
+        entry = self._entries.get(race_id)
+        if entry is None:
+            return None
+        expires_at, size, card = entry
+        if expires_at < time.monotonic():
+            del self._entries[race_id]
+            self._bytes -= size
+            self.stats.expirations += 1
+            return None
+        self._entries.move_to_end(race_id)
+        return card
+
+    def _memory_put(self, race_id: str, card: RaceCard) -> None:
+        size = _card_size(card)
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(race_id, None)
+        if old is not None:
+            self._bytes -= old[1]
+        expires_at = time.monotonic() + self.ttl_sec if self.ttl_sec is not None else float("inf")
+        self._entries[race_id] = (expires_at, size, card)
+        self._bytes += size
+        # 古い順に追い出す
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.stats.evictions += 1
+
+    # ── disk tier ────────────────────────────────────────────────────────────
+
+    def _disk_path(self, race_id: str, version: str) -> Path:
+        assert self.cache_dir is not None
+        version_dir = hashlib.sha1(f"{type(self.inner).__name__}:{version}".encode()).hexdigest()[:16]
+        name = re.sub(r"[^0-9A-Za-z_.-]", "_", race_id)
+        return self.cache_dir / version_dir / f"{name}.json"
+
+    def _disk_get(self, race_id: str, version: str) -> RaceCard | None:
+        path = self._disk_path(race_id, version)
+        try:
+            obj = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if obj.get("race_id") != race_id:
+            return None
+        return _card_from_json(obj)
+
+    def _disk_put(self, race_id: str, version: str, card: RaceCard) -> None:
+        path = self._disk_path(race_id, version)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(_card_to_json(card), ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+        with self._lock:
+            self.stats.disk_writes += 1
+
+    # ── RaceCardSource ───────────────────────────────────────────────────────
+
+    def get_race_card(self, race_id: str) -> RaceCard:
+        with self._lock:
+            card = self._memory_get(race_id)
+            if card is not None:
+                self.stats.hits += 1
+                return card
+
+        version = self.inner.data_version() if self.cache_dir is not None else None
+        if version is not None:
+            card = self._disk_get(race_id, version)
+            if card is not None:
+                with self._lock:
+                    self.stats.disk_hits += 1
+                    self._memory_put(race_id, card)
+                return card
+
+        card = self.inner.get_race_card(race_id)
+        with self._lock:
+            self.stats.misses += 1
+            self._memory_put(race_id, card)
+        if version is not None:
+            self._disk_put(race_id, version, card)
+        return card
+
+    def invalidate(self, race_id: str | None = None) -> None:
+        """メモリ上のエントリを捨てる（race_id 省略時は全件）。ディスクはバージョンで切り替わる。"""
+        with self._lock:
+            if race_id is None:
+                self._entries.clear()
+                self._bytes = 0
+            else:
+                entry = self._entries.pop(race_id, None)
+                if entry is not None:
+                    self._bytes -= entry[1]
@@ -1,12 +1,44 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
+from keiba_scraping.data.async_source import AsyncRaceCardSource, ThreadedRaceCardSource
 from keiba_scraping.data.source import RaceCardSource
 from keiba_scraping.data.stub_source import StubRaceCardSource
+from keiba_scraping.profiling.trace import span
 
 
-def create_source(source_name: str) -> RaceCardSource:
+def create_source(source_name: str, cache: bool = False) -> RaceCardSource:
+    with span("create_source", source=source_name, cache=cache):
+        source = _create_source(source_name)
+        if cache:
+            from keiba_scraping.data.cache import CachedRaceCardSource
+
+            # 既定は <repo>/data/cache。KEIBA_CACHE_DIR で上書き
+            repo_root = Path(__file__).resolve().parents[3]
+            cache_dir = os.environ.get("KEIBA_CACHE_DIR") or repo_root / "data" / "cache"
+
+            return CachedRaceCardSource(source, cache_dir=cache_dir)
+        return source
+
+
+def create_async_source(
+    source_name: str, cache: bool = False, max_concurrency: int = 4, timeout: float | None = 120.0
+) -> AsyncRaceCardSource:
+    """datalab はヘルパーを asyncio のサブプロセスで並べる。ほか（とキャッシュ付き・常駐ワーカー）は同期版をスレッドで動かす。"""
+    source = create_source(source_name, cache=cache)
+    if not cache and source_name.lower().strip() == "datalab":
+        from keiba_scraping.datalab.async_source import AsyncDataLabRaceCardSource
+        from keiba_scraping.datalab.source import DataLabRaceCardSource
+
+        # 常駐ワーカー版（PooledDataLabRaceCardSource）はスレッドから呼ぶ
+        if isinstance(source, DataLabRaceCardSource):
+            return AsyncDataLabRaceCardSource(source.python32_path, source.repo_root, max_concurrency, timeout)
+    return ThreadedRaceCardSource(source, max_concurrency, timeout)
+
+
+def _create_source(source_name: str) -> RaceCardSource:
     source_name = source_name.lower().strip()
     if source_name == "stub":
         return StubRaceCardSource()
@@ -14,12 +46,31 @@ def create_source(source_name: str) -> RaceCardSource:
     if source_name == "datalab":
         from keiba_scraping.datalab.source import DataLabRaceCardSource
 
-        # あなたの環境で確認済みの 32bit Python
-        python32 = r"C:\Users\takuma_asayao\AppData\Local\Programs\Python\Python313-32\python.exe"
+        # あなたの環境で確認済みの 32bit Python。KEIBA_PYTHON32 で上書き（fake_bridge.py なら普通の Python で足りる）
+        python32 = (
+            os.environ.get("KEIBA_PYTHON32")
+            or r"C:\Users\takuma_asayao\AppData\Local\Programs\Python\Python313-32\python.exe"
+        )
 
         # リポジトリルート推定（src/keiba_scraping/data/factory.py から3つ上）
         repo_root = Path(__file__).resolve().parents[3]
 
+        # KEIBA_DATALAB_WORKERS=N なら 32bit ヘルパーを N 本常駐させる（0 は 1 件ごとに起動）
+        workers = int(os.environ.get("KEIBA_DATALAB_WORKERS", "0"))
+        if workers > 0:
+            from keiba_scraping.datalab.worker_pool import PooledDataLabRaceCardSource
+
+            return PooledDataLabRaceCardSource(python32, repo_root, workers)
+
         return DataLabRaceCardSource(python32_path=python32, repo_root=repo_root)
 
+    if source_name == "store":
+        from keiba_scraping.store.source import StoreRaceCardSource
+
+        # 既定は <repo>/data/store。KEIBA_STORE_DIR で上書き
+        repo_root = Path(__file__).resolve().parents[3]
+        store_dir = os.environ.get("KEIBA_STORE_DIR") or repo_root / "data" / "store"
+
+        return StoreRaceCardSource(store_dir=Path(store_dir))
+
     raise ValueError(f"Unknown source: {source_name}")
\ No newline at end of file
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+# 券種ごとの頭数（keiba_scraping.logic.simulate.BET_TYPES と同じ名前）
+BET_SIZES: dict[str, int] = {"win": 1, "show": 1, "quinella": 2, "exacta": 2, "wide": 2, "trio": 3, "trifecta": 3}
+
+
+@dataclass
+class OddsTable:
+    """1 レースのオッズ。券種ごとに horse_id の組とオッズを同じ並びで持つ。
+
+    オッズは 100 円あたりの払戻 / 100（JRA の表示と同じ。12.3 なら 100 円で 1,230 円）。
+    ワイド・複勝のように幅で出る券種は下限を入れる。
+    """
+
+    race_id: str
+    tickets: dict[str, list[tuple[str, ...]]] = field(default_factory=dict)
+    odds: dict[str, list[float]] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self.tickets.values())
+
+    def add(self, bet_type: str, horse_ids: tuple[str, ...], odds: float) -> None:
+        size = BET_SIZES.get(bet_type)
+        if size is None:
+            raise ValueError(f"Unknown bet type: {bet_type!r} (expected one of {tuple(BET_SIZES)})")
+        if len(horse_ids) != size:
+            raise ValueError(f"{bet_type} takes {size} horses, got {horse_ids}")
+        self.tickets.setdefault(bet_type, []).append(horse_ids)
+        self.odds.setdefault(bet_type, []).append(odds)
+
+    def odds_array(self, bet_type: str) -> np.ndarray:
+        return np.asarray(self.odds.get(bet_type, []), dtype=np.float64)
+
+
+def read_odds_csv(path: str | Path, race_id: str) -> OddsTable:
+    """列 bet_type,horse1,horse2,horse3,odds（race_id 列があればそのレースの行だけ）の CSV を読む。
+
+    馬は horse_id で書き、使わない列は空欄。
+    """
+    table = OddsTable(race_id)
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if row.get("race_id") and row["race_id"] != race_id:
+                continue
+            odds = (row.get("odds") or "").strip()
+            if not odds:
+                continue
+            horses = tuple(h.strip() for h in (row.get("horse1"), row.get("horse2"), row.get("horse3")) if h and h.strip())
+            table.add(row["bet_type"].strip().lower(), horses, float(odds))
+    if not len(table):
+        raise LookupError(f"No odds for race_id={race_id} in {path}")
+    return table
@@ -8,4 +8,11 @@ from keiba_scraping.domain.models import RaceCard
 class RaceCardSource(ABC):
     @abstractmethod
     def get_race_card(self, race_id: str) -> RaceCard:
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    def data_version(self) -> str | None:
+        """返すデータの版。同じ版なら同じ race_id に同じ RaceCard を返す。
+
+        永続キャッシュのキーに使う。版を決められない（刻々と変わる）ソースは None。
+        """
+        return None
\ No newline at end of file
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+from datetime import datetime, timedelta
+
 from keiba_scraping.data.source import RaceCardSource
 from keiba_scraping.domain.models import HorseEntry, RaceCard
 
 
 class StubRaceCardSource(RaceCardSource):
+    def data_version(self) -> str | None:
+        return "stub-1"
+
     def get_race_card(self, race_id: str) -> RaceCard:
         # MVP用の仮データ（後でDataLab/JV-Linkに差し替え）
         horses = [
@@ -17,4 +22,15 @@ class StubRaceCardSource(RaceCardSource):
             HorseEntry("H07", "HorseG", 0.31),
             HorseEntry("H08", "HorseH", 0.28),
         ]
-        return RaceCard(race_id=race_id, horses=horses)
\ No newline at end of file
+        return RaceCard(race_id=race_id, horses=horses)
+
+    def race_ids_between(self, date_from: int, date_to: int) -> list[str]:
+        # 仮データ: 毎日 3 場 × 12R（JV レースキー形式）
+        day = datetime.strptime(str(date_from), "%Y%m%d")
+        last = datetime.strptime(str(date_to), "%Y%m%d")
+        race_ids = []
+        while day <= last:
+            for jyo in ("05", "06", "09"):
+                race_ids.extend(f"{day:%Y%m%d}{jyo}0101{r:02d}" for r in range(1, 13))
+            day += timedelta(days=1)
+        return race_ids
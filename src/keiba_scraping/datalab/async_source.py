@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import asyncio
+import locale
+from pathlib import Path
+from typing import Any
+
+from keiba_scraping.data.async_source import AsyncRaceCardSource
+from keiba_scraping.datalab.source import RACE_HELPER, check_race_id, parse_helper_output, race_card_from_payload
+from keiba_scraping.domain.models import RaceCard
+from keiba_scraping.profiling.trace import span
+
+
+class AsyncDataLabRaceCardSource(AsyncRaceCardSource):
+    """DataLabRaceCardSource の asyncio 版。32bit ヘルパーを最大 max_concurrency 本まで同時に起動する。
+
+    時間切れ・キャンセルではヘルパーを kill して回収する（ゾンビを残さない）。
+    helper はテスト用に差し替えられる（repo_root からの相対パス）。
+    """
+
+    def __init__(
+        self,
+        python32_path: str,
+        repo_root: Path,
+        max_concurrency: int = 4,
+        timeout: float | None = 120.0,
+        helper: str = RACE_HELPER,
+    ) -> None:
+        super().__init__(max_concurrency, timeout)
+        self.python32_path = python32_path
+        self.repo_root = repo_root
+        self.helper = helper
+
+    async def _run_32bit(self, rel_script_path: str, *args: str) -> dict[str, Any]:
+        script = (self.repo_root / rel_script_path).resolve()
+        if not script.exists():
+            raise FileNotFoundError(f"Missing 32-bit helper script: {script}")
+
+        with span("datalab.subprocess", script=rel_script_path):
+            proc = await asyncio.create_subprocess_exec(
+                self.python32_path,
+                str(script),
+                *args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            try:
+                stdout, stderr = await proc.communicate()
+            except BaseException:
+                if proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
+                raise
+        # subprocess.run(text=True) と同じ復号
+        encoding = locale.getpreferredencoding(False)
+        return parse_helper_output(
+            stdout.decode(encoding, errors="replace"), stderr.decode(encoding, errors="replace"), proc.returncode
+        )
+
+    async def fetch_race_card(self, race_id: str) -> RaceCard:
+        check_race_id(race_id)
+        return race_card_from_payload(race_id, await self._run_32bit(self.helper, race_id))
@@ -7,6 +7,9 @@ from pathlib import Path
 from typing import Any
 
 from keiba_scraping.data.source import RaceCardSource
+from keiba_scraping.domain.models import RaceCard
+from keiba_scraping.jvdata.parser import TEXT_ENCODING, build_race_card, parse_record
+from keiba_scraping.profiling.trace import counter, span
 
 
 @dataclass(frozen=True)
@@ -14,37 +17,65 @@ class DataLabRaceCardSource(RaceCardSource):
     python32_path: str
     repo_root: Path
 
-    def _run_32bit(self, rel_script_path: str) -> dict[str, Any]:
+    def _run_32bit(self, rel_script_path: str, *args: str) -> dict[str, Any]:
         script = (self.repo_root / rel_script_path).resolve()
         if not script.exists():
             raise FileNotFoundError(f"Missing 32-bit helper script: {script}")
 
-        proc = subprocess.run(
-            [self.python32_path, str(script)],
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-        out = (proc.stdout or "").strip()
-        if not out:
-            raise RuntimeError(f"32-bit helper returned empty stdout. stderr={proc.stderr!r}")
-
-        try:
+        with span("datalab.subprocess", script=rel_script_path):
+            proc = subprocess.run(
+                [self.python32_path, str(script), *args],
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+        return parse_helper_output(proc.stdout or "", proc.stderr or "", proc.returncode)
+
+    def get_race_card(self, race_id: str) -> RaceCard:
+        check_race_id(race_id)
+        return race_card_from_payload(race_id, self._run_32bit(RACE_HELPER, race_id))
+
+
+# 32bit ヘルパー（tools/jvlink32/jvrace_records.py）との受け渡し。async 版（datalab/async_source.py）と共用
+
+RACE_HELPER = "tools/jvlink32/jvrace_records.py"
+
+
+def check_race_id(race_id: str) -> None:
+    if len(race_id) != 16 or not race_id.isdigit():
+        raise ValueError(f"DataLab race_id must be the 16-digit JV race key (YYYYMMDDJJKKNNRR): {race_id!r}")
+
+
+def parse_helper_output(stdout: str, stderr: str, returncode: int | None) -> dict[str, Any]:
+    out = stdout.strip()
+    counter("datalab.stdout_chars", len(out))
+    if not out:
+        raise RuntimeError(f"32-bit helper returned empty stdout. stderr={stderr!r}")
+
+    try:
+        with span("datalab.json"):
             payload = json.loads(out)
-        except Exception as e:
-            raise RuntimeError(f"Failed to parse helper JSON: {out!r}") from e
-
-        payload["_returncode"] = proc.returncode
-        if proc.stderr:
-            payload["_stderr"] = proc.stderr.strip()
-        return payload
-
-    def get_race_card(self, race_id: str):
-        # まずは疎通だけ。成功したらここから先を実装していく。
-        payload = self._run_32bit("tools/jvlink32/jvlink_ping.py")
-        if not payload.get("ok"):
-            raise RuntimeError(f"JV-Link ping failed: {payload}")
-
-        raise NotImplementedError(
-            "JV-Link connection OK. Next step: implement race card fetch/convert to RaceCard."
-        )
\ No newline at end of file
+    except Exception as e:
+        raise RuntimeError(f"Failed to parse helper JSON: {out!r}") from e
+
+    payload["_returncode"] = returncode
+    if stderr:
+        payload["_stderr"] = stderr.strip()
+    return payload
+
+
+def race_card_from_payload(race_id: str, payload: dict[str, Any]) -> RaceCard:
+    if not payload.get("ok"):
+        raise RuntimeError(f"JV-Link race fetch failed: {payload}")
+
+    with span("datalab.parse_records"):
+        se = []
+        records = payload.get("records", [])
+        for data in records:
+            rec = parse_record(data.encode(TEXT_ENCODING))
+            if rec.record_id == "SE":
+                se.append(rec)
+        counter("jv_records", len(records))
+        if not se:
+            raise LookupError(f"No SE records for race_id={race_id}")
+        return build_race_card(race_id, se)
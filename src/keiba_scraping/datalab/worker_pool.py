@@ -0,0 +1,414 @@
+from __future__ import annotations
+
+import json
+import os
+import queue
+import subprocess
+import threading
+import time
+from collections import Counter, deque
+from collections.abc import Sequence
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from keiba_scraping.data.source import RaceCardSource
+from keiba_scraping.datalab.source import RACE_HELPER, check_race_id, race_card_from_payload
+from keiba_scraping.domain.models import RaceCard
+from keiba_scraping.profiling.latency import LatencyStats
+from keiba_scraping.profiling.trace import counter, span
+
+# 32bit ヘルパーを N 本温めておき、要求を空いているワーカーに回す監督役。
+# ワーカー側は tools/jvlink32/helper_worker.py の serve()（1 行 1 JSON、別スレッドからハートビート）。
+#
+#   - 落ちた（stdout が EOF）・ハートビートが heartbeat_timeout 秒途切れた・要求が request_timeout 秒を
+#     超えたワーカーは kill して、バックオフ（restart_backoff_min * 2^n、上限 restart_backoff_max）後に起動し直す
+#   - そのとき処理中だった要求は待ち行列の先頭に戻し、空いている別のワーカーで max_attempts 回まで試す
+#   - metrics() で待ち行列の長さ・再起動回数・落ちた理由・レイテンシの分位点を返す
+
+
+class WorkerCrashed(RuntimeError):
+    """要求を処理中のワーカーが max_attempts 回とも落ちた・応答しなくなった。"""
+
+
+class _WorkerLost(Exception):
+    def __init__(self, reason: str, detail: str = ""):
+        super().__init__(f"{reason}: {detail}" if detail else reason)
+        self.reason = reason
+        self.served = 0  # そのワーカーが落ちる前に処理できた要求数
+
+
+def describe_exit_code(code: int | None) -> str:
+    """Windows の NTSTATUS（0xC0000409 など）は 16 進、POSIX のシグナルは番号も付ける。"""
+    if code is None:
+        return "still running"
+    if code < 0:
+        return f"{code} (signal {-code})"
+    if code > 0xFFFF:
+        return f"{code} (0x{code:08X})"
+    return str(code)
+
+
+@dataclass
+class _Request:
+    args: tuple[str, ...]
+    future: Future = field(default_factory=Future)
+    submitted: float = field(default_factory=time.perf_counter)
+    attempts: int = 0
+    errors: list[str] = field(default_factory=list)
+
+
+class _Worker:
+    """ワーカープロセス 1 本。stdout は読み取りスレッドが queue に流す（Windows のパイプは select できない）。"""
+
+    def __init__(self, command: Sequence[str], env: dict[str, str]):
+        self.proc = subprocess.Popen(
+            list(command), stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env
+        )
+        self.lines: queue.Queue[bytes | None] = queue.Queue()
+        self.stderr_tail: deque[bytes] = deque(maxlen=20)
+        self.last_seen = time.monotonic()
+        self._next_id = 1
+        threading.Thread(target=self._pump_stdout, daemon=True).start()
+        threading.Thread(target=lambda: self.stderr_tail.extend(self.proc.stderr), daemon=True).start()
+
+    def _pump_stdout(self) -> None:
+        for line in self.proc.stdout:
+            self.lines.put(line)
+        self.lines.put(None)
+
+    def _message(self, line: bytes | None) -> dict:
+        if line is None:
+            raise _WorkerLost("exit")
+        self.last_seen = time.monotonic()
+        try:
+            return json.loads(line)
+        except ValueError:
+            # ヘルパーが print したデバッグ出力など。生きている印としてだけ扱う
+            return {"type": "noise"}
+
+    def next_message(self, timeout: float) -> dict:
+        """次の 1 行。timeout 秒何も来なければ queue.Empty。"""
+        return self._message(self.lines.get(timeout=max(timeout, 0.0)))
+
+    def check(self, heartbeat_timeout: float) -> None:
+        """待機中のワーカーの生存確認（溜まったハートビートを読み捨てる）。"""
+        while True:
+            try:
+                self._message(self.lines.get_nowait())
+            except queue.Empty:
+                break
+        if time.monotonic() - self.last_seen > heartbeat_timeout:
+            raise _WorkerLost("heartbeat")
+
+    def send(self, args: tuple[str, ...]) -> int:
+        req_id = self._next_id
+        self._next_id += 1
+        try:
+            self.proc.stdin.write((json.dumps({"id": req_id, "args": list(args)}) + "\n").encode("ascii"))
+            self.proc.stdin.flush()
+        except OSError as exc:
+            raise _WorkerLost("exit") from exc
+        return req_id
+
+    def describe(self) -> str:
+        stderr = b"".join(self.stderr_tail).decode("utf-8", "replace").strip()
+        return f"pid {self.proc.pid} exit code {describe_exit_code(self.proc.poll())}; stderr: {stderr or '(empty)'}"
+
+    def kill(self) -> None:
+        if self.proc.poll() is None:
+            self.proc.kill()
+        self.proc.wait()
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.kill()
+
+
+class WorkerPool:
+    """command（helper_worker.serve を使う 32bit ヘルパー）を size 本常駐させる。submit / call はスレッドセーフ。"""
+
+    def __init__(
+        self,
+        command: Sequence[str],
+        size: int = 2,
+        env: dict[str, str] | None = None,
+        heartbeat_sec: float = 1.0,
+        heartbeat_timeout: float = 10.0,
+        request_timeout: float = 120.0,
+        start_timeout: float = 60.0,
+        max_attempts: int = 2,
+        restart_backoff_min: float = 0.5,
+        restart_backoff_max: float = 30.0,
+    ) -> None:
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be >= 1")
+        if heartbeat_timeout <= heartbeat_sec:
+            raise ValueError("heartbeat_timeout must be longer than heartbeat_sec")
+        self.command = list(command)
+        self.size = size
+        self.env = {**os.environ, **(env or {}), "KEIBA_WORKER_HEARTBEAT_SEC": str(heartbeat_sec)}
+        self.heartbeat_sec = heartbeat_sec
+        self.heartbeat_timeout = heartbeat_timeout
+        self.request_timeout = request_timeout
+        self.start_timeout = start_timeout
+        self.max_attempts = max_attempts
+        self.restart_backoff_min = restart_backoff_min
+        self.restart_backoff_max = restart_backoff_max
+
+        self._queue: deque[_Request] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._starting = 0
+        self._alive = 0
+        self._busy = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.retries = 0
+        self.restarts = 0
+        self.crashes: Counter[str] = Counter()
+        self.latency = LatencyStats()  # submit から結果まで（待ち行列を含む）
+        self.worker_latency = LatencyStats()  # ワーカーに送ってから応答まで
+        self._threads = [
+            threading.Thread(target=self._run_slot, name=f"datalab-worker-{i}", daemon=True) for i in range(size)
+        ]
+        for t in self._threads:
+            t.start()
+
+    # ── client ───────────────────────────────────────────────────────────────
+
+    def submit(self, *args: str) -> Future:
+        """Future の結果はヘルパーの payload（dict）。"""
+        req = _Request(tuple(args))
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("WorkerPool is closed")
+            self._queue.append(req)
+            self.submitted += 1
+            self._cond.notify()
+        return req.future
+
+    def call(self, *args: str, timeout: float | None = None) -> dict[str, Any]:
+        return self.submit(*args).result(timeout)
+
+    def metrics(self) -> dict[str, Any]:
+        with self._cond:
+            out: dict[str, Any] = {
+                "workers": self.size,
+                "alive": self._alive,
+                "busy": self._busy,
+                "idle": self._alive - self._busy,
+                "queue_depth": len(self._queue),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "retries": self.retries,
+                "restarts": self.restarts,
+                "crashes": dict(self.crashes),
+            }
+        out["latency"] = self.latency.to_dict()
+        out["worker_latency"] = self.worker_latency.to_dict()
+        return out
+
+    def close(self, timeout: float | None = 10.0) -> None:
+        """待ち行列の要求は失敗させ、処理中の要求は終わるのを待ってからワーカーを止める。"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            pending = list(self._queue)
+            self._queue.clear()
+            self._cond.notify_all()
+        for req in pending:
+            if req.attempts or req.future.set_running_or_notify_cancel():
+                req.future.set_exception(RuntimeError("WorkerPool closed before the request ran"))
+        for t in self._threads:
+            t.join(timeout)
+
+    def __enter__(self) -> WorkerPool:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # ── supervisor ───────────────────────────────────────────────────────────
+
+    def _run_slot(self) -> None:
+        failures = 0  # 連続して落ちた回数（バックオフ用）
+        started = False
+        while True:
+            if failures:
+                delay = min(self.restart_backoff_max, self.restart_backoff_min * 2 ** (failures - 1))
+                with self._cond:
+                    if self._cond.wait_for(lambda: self._closed, timeout=delay):
+                        return
+            with self._cond:
+                if self._closed:
+                    return
+                self._starting += 1
+            try:
+                worker = self._start_worker()
+            except _WorkerLost as lost:
+                with self._cond:
+                    self._starting -= 1
+                self._record_crash(lost.reason)
+                self._fail_if_no_worker(lost)
+                failures += 1
+                continue
+            if started:
+                with self._cond:
+                    self.restarts += 1
+                counter("datalab.worker_restarts")
+            started = True
+
+            with self._cond:
+                self._starting -= 1
+                self._alive += 1
+            try:
+                self._serve(worker)
+                worker.shutdown()
+                return
+            except _WorkerLost as lost:
+                worker.kill()
+                self._record_crash(lost.reason)
+                # 何件か処理できていたなら、たまたま落ちただけとみなしてバックオフを戻す
+                failures = 1 if lost.served else failures + 1
+            finally:
+                with self._cond:
+                    self._alive -= 1
+
+    def _start_worker(self) -> _Worker:
+        try:
+            worker = _Worker(self.command, self.env)
+        except OSError as exc:
+            raise _WorkerLost("start", str(exc)) from exc
+        deadline = time.monotonic() + self.start_timeout
+        try:
+            while True:
+                if worker.next_message(deadline - time.monotonic()).get("type") == "ready":
+                    return worker
+        except (queue.Empty, _WorkerLost):
+            worker.kill()
+            raise _WorkerLost("start", worker.describe()) from None
+
+    def _fail_if_no_worker(self, lost: _WorkerLost) -> None:
+        """起動できるワーカーが 1 本も無いあいだは、待たせずに待ち行列の要求を失敗させる。"""
+        with self._cond:
+            if self._alive or self._starting:
+                return
+            pending = [r for r in self._queue if r.attempts or r.future.set_running_or_notify_cancel()]
+            self._queue.clear()
+            self.failed += len(pending)
+        for req in pending:
+            req.future.set_exception(WorkerCrashed(f"32-bit worker could not be started: {lost}"))
+
+    def _record_crash(self, reason: str) -> None:
+        with self._cond:
+            self.crashes[reason] += 1
+        counter(f"datalab.worker_{reason}")
+
+    def _take(self, worker: _Worker) -> _Request | None:
+        """次の要求（閉じられたら None）。待っている間もワーカーの生存を確認する。"""
+        while True:
+            with self._cond:
+                while self._queue:
+                    req = self._queue.popleft()
+                    if req.attempts == 0 and not req.future.set_running_or_notify_cancel():
+                        continue  # 呼び出し側が cancel した
+                    self._busy += 1
+                    return req
+                if self._closed:
+                    return None
+                self._cond.wait(timeout=self.heartbeat_sec)
+                if self._queue or self._closed:
+                    continue
+            worker.check(self.heartbeat_timeout)
+
+    def _serve(self, worker: _Worker) -> int:
+        served = 0
+        while True:
+            try:
+                req = self._take(worker)
+            except _WorkerLost as lost:
+                lost.served = served
+                raise
+            if req is None:
+                return served
+            try:
+                payload, sec = self._roundtrip(worker, req)
+            except _WorkerLost as lost:
+                self._requeue_or_fail(req, lost.reason, worker)
+                lost.served = served
+                raise
+            served += 1
+            self.worker_latency.record(sec * 1000)
+            self.latency.record((time.perf_counter() - req.submitted) * 1000)
+            with self._cond:
+                self._busy -= 1
+                self.completed += 1
+            req.future.set_result(payload)
+
+    def _roundtrip(self, worker: _Worker, req: _Request) -> tuple[dict[str, Any], float]:
+        req.attempts += 1
+        t0 = time.perf_counter()
+        deadline = time.monotonic() + self.request_timeout
+        req_id = worker.send(req.args)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise _WorkerLost("timeout")
+            try:
+                msg = worker.next_message(min(self.heartbeat_timeout, remaining))
+            except queue.Empty:
+                raise _WorkerLost("timeout" if time.monotonic() >= deadline else "heartbeat") from None
+            if msg.get("type") == "response" and msg.get("id") == req_id:
+                return msg.get("payload") or {}, time.perf_counter() - t0
+
+    def _requeue_or_fail(self, req: _Request, reason: str, worker: _Worker) -> None:
+        worker.kill()
+        req.errors.append(f"{reason}: {worker.describe()}")
+        with self._cond:
+            self._busy -= 1
+            if req.attempts < self.max_attempts and not self._closed:
+                # 先頭に戻す。このスロットはバックオフ中なので、空いている別のワーカーが拾う
+                self._queue.appendleft(req)
+                self.retries += 1
+                self._cond.notify()
+                return
+            self.failed += 1
+        req.future.set_exception(
+            WorkerCrashed(f"32-bit worker failed {req.attempts} time(s) on {list(req.args)}: " + " | ".join(req.errors))
+        )
+
+
+class PooledDataLabRaceCardSource(RaceCardSource):
+    """DataLabRaceCardSource と同じ RaceCard を、常駐させた jvrace_records.py --worker から返す。"""
+
+    def __init__(
+        self, python32_path: str, repo_root: Path, workers: int = 2, helper: str = RACE_HELPER, **pool_options: Any
+    ) -> None:
+        script = (repo_root / helper).resolve()
+        if not script.exists():
+            raise FileNotFoundError(f"Missing 32-bit helper script: {script}")
+        self.python32_path = python32_path
+        self.repo_root = repo_root
+        self.pool = WorkerPool([python32_path, str(script), "--worker"], size=workers, **pool_options)
+
+    def get_race_card(self, race_id: str) -> RaceCard:
+        check_race_id(race_id)
+        with span("datalab.worker_request"):
+            payload = self.pool.call(race_id)
+        return race_card_from_payload(race_id, payload)
+
+    def close(self) -> None:
+        self.pool.close()
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+import numpy as np
+
+from keiba_scraping.domain.models import HorseEntry, RaceCard
+
+# 多数のレースを列（struct-of-arrays）でまとめて持つ。
+# 出走馬の列は全レース分を 1 本につなげ、レース r の馬は offsets[r]:offsets[r + 1]（CSR と同じ）。
+# horse_id・馬名は文字列表に 1 回だけ置き、各行は int32 の番号で参照する。
+# RaceView / HorseView は (batch, 行番号) だけを持つ薄いビューで、文字列や RaceCard は触ったときに作る。
+
+
+class _Interner:
+    def __init__(self) -> None:
+        self.codes: dict[str, int] = {}
+        self.table: list[str] = []
+
+    def __call__(self, s: str) -> int:
+        code = self.codes.get(s)
+        if code is None:
+            code = self.codes[s] = len(self.table)
+            self.table.append(s)
+        return code
+
+
+@dataclass(frozen=True, eq=False)
+class RaceBatch:
+    race_ids: tuple[str, ...]
+    # (len(race_ids) + 1,) int64。先頭は 0、末尾は全出走馬数
+    offsets: np.ndarray
+    # 以下は出走馬ごと（offsets[-1] 行）
+    horse_codes: np.ndarray
+    name_codes: np.ndarray
+    p_top3: np.ndarray
+    # 番号 -> 文字列
+    horse_table: tuple[str, ...]
+    name_table: tuple[str, ...]
+
+    def __post_init__(self) -> None:
+        n = int(self.offsets[-1]) if len(self.offsets) else 0
+        if len(self.offsets) != len(self.race_ids) + 1 or self.offsets[0] != 0:
+            raise ValueError(f"offsets must have len(race_ids) + 1 = {len(self.race_ids) + 1} entries starting at 0")
+        if np.any(np.diff(self.offsets) < 0):
+            raise ValueError("offsets must be non-decreasing")
+        for name in ("horse_codes", "name_codes", "p_top3"):
+            if len(getattr(self, name)) != n:
+                raise ValueError(f"{name} has {len(getattr(self, name))} rows, offsets say {n}")
+
+    # ── conversion ───────────────────────────────────────────────────────────
+
+    @classmethod
+    def from_cards(cls, cards: Iterable[RaceCard]) -> RaceBatch:
+        horse_intern, name_intern = _Interner(), _Interner()
+        race_ids: list[str] = []
+        counts: list[int] = []
+        horse_codes: list[int] = []
+        name_codes: list[int] = []
+        p_top3: list[float] = []
+        for card in cards:
+            race_ids.append(card.race_id)
+            counts.append(len(card.horses))
+            for h in card.horses:
+                horse_codes.append(horse_intern(h.horse_id))
+                name_codes.append(name_intern(h.name))
+                p_top3.append(h.p_top3)
+        offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(
+            tuple(race_ids),
+            offsets,
+            np.array(horse_codes, dtype=np.int32),
+            np.array(name_codes, dtype=np.int32),
+            np.array(p_top3, dtype=np.float64),
+            tuple(horse_intern.table),
+            tuple(name_intern.table),
+        )
+
+    def to_cards(self) -> list[RaceCard]:
+        return [view.to_card() for view in self]
+
+    # ── access ───────────────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return len(self.race_ids)
+
+    def __getitem__(self, r: int) -> RaceView:
+        if r < 0:
+            r += len(self.race_ids)
+        if not 0 <= r < len(self.race_ids):
+            raise IndexError(f"race index {r} out of range for {len(self.race_ids)} races")
+        return RaceView(self, r, int(self.offsets[r]), int(self.offsets[r + 1]))
+
+    def __iter__(self) -> Iterator[RaceView]:
+        bounds = self.offsets.tolist()
+        for r in range(len(self.race_ids)):
+            yield RaceView(self, r, bounds[r], bounds[r + 1])
+
+    def index(self, race_id: str) -> int:
+        try:
+            return self.race_ids.index(race_id)
+        except ValueError:
+            raise LookupError(f"race_id={race_id} not in batch") from None
+
+    @property
+    def runners(self) -> int:
+        return int(self.offsets[-1])
+
+    @property
+    def counts(self) -> np.ndarray:
+        """レースごとの頭数。"""
+        return np.diff(self.offsets)
+
+    @property
+    def race_of_runner(self) -> np.ndarray:
+        """出走馬の行 -> レース番号（np.add.reduceat などで使う）。"""
+        return np.repeat(np.arange(len(self.race_ids)), self.counts)
+
+    @property
+    def nbytes(self) -> int:
+        """配列部分のバイト数（文字列表は含まない）。"""
+        return sum(a.nbytes for a in (self.offsets, self.horse_codes, self.name_codes, self.p_top3))
+
+
+class RaceView:
+    """RaceCard と同じ属性を持つ、RaceBatch の 1 レース分のビュー。"""
+
+    __slots__ = ("batch", "r", "start", "stop", "_horses")
+
+    def __init__(self, batch: RaceBatch, r: int, start: int, stop: int) -> None:
+        self.batch = batch
+        self.r = r
+        # 出走馬の行範囲 [start, stop)
+        self.start = start
+        self.stop = stop
+        self._horses: list[HorseView] | None = None
+
+    @property
+    def race_id(self) -> str:
+        return self.batch.race_ids[self.r]
+
+    @property
+    def p_top3(self) -> np.ndarray:
+        """このレースの p_top3（コピーしないスライス）。"""
+        return self.batch.p_top3[self.start : self.stop]
+
+    @property
+    def horses(self) -> list[HorseView]:
+        if self._horses is None:
+            p_top3 = self.batch.p_top3[self.start : self.stop].tolist()
+            self._horses = [HorseView(self.batch, i, p) for i, p in zip(range(self.start, self.stop), p_top3)]
+        return self._horses
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def to_card(self) -> RaceCard:
+        b, lo, hi = self.batch, self.start, self.stop
+        horses = [
+            HorseEntry(b.horse_table[h], b.name_table[n], p)
+            for h, n, p in zip(b.horse_codes[lo:hi].tolist(), b.name_codes[lo:hi].tolist(), b.p_top3[lo:hi].tolist())
+        ]
+        return RaceCard(self.race_id, horses)
+
+    def __repr__(self) -> str:
+        return f"RaceView(race_id={self.race_id!r}, runners={len(self)})"
+
+
+class HorseView:
+    """HorseEntry と同じ属性を持つ、RaceBatch の出走馬 1 行分のビュー（p_top3 だけは作るときに読む）。"""
+
+    __slots__ = ("batch", "i", "p_top3")
+
+    def __init__(self, batch: RaceBatch, i: int, p_top3: float | None = None) -> None:
+        self.batch = batch
+        self.i = i
+        self.p_top3 = float(batch.p_top3[i]) if p_top3 is None else p_top3
+
+    @property
+    def horse_id(self) -> str:
+        return self.batch.horse_table[self.batch.horse_codes[self.i]]
+
+    @property
+    def name(self) -> str:
+        return self.batch.name_table[self.batch.name_codes[self.i]]
+
+    def to_entry(self) -> HorseEntry:
+        return HorseEntry(self.horse_id, self.name, self.p_top3)
+
+    def __repr__(self) -> str:
+        return f"HorseView(horse_id={self.horse_id!r}, name={self.name!r}, p_top3={self.p_top3})"
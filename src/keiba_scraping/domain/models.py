@@ -3,7 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 
-@dataclass(frozen=True)
+# 大量に作るので slots（1 件あたり __dict__ の分だけ小さい）。まとめて持つなら domain/batch.py の RaceBatch
+@dataclass(frozen=True, slots=True)
 class HorseEntry:
     horse_id: str
     name: str
@@ -11,7 +12,7 @@ class HorseEntry:
     p_top3: float
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RaceCard:
     race_id: str
     horses: list[HorseEntry]
\ No newline at end of file
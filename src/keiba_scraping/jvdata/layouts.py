@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass, field
+
+import numpy as np
+
+# JV-Data の固定長レコード定義（JV-Data 仕様書の「位置」は 1 始まり、長さはバイト数）。
+# kind: "int" 数値 / "str" ASCII コード類 / "text" Shift-JIS 文字列（参照時にデコード）
+# scale: 数値を scale で割って float にする（オッズ 0123 -> 12.3 など）
+
+
+@dataclass(frozen=True)
+class Field:
+    name: str
+    offset: int
+    length: int
+    kind: str = "str"
+    repeat: int = 1
+    scale: int | None = None
+
+
+@dataclass(frozen=True)
+class Group:
+    """繰り返し項目。fields の offset はグループ 1 件内での位置（1 始まり）。"""
+
+    name: str
+    offset: int
+    count: int
+    size: int
+    fields: tuple[Field, ...]
+
+
+@dataclass(frozen=True)
+class RecordLayout:
+    record_id: str
+    length: int
+    items: tuple[Field | Group, ...]
+    struct: struct.Struct = field(init=False, repr=False)
+    dtype: np.dtype = field(init=False, repr=False)
+    # name -> (struct の開始スロット, Field) / (開始スロット, Group)
+    slots: dict[str, tuple[int, Field | Group]] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        fmt = ["<"]
+        slots: dict[str, tuple[int, Field | Group]] = {}
+        names, formats, offsets = [], [], []
+        pos = 0
+        slot = 0
+        for item in self.items:
+            start = item.offset - 1
+            span = _span(item)
+            if start < pos:
+                raise ValueError(f"{self.record_id}.{item.name}: overlaps the previous item")
+            if start + span > self.length - 2:
+                raise ValueError(f"{self.record_id}.{item.name}: runs past the record end")
+            if start > pos:
+                fmt.append(f"{start - pos}x")
+            slots[item.name] = (slot, item)
+            if isinstance(item, Field):
+                fmt.append(f"{item.length}s" * item.repeat)
+                slot += item.repeat
+                formats.append((f"S{item.length}", (item.repeat,)) if item.repeat > 1 else f"S{item.length}")
+            else:
+                sub = _group_dtype(item)
+                for _ in range(item.count):
+                    gpos = 0
+                    for f in item.fields:
+                        if f.offset - 1 > gpos:
+                            fmt.append(f"{f.offset - 1 - gpos}x")
+                        fmt.append(f"{f.length}s" * f.repeat)
+                        gpos = f.offset - 1 + f.length * f.repeat
+                    if item.size > gpos:
+                        fmt.append(f"{item.size - gpos}x")
+                slot += item.count * sum(f.repeat for f in item.fields)
+                formats.append((sub, (item.count,)))
+            names.append(item.name)
+            offsets.append(start)
+            pos = start + span
+        fmt.append(f"{self.length - pos}x")
+
+        object.__setattr__(self, "struct", struct.Struct("".join(fmt)))
+        object.__setattr__(self, "slots", slots)
+        object.__setattr__(
+            self,
+            "dtype",
+            np.dtype({"names": names, "formats": formats, "offsets": offsets, "itemsize": self.length}),
+        )
+
+    def pack(self, values: dict[str, object]) -> bytes:
+        """values からレコードのバイト列を作る（テスト・合成データ用）。未指定は空白。"""
+        buf = bytearray(b" " * (self.length - 2) + b"\r\n")
+        buf[0:2] = self.record_id.encode("ascii")
+        for item in self.items:
+            if item.name not in values:
+                continue
+            v = values[item.name]
+            if isinstance(item, Field):
+                vs = v if item.repeat > 1 else [v]
+                for i, x in enumerate(vs):
+                    at = item.offset - 1 + i * item.length
+                    buf[at : at + item.length] = _encode(item, x)
+            else:
+                for i, elem in enumerate(v):  # type: ignore[arg-type]
+                    base = item.offset - 1 + i * item.size
+                    for f in item.fields:
+                        if f.name in elem:
+                            at = base + f.offset - 1
+                            buf[at : at + f.length] = _encode(f, elem[f.name])
+        return bytes(buf)
+
+
+def _span(item: Field | Group) -> int:
+    return item.length * item.repeat if isinstance(item, Field) else item.count * item.size
+
+
+def _group_dtype(group: Group) -> np.dtype:
+    return np.dtype(
+        {
+            "names": [f.name for f in group.fields],
+            "formats": [(f"S{f.length}", (f.repeat,)) if f.repeat > 1 else f"S{f.length}" for f in group.fields],
+            "offsets": [f.offset - 1 for f in group.fields],
+            "itemsize": group.size,
+        }
+    )
+
+
+def _encode(f: Field, value: object) -> bytes:
+    if f.kind == "int":
+        if value is None:
+            return b" " * f.length
+        n = round(float(value) * f.scale) if f.scale else int(value)  # type: ignore[arg-type]
+        return str(n).zfill(f.length)[-f.length :].encode("ascii")
+    raw = str(value).encode("cp932" if f.kind == "text" else "ascii")
+    return raw[: f.length].ljust(f.length, b" ")
+
+
+LAYOUTS: dict[str, RecordLayout] = {}
+
+
+def register(layout: RecordLayout) -> RecordLayout:
+    LAYOUTS[layout.record_id] = layout
+    return layout
+
+
+def get_layout(record_id: str) -> RecordLayout:
+    try:
+        return LAYOUTS[record_id]
+    except KeyError:
+        raise KeyError(f"No layout registered for record type {record_id!r}") from None
+
+
+# 全レコード共通の先頭 27 バイト。開催年〜レース番号の 16 バイトがレースキー（race_id）。
+_HEADER = (
+    Field("record_spec", 1, 2),
+    Field("data_kubun", 3, 1),
+    Field("make_date", 4, 8),
+    Field("year", 12, 4),
+    Field("month_day", 16, 4),
+    Field("jyo_cd", 20, 2),
+    Field("kaiji", 22, 2, "int"),
+    Field("nichiji", 24, 2, "int"),
+    Field("race_num", 26, 2, "int"),
+)
+RACE_KEY_SLICE = slice(11, 27)
+
+
+def _odds_header(flag: str) -> tuple[Field, ...]:
+    return _HEADER + (
+        Field("happyo_time", 28, 8),
+        Field("toroku_tosu", 36, 2, "int"),
+        Field("syusso_tosu", 38, 2, "int"),
+        Field(flag, 40, 1),
+    )
+
+
+# RA: レース詳細
+register(RecordLayout("RA", 1272, _HEADER + (
+    Field("youbi_cd", 28, 1),
+    Field("toku_num", 29, 4),
+    Field("hondai", 33, 60, "text"),
+    Field("fukudai", 93, 60, "text"),
+    Field("kakko", 153, 60, "text"),
+    Field("hondai_eng", 213, 120),
+    Field("ryakusyo10", 573, 20, "text"),
+    Field("ryakusyo6", 593, 12, "text"),
+    Field("ryakusyo3", 605, 6, "text"),
+    Field("kubun", 611, 1),
+    Field("nkai", 612, 3, "int"),
+    Field("grade_cd", 615, 1),
+    Field("grade_cd_before", 616, 1),
+    Field("syubetu_cd", 617, 2),
+    Field("kigo_cd", 619, 3),
+    Field("jyuryo_cd", 622, 1),
+    Field("jyoken_cd", 623, 3, repeat=5),
+    Field("jyoken_name", 638, 60, "text"),
+    Field("kyori", 698, 4, "int"),
+    Field("kyori_before", 702, 4, "int"),
+    Field("track_cd", 706, 2),
+    Field("track_cd_before", 708, 2),
+    Field("course_kubun_cd", 710, 2),
+    Field("course_kubun_cd_before", 712, 2),
+    Field("honsyokin", 714, 8, "int", repeat=7),
+    Field("honsyokin_before", 770, 8, "int", repeat=5),
+    Field("fukasyokin", 810, 8, "int", repeat=5),
+    Field("fukasyokin_before", 850, 8, "int", repeat=3),
+    Field("hasso_time", 874, 4),
+    Field("hasso_time_before", 878, 4),
+    Field("toroku_tosu", 882, 2, "int"),
+    Field("syusso_tosu", 884, 2, "int"),
+    Field("nyusen_tosu", 886, 2, "int"),
+    Field("tenko_cd", 888, 1),
+    Field("siba_baba_cd", 889, 1),
+    Field("dirt_baba_cd", 890, 1),
+    Field("lap_time", 891, 3, "int", repeat=25),
+    Field("syogai_mile_time", 966, 4, "int"),
+    Field("haron_time_s3", 970, 3, "int"),
+    Field("haron_time_s4", 973, 3, "int"),
+    Field("haron_time_l3", 976, 3, "int"),
+    Field("haron_time_l4", 979, 3, "int"),
+    Group("corner_info", 982, 4, 72, (
+        Field("corner", 1, 1),
+        Field("syukaisu", 2, 1),
+        Field("jyuni", 3, 70),
+    )),
+    Field("record_up_kubun", 1270, 1),
+)))
+
+# SE: 馬毎レース情報
+register(RecordLayout("SE", 555, _HEADER + (
+    Field("wakuban", 28, 1, "int"),
+    Field("umaban", 29, 2, "int"),
+    Field("ketto_num", 31, 10),
+    Field("bamei", 41, 36, "text"),
+    Field("uma_kigo_cd", 77, 2),
+    Field("sex_cd", 79, 1),
+    Field("hinsyu_cd", 80, 1),
+    Field("keiro_cd", 81, 2),
+    Field("barei", 83, 2, "int"),
+    Field("tozai_cd", 85, 1),
+    Field("chokyosi_code", 86, 5),
+    Field("chokyosi_ryakusyo", 91, 8, "text"),
+    Field("banusi_code", 99, 6),
+    Field("banusi_name", 105, 64, "text"),
+    Field("fukusyoku", 169, 60, "text"),
+    Field("futan", 289, 3, "int", scale=10),
+    Field("futan_before", 292, 3, "int", scale=10),
+    Field("blinker", 295, 1),
+    Field("kisyu_code", 297, 5),
+    Field("kisyu_code_before", 302, 5),
+    Field("kisyu_ryakusyo", 307, 8, "text"),
+    Field("kisyu_ryakusyo_before", 315, 8, "text"),
+    Field("minarai_cd", 323, 1),
+    Field("minarai_cd_before", 324, 1),
+    Field("ba_taijyu", 325, 3, "int"),
+    Field("zogen_fugo", 328, 1),
+    Field("zogen_sa", 329, 3, "int"),
+    Field("ijyo_cd", 332, 1),
+    Field("nyusen_jyuni", 333, 2, "int"),
+    Field("kakutei_jyuni", 335, 2, "int"),
+    Field("dochaku_kubun", 337, 1),
+    Field("dochaku_tosu", 338, 1, "int"),
+    Field("time", 339, 4, "int"),
+    Field("chakusa_cd", 343, 3),
+    Field("chakusa_cd_p", 346, 3),
+    Field("chakusa_cd_pp", 349, 3),
+    Field("jyuni_1c", 352, 2, "int"),
+    Field("jyuni_2c", 354, 2, "int"),
+    Field("jyuni_3c", 356, 2, "int"),
+    Field("jyuni_4c", 358, 2, "int"),
+    Field("odds", 360, 4, "int", scale=10),
+    Field("ninki", 364, 2, "int"),
+    Field("honsyokin", 366, 8, "int"),
+    Field("fukasyokin", 374, 8, "int"),
+    Field("haron_time_l4", 388, 3, "int"),
+    Field("haron_time_l3", 391, 3, "int"),
+    Group("chaku_uma_info", 394, 3, 46, (
+        Field("ketto_num", 1, 10),
+        Field("bamei", 11, 36, "text"),
+    )),
+    Field("time_diff", 532, 4),
+    Field("record_up_kubun", 536, 1),
+    Field("dm_kubun", 537, 1),
+    Field("dm_time", 538, 5),
+    Field("dm_gosa_p", 543, 4),
+    Field("dm_gosa_m", 547, 4),
+    Field("dm_jyuni", 551, 2, "int"),
+    Field("kyakusitu_kubun", 553, 1),
+)))
+
+
+def _pay(kumi_len: int, ninki_len: int) -> tuple[Field, ...]:
+    return (
+        Field("kumi", 1, kumi_len),
+        Field("pay", kumi_len + 1, 9, "int"),
+        Field("ninki", kumi_len + 10, ninki_len, "int"),
+    )
+
+
+# HR: 払戻
+register(RecordLayout("HR", 719, _HEADER + (
+    Field("toroku_tosu", 28, 2, "int"),
+    Field("syusso_tosu", 30, 2, "int"),
+    Field("fuseiritu_flag", 32, 1, repeat=9),
+    Field("tokubarai_flag", 41, 1, repeat=9),
+    Field("henkan_flag", 50, 1, repeat=9),
+    Field("henkan_uma", 59, 1, repeat=28),
+    Field("henkan_waku", 87, 1, repeat=8),
+    Field("henkan_do_waku", 95, 1, repeat=8),
+    Group("pay_tansyo", 103, 3, 13, _pay(2, 2)),
+    Group("pay_fukusyo", 142, 5, 13, _pay(2, 2)),
+    Group("pay_wakuren", 207, 3, 13, _pay(2, 2)),
+    Group("pay_umaren", 246, 3, 16, _pay(4, 3)),
+    Group("pay_wide", 294, 7, 16, _pay(4, 3)),
+    Group("pay_umatan", 454, 6, 16, _pay(4, 3)),
+    Group("pay_sanrenpuku", 550, 3, 18, _pay(6, 3)),
+    Group("pay_sanrentan", 604, 6, 19, _pay(6, 4)),
+)))
+
+
+def _odds(kumi_len: int, odds_len: int, ninki_len: int) -> tuple[Field, ...]:
+    return (
+        Field("kumi", 1, kumi_len),
+        Field("odds", kumi_len + 1, odds_len, "int", scale=10),
+        Field("ninki", kumi_len + odds_len + 1, ninki_len, "int"),
+    )
+
+
+def _odds_range(kumi_len: int, odds_len: int, ninki_len: int) -> tuple[Field, ...]:
+    return (
+        Field("kumi", 1, kumi_len),
+        Field("odds_low", kumi_len + 1, odds_len, "int", scale=10),
+        Field("odds_high", kumi_len + odds_len + 1, odds_len, "int", scale=10),
+        Field("ninki", kumi_len + 2 * odds_len + 1, ninki_len, "int"),
+    )
+
+
+# O1: 単勝・複勝・枠連オッズ
+register(RecordLayout("O1", 962, _HEADER + (
+    Field("happyo_time", 28, 8),
+    Field("toroku_tosu", 36, 2, "int"),
+    Field("syusso_tosu", 38, 2, "int"),
+    Field("tansyo_flag", 40, 1),
+    Field("fukusyo_flag", 41, 1),
+    Field("wakuren_flag", 42, 1),
+    Field("fuku_chaku_barai_key", 43, 1),
+    Group("odds_tansyo", 44, 28, 8, _odds(2, 4, 2)),
+    Group("odds_fukusyo", 268, 28, 12, _odds_range(2, 4, 2)),
+    Group("odds_wakuren", 604, 36, 9, _odds(2, 5, 2)),
+    Field("total_hyosu_tansyo", 928, 11, "int"),
+    Field("total_hyosu_fukusyo", 939, 11, "int"),
+    Field("total_hyosu_wakuren", 950, 11, "int"),
+)))
+
+# O2〜O6: 馬連・ワイド・馬単・3連複・3連単オッズ
+register(RecordLayout("O2", 2042, _odds_header("umaren_flag") + (
+    Group("odds_umaren", 41, 153, 13, _odds(4, 6, 3)),
+    Field("total_hyosu_umaren", 2030, 11, "int"),
+)))
+register(RecordLayout("O3", 2654, _odds_header("wide_flag") + (
+    Group("odds_wide", 41, 153, 17, _odds_range(4, 5, 3)),
+    Field("total_hyosu_wide", 2642, 11, "int"),
+)))
+register(RecordLayout("O4", 4031, _odds_header("umatan_flag") + (
+    Group("odds_umatan", 41, 306, 13, _odds(4, 6, 3)),
+    Field("total_hyosu_umatan", 4019, 11, "int"),
+)))
+register(RecordLayout("O5", 12293, _odds_header("sanrenpuku_flag") + (
+    Group("odds_sanrenpuku", 41, 816, 15, _odds(6, 6, 3)),
+    Field("total_hyosu_sanrenpuku", 12281, 11, "int"),
+)))
+register(RecordLayout("O6", 83285, _odds_header("sanrentan_flag") + (
+    Group("odds_sanrentan", 41, 4896, 17, _odds(6, 7, 4)),
+    Field("total_hyosu_sanrentan", 83273, 11, "int"),
+)))
@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+
+from keiba_scraping.domain.models import HorseEntry, RaceCard
+from keiba_scraping.jvdata.layouts import RACE_KEY_SLICE, Field, RecordLayout, get_layout
+
+# Shift-JIS（JV-Data は CP932 の機種依存文字を含む）
+TEXT_ENCODING = "cp932"
+
+
+def _convert(f: Field, raw: bytes) -> object:
+    if f.kind == "int":
+        s = raw.lstrip(b" ")
+        if not s.isdigit():
+            # 空白・"----"（取消）・"****"（未発売）などは欠損扱い
+            return None
+        return int(s) / f.scale if f.scale else int(s)
+    if f.kind == "text":
+        return raw.decode(TEXT_ENCODING, errors="replace").rstrip("　 ")
+    return raw.decode("ascii", errors="replace").rstrip()
+
+
+class JVRecord:
+    """1 レコードのビュー。各項目は参照されたときに変換する（文字列のデコードも遅延）。"""
+
+    __slots__ = ("layout", "raw", "_values", "_cache")
+
+    def __init__(self, layout: RecordLayout, raw: bytes, values: tuple[bytes, ...]):
+        self.layout = layout
+        self.raw = raw
+        self._values = values
+        self._cache: dict[str, object] = {}
+
+    @property
+    def record_id(self) -> str:
+        return self.layout.record_id
+
+    @property
+    def race_id(self) -> str:
+        return self.raw[RACE_KEY_SLICE].decode("ascii")
+
+    def __getitem__(self, name: str) -> object:
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
+        try:
+            slot, item = self.layout.slots[name]
+        except KeyError:
+            raise KeyError(f"{self.layout.record_id} has no field {name!r}") from None
+
+        vals = self._values
+        if isinstance(item, Field):
+            if item.repeat == 1:
+                value: object = _convert(item, vals[slot])
+            else:
+                value = [_convert(item, vals[slot + i]) for i in range(item.repeat)]
+        else:
+            value = []
+            for _ in range(item.count):
+                elem = {}
+                for f in item.fields:
+                    if f.repeat == 1:
+                        elem[f.name] = _convert(f, vals[slot])
+                    else:
+                        elem[f.name] = [_convert(f, vals[slot + i]) for i in range(f.repeat)]
+                    slot += f.repeat
+                value.append(elem)
+        self._cache[name] = value
+        return value
+
+    def __getattr__(self, name: str) -> object:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError as e:
+            raise AttributeError(str(e)) from None
+
+    def to_dict(self) -> dict[str, object]:
+        return {name: self[name] for name in self.layout.slots}
+
+    def __repr__(self) -> str:
+        return f"JVRecord({self.layout.record_id}, race_id={self.race_id!r})"
+
+
+def parse_record(data: bytes | bytearray | memoryview) -> JVRecord:
+    """1 レコード（CRLF 込み）を、先頭 2 バイトの種別 ID のレイアウトで解析する。"""
+    raw = bytes(data)
+    layout = get_layout(raw[:2].decode("ascii"))
+    if len(raw) < layout.length - 2:
+        raise ValueError(f"{layout.record_id} record is {len(raw)} bytes, expected {layout.length}")
+    if len(raw) < layout.length:
+        raw = raw.ljust(layout.length - 2, b" ") + b"\r\n"
+    return JVRecord(layout, raw, layout.struct.unpack_from(raw))
+
+
+# ── bulk decode ──────────────────────────────────────────────────────────────
+
+
+def ascii_to_number(digits: np.ndarray, scale: int | None = None) -> np.ndarray:
+    """(..., L) の uint8 ASCII 数字列をまとめて数値化する。先頭の空白以外に数字以外を含む値は欠損。
+
+    欠損は scale なし（int64）で -1、scale あり（float64）で NaN。
+    """
+    d = digits.astype(np.int16) - 48
+    blank = digits == 32
+    ok = np.all(((d >= 0) & (d <= 9)) | blank, axis=-1) & ~np.all(blank, axis=-1)
+    # 空白は先頭（右寄せの桁埋め）だけ。"1 2" のように数字の後に空白があれば欠損（_convert と同じ）
+    ok &= ~np.any(blank[..., 1:] & ~blank[..., :-1], axis=-1)
+    width = digits.shape[-1]
+    weights = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    values = np.where(blank, 0, d).astype(np.int64) @ weights
+    if scale:
+        return np.where(ok, values / scale, np.nan)
+    return np.where(ok, values, -1)
+
+
+class TextColumn:
+    """Shift-JIS 文字列の列。要素を参照したときにだけデコードする。"""
+
+    __slots__ = ("raw",)
+
+    def __init__(self, raw: np.ndarray):
+        self.raw = raw
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def __getitem__(self, i):
+        v = self.raw[i]
+        if isinstance(v, np.ndarray):
+            return TextColumn(v)
+        return v.decode(TEXT_ENCODING, errors="replace").rstrip("　 ")
+
+    def tolist(self) -> list[str]:
+        return [self[i] for i in range(len(self.raw))]
+
+
+class RecordColumns:
+    """同一種別レコードを列指向で保持する。数値列は初回参照時にベクトル化変換してキャッシュ。"""
+
+    def __init__(self, layout: RecordLayout, records: np.ndarray):
+        self.layout = layout
+        self.records = records
+        self._u8 = records.view(np.uint8).reshape(len(records), layout.length) if len(records) else (
+            np.zeros((0, layout.length), dtype=np.uint8)
+        )
+        self._cache: dict[str, object] = {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def race_id(self) -> np.ndarray:
+        """レースキー（開催年月日+場+回+日目+R の 16 バイト）の S16 配列。"""
+        if "race_id" not in self._cache:
+            key = np.ascontiguousarray(self._u8[:, RACE_KEY_SLICE])
+            self._cache["race_id"] = key.view("S16").reshape(-1)
+        return self._cache["race_id"]  # type: ignore[return-value]
+
+    def _column(self, f: Field, values: np.ndarray, offset: int, stride: int, count: int) -> object:
+        if f.kind == "int":
+            n = len(self.records)
+            base = self._u8[:, offset : offset + stride * count].reshape(n, count, stride)
+            reps = base[:, :, f.offset - 1 : f.offset - 1 + f.length * f.repeat].reshape(n, count, f.repeat, f.length)
+            out = ascii_to_number(reps, f.scale)  # (n, count, repeat)
+            if count == 1:
+                out = out[:, 0]
+            return out[..., 0] if f.repeat == 1 else out
+        if f.kind == "text":
+            return TextColumn(values)
+        return values
+
+    def __getitem__(self, name: str) -> object:
+        if name in self._cache:
+            return self._cache[name]
+        key, _, sub = name.partition(".")
+        try:
+            _, item = self.layout.slots[key]
+        except KeyError:
+            raise KeyError(f"{self.layout.record_id} has no field {name!r}") from None
+
+        if isinstance(item, Field):
+            f = Field(item.name, 1, item.length, item.kind, item.repeat, item.scale)
+            value = self._column(f, self.records[key], item.offset - 1, item.length * item.repeat, 1)
+        else:
+            if not sub:
+                raise KeyError(f"{name!r} is a group; use '{name}.<field>' (e.g. {name}.{item.fields[0].name})")
+            f = next((x for x in item.fields if x.name == sub), None)
+            if f is None:
+                raise KeyError(f"{self.layout.record_id}.{key} has no field {sub!r}")
+            value = self._column(f, self.records[key][sub], item.offset - 1, item.size, item.count)
+        self._cache[name] = value
+        return value
+
+    def select(self, mask: np.ndarray) -> RecordColumns:
+        return RecordColumns(self.layout, self.records[mask])
+
+
+def decode_bulk(buf: bytes | bytearray | memoryview, record_id: str | None = None) -> RecordColumns:
+    """同一種別のレコードを連結したバッファを、コピーなしで列指向に読む。"""
+    mv = memoryview(buf)
+    if record_id is None:
+        record_id = bytes(mv[:2]).decode("ascii")
+    layout = get_layout(record_id)
+    if len(mv) % layout.length:
+        raise ValueError(f"Buffer of {len(mv)} bytes is not a multiple of the {record_id} length {layout.length}")
+    return RecordColumns(layout, np.frombuffer(mv, dtype=layout.dtype))
+
+
+# ── RaceCard ─────────────────────────────────────────────────────────────────
+
+
+def p_top3_from_odds(odds: np.ndarray) -> np.ndarray:
+    """単勝オッズから 3 着以内確率の暫定値を出す。
+
+    控除率を除いた単勝の支持率 q を勝率とみなし、1-(1-q)^3 で近似する。
+    オッズ欠損の馬は残りの確率を等分する。
+    """
+    odds = np.asarray(odds, dtype=np.float64)
+    inv = np.where(np.isfinite(odds) & (odds > 0), 1.0 / np.where(odds > 0, odds, 1.0), np.nan)
+    n = len(odds)
+    if n == 0:
+        return inv
+    if np.all(np.isnan(inv)):
+        return np.full(n, min(1.0, 3.0 / n))
+    q = inv / np.nansum(inv)
+    missing = np.isnan(q)
+    if missing.any():
+        q = np.where(missing, 1.0 / n, q * (1.0 - missing.sum() / n))
+    return 1.0 - (1.0 - q) ** 3
+
+
+# 異常区分: 1 出走取消 / 2 発走除外
+_SCRATCHED = {"1", "2"}
+
+
+def build_race_card(race_id: str, se: Sequence[JVRecord] | RecordColumns) -> RaceCard:
+    """SE（馬毎レース情報）から RaceCard を作る。p_top3 は単勝オッズからの暫定値。"""
+    if isinstance(se, RecordColumns):
+        cols = se.select(se.race_id == race_id.encode("ascii"))
+        keep = ~np.isin(cols["ijyo_cd"], [s.encode() for s in _SCRATCHED])
+        cols = cols.select(keep)
+        order = np.argsort(cols["umaban"], kind="stable")
+        ids = [v.decode("ascii").strip() for v in cols["ketto_num"][order]]
+        names = cols["bamei"][order].tolist()  # type: ignore[union-attr]
+        odds = cols["odds"][order]  # type: ignore[index]
+    else:
+        rows = [r for r in se if r.race_id == race_id and r["ijyo_cd"] not in _SCRATCHED]
+        rows.sort(key=lambda r: r["umaban"] or 0)  # type: ignore[return-value,operator]
+        ids = [r["ketto_num"] for r in rows]  # type: ignore[misc]
+        names = [r["bamei"] for r in rows]  # type: ignore[misc]
+        odds = np.array([np.nan if r["odds"] is None else r["odds"] for r in rows], dtype=np.float64)
+
+    p = p_top3_from_odds(odds)
+    horses = [HorseEntry(horse_id=i, name=n, p_top3=float(x)) for i, n, x in zip(ids, names, p)]
+    return RaceCard(race_id=race_id, horses=horses)
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from itertools import permutations
+
+import numpy as np
+
+# Harville モデル（Plackett-Luce の上位 3 着まで）:
+#   P(i, j, k の順に入線) = p_i * p_j / (1 - p_i) * p_k / (1 - p_i - p_j)
+# p は各馬の勝つ強さをレースごとに合計 1 に正規化したもの。
+# 配列は (..., N) で、先頭の次元はレース（バッチ）。頭数の違うレースは強さ 0 で詰める。
+
+_PERMUTATIONS = tuple(permutations(range(3)))
+
+
+def normalize_strength(strength: np.ndarray) -> np.ndarray:
+    """負値・NaN を 0 にして、最後の軸の合計を 1 にする（全頭 0 のレースは 0 のまま）。"""
+    s = np.nan_to_num(np.asarray(strength, dtype=np.float64), nan=0.0)
+    s = np.clip(s, 0.0, None)
+    total = s.sum(axis=-1, keepdims=True)
+    return np.divide(s, total, out=np.zeros_like(s), where=total > 0)
+
+
+def win_strength_from_p_top3(p_top3: np.ndarray) -> np.ndarray:
+    """3 着以内確率から勝つ強さを逆算する（p_top3 = 1-(1-q)^3 の逆）。"""
+    p = np.clip(np.nan_to_num(np.asarray(p_top3, dtype=np.float64), nan=0.0), 0.0, 1.0)
+    return normalize_strength(1.0 - np.cbrt(1.0 - p))
+
+
+def pad_strengths(strengths: list[np.ndarray], n: int | None = None) -> np.ndarray:
+    """頭数の違うレースを (R, n) に詰める。足りない分は強さ 0（出走しない馬）。"""
+    n = n or max((len(s) for s in strengths), default=0)
+    out = np.zeros((len(strengths), n), dtype=np.float64)
+    for r, s in enumerate(strengths):
+        out[r, : len(s)] = s
+    return out
+
+
+def _safe(d: np.ndarray) -> np.ndarray:
+    # 分母 0 になるのは分子も 0 の所だけ
+    return np.where(d > 1e-12, d, 1.0)
+
+
+def trifecta_probabilities(strength: np.ndarray) -> np.ndarray:
+    """3 連単の全順列の確率 (..., N, N, N)。[..., i, j, k] が i→j→k の確率、同じ馬を含む所は 0。"""
+    p = normalize_strength(strength)
+    n = p.shape[-1]
+    pi = p[..., :, None, None]
+    pj = p[..., None, :, None]
+    pk = p[..., None, None, :]
+    rest_i = _safe(1.0 - pi)
+    rest_ij = _safe(1.0 - pi - pj)
+    probs = pi * (pj / rest_i) * (pk / rest_ij)
+    eye = np.eye(n, dtype=bool)
+    distinct = ~(eye[:, :, None] | eye[:, None, :] | eye[None, :, :])
+    return probs * distinct
+
+
+def triple_probabilities(strength: np.ndarray, triples: np.ndarray, ordered: bool = False) -> np.ndarray:
+    """指定した 3 頭組 triples (K, 3) だけの確率 (..., K)。N^3 のテンソルは作らない。
+
+    ordered=True なら 3 連単（triples の順に入線）、False なら 3 連複（順不同）の確率。
+    """
+    p = normalize_strength(strength)
+    triples = np.asarray(triples, dtype=np.intp)
+    cols = [p[..., triples[:, i]] for i in range(3)]
+    prod = cols[0] * cols[1] * cols[2]
+    # 分母は順列間で共有する: 1 - p_i と、1・2 着の組ごとの 1 - p_i - p_j（順不同）
+    inv_rest = [1.0 / _safe(1.0 - c) for c in cols]
+    inv_pair = {(i, j): 1.0 / _safe(1.0 - cols[i] - cols[j]) for i, j in ((0, 1), (0, 2), (1, 2))}
+    out = np.zeros(p.shape[:-1] + (len(triples),), dtype=np.float64)
+    for i, j, _ in _PERMUTATIONS[:1] if ordered else _PERMUTATIONS:
+        out += inv_rest[i] * inv_pair[min(i, j), max(i, j)]
+    return prod * out
+
+
+def trio_probabilities(strength: np.ndarray) -> np.ndarray:
+    """3 連複の全組合せの確率 (..., C(N,3))。並びは trifecta_box.combination_indices(N) と同じ。"""
+    # trifecta_box がこのモジュールを import するので、ここは呼び出し時に読む
+    from keiba_scraping.logic.trifecta_box import combination_indices
+
+    p = np.asarray(strength)
+    return triple_probabilities(p, combination_indices(p.shape[-1]))
+
+
+def ticket_probabilities(strength: np.ndarray, bet_type: str, tickets: np.ndarray) -> np.ndarray:
+    """1 レースの指定馬券の的中確率 (K,)。tickets は (K, m) の馬の添字。
+
+    win/show/quinella/exacta/wide/trio/trifecta（複勝は 7 頭立て以下なら 2 着まで）。
+    """
+    p = normalize_strength(strength)
+    t = np.asarray(tickets, dtype=np.intp)
+    if bet_type in ("trio", "trifecta"):
+        return triple_probabilities(p, t.reshape(-1, 3), ordered=bet_type == "trifecta")
+
+    T = trifecta_probabilities(p)
+    if bet_type == "win":
+        return T.sum(axis=(1, 2))[t.reshape(-1)]
+    if bet_type == "show":
+        first, second, third = T.sum(axis=(1, 2)), T.sum(axis=(0, 2)), T.sum(axis=(0, 1))
+        runners = int(np.count_nonzero(p))
+        place = first + second + (third if runners > 7 else 0.0)
+        return place[t.reshape(-1)]
+
+    exacta = T.sum(axis=2)
+    a, b = t.reshape(-1, 2).T
+    if bet_type == "exacta":
+        return exacta[a, b]
+    if bet_type == "quinella":
+        return exacta[a, b] + exacta[b, a]
+    if bet_type == "wide":
+        # a, b がどちらも 3 着以内: 3 頭目の位置（1〜3 着）ごとに足す
+        both = exacta + T.sum(axis=1) + T.sum(axis=0)
+        return both[a, b] + both[b, a]
+    raise ValueError(f"Unknown bet type: {bet_type!r}")
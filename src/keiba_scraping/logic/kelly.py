@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+
+import numpy as np
+
+from keiba_scraping.domain.models import RaceCard
+from keiba_scraping.logic.harville import normalize_strength, trifecta_probabilities
+from keiba_scraping.logic.simulate import (
+    BET_TYPES,
+    encode_tickets,
+    outcome_codes,
+    race_strength,
+    sample_top3,
+    ticket_indices,
+)
+from keiba_scraping.logic.trifecta_box import TrifectaCombo
+
+# 同時ケリー: 結果（シナリオ）s の確率 q_s、馬券 k のオッズ o_k、賭け率 f_k（資金に対する割合）で
+#   max  Σ_s q_s log(1 - Σ_k f_k + Σ_k hit[s,k] o_k f_k)
+#   s.t. f >= 0, f_k <= max_per_ticket, Σ f <= max_total
+# 同じレースの 3 連複は互いに排他なので、1 点ずつ単独のケリーで張ると最適にならない
+# （外れた馬券の損を他の馬券の的中が埋める分を無視する）。
+# シナリオ × 馬券の払戻行列の上で、目的関数（凹）を射影ニュートン法でまとめて解く。
+
+
+@dataclass(frozen=True)
+class KellyResult:
+    # 馬券ごとの賭け率（fraction を掛けた後、資金に対する割合）
+    fractions: np.ndarray
+    # fractions で賭けたときの 1 回あたり期待対数成長率
+    growth: float
+    iterations: int
+    converged: bool
+
+    @property
+    def total(self) -> float:
+        return float(self.fractions.sum())
+
+
+def _project(f: np.ndarray, upper: np.ndarray, total: float) -> np.ndarray:
+    """{0 <= f <= upper, Σf <= total} への射影（超えたら全体から同じ λ を引く。λ は二分法）。"""
+    x = np.clip(f, 0.0, upper)
+    if x.sum() <= total:
+        return x
+    lo, hi = 0.0, float(f.max())
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        if np.clip(f - mid, 0.0, upper).sum() > total:
+            lo = mid
+        else:
+            hi = mid
+    return np.clip(f - hi, 0.0, upper)
+
+
+def _growth(q: np.ndarray, wealth: np.ndarray) -> float:
+    if np.any(wealth <= 0):
+        return -np.inf
+    return float(q @ np.log(wealth))
+
+
+def _hessian(rows: np.ndarray, cols: np.ndarray, vals: np.ndarray, d: np.ndarray, free: np.ndarray) -> np.ndarray:
+    """free の馬券についての A^T diag(d) A（A = R - 1、R は非ゼロ rows/cols/vals の疎行列）。
+
+    R^T D R は同じシナリオで当たる馬券の組だけを足し、-1 の分は rank-1 の補正で入れる。
+    """
+    pos = np.cumsum(free) - 1
+    keep = free[cols]
+    r, c, v = rows[keep], pos[cols[keep]], vals[keep]
+    m = int(free.sum())
+    # 行（シナリオ）ごとの非ゼロの全ペア。np.nonzero の結果は行順に並んでいる
+    counts = np.bincount(r, minlength=len(d))
+    per = counts[r]
+    start = np.cumsum(counts) - counts
+    left = np.repeat(np.arange(len(r)), per)
+    right = start[r[left]] + np.arange(len(left)) - np.repeat(np.cumsum(per) - per, per)
+    P = np.bincount(c[left] * m + c[right], weights=v[left] * v[right] * d[r[left]], minlength=m * m).reshape(m, m)
+    u = np.bincount(c, weights=v * d[r], minlength=m)
+    return P - u[:, None] - u[None, :] + d.sum()
+
+
+def solve_kelly(
+    probs: np.ndarray,
+    hits: np.ndarray,
+    odds: np.ndarray,
+    fraction: float = 1.0,
+    max_total: float = 1.0,
+    max_per_ticket: float | None = None,
+    tol: float = 1e-9,
+    max_iter: int = 100,
+) -> KellyResult:
+    """シナリオ確率 probs (S,)、的中行列 hits (S, K)、オッズ odds (K,) から同時ケリーの賭け率を解く。
+
+    fraction は分数ケリー（全ケリーの解に掛ける倍率）。max_total / max_per_ticket は
+    最終的な賭け率（fraction を掛けた後）に対する上限で、全ケリー側では 1/fraction 倍して解く。
+    """
+    q = np.asarray(probs, dtype=np.float64)
+    hits = np.asarray(hits, dtype=bool)
+    odds = np.asarray(odds, dtype=np.float64)
+    if hits.shape != (len(q), len(odds)):
+        raise ValueError(f"hits {hits.shape} does not match probs {q.shape} and odds {odds.shape}")
+    if not 0 < fraction <= 1:
+        raise ValueError("fraction must be in (0, 1]")
+    if max_total <= 0:
+        raise ValueError("max_total must be > 0")
+    q = q / q.sum()
+
+    s_count, k = hits.shape
+    # 払戻行列 R = hits * odds は疎（1 シナリオで当たるのは数点）なので、非ゼロだけを持つ。
+    # 純損益は A = R - 1 で、A f = R f - Σf、A^T w = R^T w - Σw。
+    rows, cols = np.nonzero(hits)
+    vals = np.nan_to_num(odds)[cols]
+    upper = np.full(k, np.inf if max_per_ticket is None else max_per_ticket / fraction)
+    total = max_total / fraction
+
+    def wealth_at(x: np.ndarray) -> np.ndarray:
+        return 1.0 - x.sum() + np.bincount(rows, weights=vals * x[cols], minlength=s_count)
+
+    f = np.zeros(k)
+    wealth = np.ones(s_count)
+    growth = 0.0
+
+    converged = False
+    it = 0
+    for it in range(1, max_iter + 1):
+        w = q / wealth
+        grad = np.bincount(cols, weights=vals * w[rows], minlength=k) - w.sum()
+        # 射影勾配が 0 なら KKT 条件を満たす（凹なので大域最適）
+        if np.max(np.abs(_project(f + grad, upper, total) - f), initial=0.0) < tol:
+            converged = True
+            break
+        # 下限で勾配が負・上限で勾配が正の馬券は固定し、残りでニュートン方向を取る
+        free = ((f > 0) | (grad > 0)) & ((f < upper) | (grad < 0))
+        direction = np.zeros(k)
+        if free.any():
+            H = _hessian(rows, cols, vals, q / wealth**2, free)
+            H[np.diag_indices_from(H)] += 1e-12 * max(float(np.trace(H)), 1.0)
+            try:
+                direction[free] = np.linalg.solve(H, grad[free])
+            except np.linalg.LinAlgError:
+                direction[free] = np.linalg.lstsq(H, grad[free], rcond=None)[0]
+
+        moved = False
+        for d in (direction, grad):  # ニュートン方向で上がらなければ射影勾配
+            t = 1.0
+            while t > 1e-12:
+                f_new = _project(f + t * d, upper, total)
+                wealth_new = wealth_at(f_new)
+                growth_new = _growth(q, wealth_new)
+                gain = float(grad @ (f_new - f))
+                if gain > 0 and growth_new >= growth + 1e-4 * gain:
+                    moved = True
+                    break
+                t /= 2
+            if moved:
+                break
+        if not moved:
+            converged = True  # これ以上上がらない（tol より手前の数値誤差）
+            break
+        step = float(np.max(np.abs(f_new - f), initial=0.0))
+        f, wealth, growth = f_new, wealth_new, growth_new
+        if step < tol:
+            converged = True
+            break
+
+    out = fraction * f
+    return KellyResult(out, _growth(q, wealth_at(out)), it, converged)
+
+
+# ── scenarios ────────────────────────────────────────────────────────────────
+
+
+def _hit_matrix(top3: np.ndarray, n: int, tickets: Mapping[str, np.ndarray]) -> np.ndarray:
+    """着順の上位 3 頭 (S, 3) ごとに、tickets（券種 -> (K, m) 馬の添字）の的中を (S, ΣK) で返す。"""
+    cols = []
+    rows = np.arange(len(top3))
+    for bet_type, t in tickets.items():
+        size, ordered = BET_TYPES[bet_type]
+        codes = encode_tickets(np.asarray(t, dtype=np.int64).reshape(-1, size), n, ordered)
+        uniq, inv = np.unique(codes, return_inverse=True)
+        lookup = np.full(n**size, -1, dtype=np.int64)
+        lookup[uniq] = np.arange(len(uniq))
+        # 1 シナリオで複数当たる券種（ワイド・複勝）は列が複数
+        col = lookup[outcome_codes(bet_type, top3, n).reshape(len(top3), -1)]
+        hit = np.zeros((len(top3), len(uniq)), dtype=bool)
+        r, c = np.nonzero(col >= 0)
+        hit[rows[r], col[r, c]] = True
+        cols.append(hit[:, inv.reshape(-1)])
+    return np.concatenate(cols, axis=1) if cols else np.zeros((len(top3), 0), dtype=bool)
+
+
+def _merge_scenarios(probs: np.ndarray, hits: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """的中の並びが同じシナリオを 1 行にまとめる（3 連複だけなら 3 連単の 6 通りが 1 行になる）。"""
+    if not hits.shape[1]:
+        return np.array([probs.sum()]), hits[:1]
+    packed = np.ascontiguousarray(np.packbits(hits, axis=1))
+    # 行をバイト列 1 つとして比べる（np.unique(axis=0) より桁違いに速い）
+    keys = packed.view(np.dtype((np.void, packed.shape[1]))).reshape(-1)
+    _, first, inv = np.unique(keys, return_index=True, return_inverse=True)
+    # 行は元の順で取り出す（キー順の飛び飛びの取り出しは大きい行列だと遅い）
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return np.bincount(rank[inv.reshape(-1)], weights=probs, minlength=len(first)), hits[first[order]]
+
+
+def race_scenarios(strength: np.ndarray, tickets: Mapping[str, np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    """1 レースの全着順（上位 3 頭の順列）を Harville 確率で列挙し、(確率 (S,), 的中 (S, ΣK)) を返す。
+
+    tickets は券種 -> (K, m) 馬の添字。列は tickets の順に券種ごとに並ぶ。
+    """
+    p = normalize_strength(strength)
+    n = len(p)
+    if np.count_nonzero(p) < 3:
+        raise ValueError(f"need at least 3 runners, got {np.count_nonzero(p)}")
+    T = trifecta_probabilities(p)
+    top3 = np.argwhere(T > 0)
+    return _merge_scenarios(T[tuple(top3.T)], _hit_matrix(top3, n, tickets))
+
+
+def sampled_scenarios(
+    strengths: Sequence[np.ndarray],
+    tickets: Sequence[Mapping[str, np.ndarray]],
+    n_samples: int = 20_000,
+    seed: int = 0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """複数レース（互いに独立）の同時シナリオを n_samples 回引く。列はレース順に並ぶ。
+
+    レースの組合せは全列挙できない（18 頭 12 レースで 4896^12）ので、各レースの着順を
+    Plackett-Luce で引き、同じ日の全馬券を 1 つの資金で張るときの期待値をサンプル平均で近似する。
+    """
+    if len(strengths) != len(tickets):
+        raise ValueError(f"{len(strengths)} races but {len(tickets)} ticket sets")
+    seeds = np.random.SeedSequence(seed).spawn(len(strengths))
+    hits = [
+        _hit_matrix(sample_top3(s, n_samples, np.random.default_rng(ss)), len(s), t)
+        for s, t, ss in zip(strengths, tickets, seeds)
+    ]
+    joint = np.concatenate(hits, axis=1) if hits else np.zeros((n_samples, 0), dtype=bool)
+    # 複数レースの組合せはほとんど重ならないので、_merge_scenarios はかけない
+    return np.full(n_samples, 1.0 / n_samples), joint
+
+
+# ── race cards ───────────────────────────────────────────────────────────────
+
+
+def kelly_race(
+    race: RaceCard,
+    tickets: Mapping[str, Sequence[Sequence[str]]],
+    odds: Mapping[str, np.ndarray],
+    fraction: float = 1.0,
+    max_total: float = 1.0,
+    max_per_ticket: float | None = None,
+) -> KellyResult:
+    """1 レースの馬券（券種 -> horse_id の組、オッズは同じ並び）を厳密な着順分布で同時に解く。"""
+    idx = {bet_type: ticket_indices(race, t) for bet_type, t in tickets.items()}
+    probs, hits = race_scenarios(race_strength(race), idx)
+    prices = np.concatenate([np.asarray(odds[b], dtype=np.float64) for b in tickets]) if tickets else np.zeros(0)
+    return solve_kelly(probs, hits, prices, fraction, max_total, max_per_ticket)
+
+
+def kelly_combos(
+    race: RaceCard,
+    combos: Sequence[TrifectaCombo],
+    odds: np.ndarray,
+    fraction: float = 1.0,
+    max_total: float = 1.0,
+    max_per_ticket: float | None = None,
+) -> KellyResult:
+    """make_trifecta_box の 3 連複（odds は combos と同じ並び）に同時ケリーで賭け率を付ける。"""
+    tickets = {"trio": [c.horse_ids for c in combos]}
+    return kelly_race(race, tickets, {"trio": odds}, fraction, max_total, max_per_ticket)
+
+
+def kelly_day(
+    races: Sequence[RaceCard],
+    tickets: Sequence[Mapping[str, Sequence[Sequence[str]]]],
+    odds: Sequence[Mapping[str, np.ndarray]],
+    fraction: float = 1.0,
+    max_total: float = 1.0,
+    max_per_ticket: float | None = None,
+    n_samples: int = 20_000,
+    seed: int = 0,
+) -> list[KellyResult]:
+    """1 日の複数レースを 1 つの資金で同時に解く（結果の賭け率はレースごとに分けて返す）。
+
+    growth・iterations・converged は全レース共通の値が入る。
+    """
+    if not (len(races) == len(tickets) == len(odds)):
+        raise ValueError(f"{len(races)} races, {len(tickets)} ticket sets and {len(odds)} odds sets")
+    idx = [{b: ticket_indices(race, t) for b, t in ts.items()} for race, ts in zip(races, tickets)]
+    probs, hits = sampled_scenarios([race_strength(r) for r in races], idx, n_samples, seed)
+    prices = [np.asarray(o[b], dtype=np.float64) for ts, o in zip(tickets, odds) for b in ts]
+    joint = solve_kelly(probs, hits, np.concatenate(prices) if prices else np.zeros(0), fraction, max_total,
+                        max_per_ticket)
+
+    sizes = [sum(len(t) for t in ts.values()) for ts in tickets]
+    parts = np.split(joint.fractions, np.cumsum(sizes)[:-1]) if sizes else []
+    return [KellyResult(f, joint.growth, joint.iterations, joint.converged) for f in parts]
+
+
+def kelly_stakes(fractions: np.ndarray, bankroll: int, unit: int = 100) -> np.ndarray:
+    """賭け率を購入額（円、unit 単位に切り捨て）にする。"""
+    return (np.floor(np.asarray(fractions) * bankroll / unit + 1e-9) * unit).astype(np.int64)
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from keiba_scraping.logic.trifecta_box import top_k_indices
+
+
+@dataclass(frozen=True)
+class StakePlan:
+    # 候補配列での位置と、それぞれの購入額（円、unit の倍数）。期待値の高い順
+    indices: np.ndarray
+    stakes: np.ndarray
+    # 1 円あたりの期待払戻（p * odds）
+    ev: np.ndarray
+
+    @property
+    def total_stake(self) -> int:
+        return int(self.stakes.sum())
+
+    @property
+    def expected_return(self) -> float:
+        return float((self.stakes * self.ev).sum())
+
+    @property
+    def expected_profit(self) -> float:
+        return self.expected_return - self.total_stake
+
+
+def optimize_ev(
+    p: np.ndarray,
+    odds: np.ndarray,
+    budget: int,
+    unit: int = 100,
+    max_tickets: int = 10,
+    max_stake_per_ticket: int | None = None,
+    min_ev: float = 1.0,
+) -> StakePlan:
+    """予算内で期待払戻が最大になる馬券と購入額を選ぶ。
+
+    期待払戻は購入額に線形なので、1 円あたりの期待値 p*odds が min_ev を超える馬券を
+    高い順に max_tickets 点まで取り、1 点あたり上限（unit 単位に切り捨て）まで順に
+    予算を割り当てるのが最適になる（上限・予算が unit の倍数なら整数制約でも厳密）。
+    """
+    p = np.asarray(p, dtype=np.float64)
+    odds = np.asarray(odds, dtype=np.float64)
+    if p.shape != odds.shape:
+        raise ValueError(f"p {p.shape} and odds {odds.shape} differ in shape")
+    if unit <= 0 or budget < 0 or max_tickets < 0:
+        raise ValueError("unit must be > 0, budget and max_tickets >= 0")
+
+    ev = np.where(np.isfinite(p) & np.isfinite(odds) & (odds > 0), p * odds, 0.0)
+    candidates = np.flatnonzero(ev > min_ev)
+    chosen = candidates[top_k_indices(ev[candidates], max_tickets)]
+
+    cap_units = (max_stake_per_ticket if max_stake_per_ticket is not None else budget) // unit
+    budget_units = budget // unit
+    # 上から順に min(上限, 残り予算) を割り当てる
+    filled = np.minimum(np.cumsum(np.full(len(chosen), cap_units, dtype=np.int64)), budget_units)
+    stakes = np.diff(filled, prepend=0) * unit
+    keep = stakes > 0
+    return StakePlan(chosen[keep], stakes[keep], ev[chosen[keep]])
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import os
+import time
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from keiba_scraping.domain.models import RaceCard
+from keiba_scraping.logic.harville import win_strength_from_p_top3
+from keiba_scraping.logic.trifecta_box import TrifectaCombo
+
+# 券種: 名前 -> (選ぶ頭数, 着順を区別するか)
+BET_TYPES: dict[str, tuple[int, bool]] = {
+    "win": (1, True),  # 単勝
+    "show": (1, False),  # 複勝（7 頭立て以下は 2 着まで）
+    "quinella": (2, False),  # 馬連
+    "exacta": (2, True),  # 馬単
+    "wide": (2, False),  # ワイド（3 着以内の 2 頭）
+    "trio": (3, False),  # 3 連複
+    "trifecta": (3, True),  # 3 連単
+}
+
+# ノイズモデル: "plackett_luce" は log(強さ) + Gumbel（noise=1 で Harville と一致）、
+# "normal" は log(強さ) + 正規ノイズ（Thurstone 型）
+MODELS = ("plackett_luce", "normal")
+
+
+@dataclass(frozen=True)
+class SimulationConfig:
+    model: str = "plackett_luce"
+    # ノイズの尺度（Gumbel の scale / 正規分布の標準偏差）
+    noise: float = 1.0
+    batch_size: int = 20_000
+    max_samples: int = 1_000_000
+    # 全券種・全馬券の信頼区間の半幅がこれ以下になったら打ち切る
+    tol: float = 1e-3
+    z: float = 1.96
+    # 1 レースあたりの上限時間（秒）
+    deadline_sec: float | None = None
+
+
+@dataclass(frozen=True)
+class TicketEstimates:
+    bet_type: str
+    # (K, m) 馬の添字（RaceCard.horses の位置）
+    tickets: np.ndarray
+    hits: np.ndarray
+    n_samples: int
+    z: float = 1.96
+
+    @property
+    def p(self) -> np.ndarray:
+        return self.hits / max(self.n_samples, 1)
+
+    def interval(self) -> tuple[np.ndarray, np.ndarray]:
+        """Wilson スコア区間 (lo, hi)。"""
+        return wilson_interval(self.hits, self.n_samples, self.z)
+
+
+@dataclass(frozen=True)
+class SimulationResult:
+    race_id: str
+    n_samples: int
+    # "converged" / "deadline" / "max_samples"
+    stopped: str
+    elapsed_sec: float
+    estimates: dict[str, TicketEstimates] = field(default_factory=dict)
+
+    @property
+    def converged(self) -> bool:
+        return self.stopped == "converged"
+
+
+def wilson_interval(hits: np.ndarray, n: int, z: float = 1.96) -> tuple[np.ndarray, np.ndarray]:
+    if n == 0:
+        return np.zeros(len(hits)), np.ones(len(hits))
+    p = np.asarray(hits, dtype=np.float64) / n
+    denom = 1.0 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * np.sqrt(p * (1.0 - p) / n + z * z / (4 * n * n)) / denom
+    return np.clip(center - half, 0.0, 1.0), np.clip(center + half, 0.0, 1.0)
+
+
+# ── sampling ─────────────────────────────────────────────────────────────────
+
+
+def sample_top3(strength: np.ndarray, n_samples: int, rng: np.random.Generator,
+                model: str = "plackett_luce", noise: float = 1.0) -> np.ndarray:
+    """着順の上位 3 頭 (n_samples, 3) をまとめて引く（全頭の順位は作らない）。"""
+    s = np.asarray(strength, dtype=np.float64)
+    mu = np.log(np.clip(s, 1e-12, None))
+    if model == "plackett_luce":
+        perf = mu + noise * rng.gumbel(size=(n_samples, len(s)))
+    elif model == "normal":
+        perf = mu + noise * rng.standard_normal(size=(n_samples, len(s)))
+    else:
+        raise ValueError(f"Unknown model: {model!r} (expected one of {MODELS})")
+    k = min(3, len(s))
+    top = np.argpartition(-perf, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(perf, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+def encode_tickets(horses: np.ndarray, n: int, ordered: bool) -> np.ndarray:
+    """(…, m) の馬の組を 1 つの整数にする。順不同の券種は昇順に並べてから。"""
+    h = horses if ordered else np.sort(horses, axis=-1)
+    code = np.zeros(h.shape[:-1], dtype=np.int64)
+    for i in range(h.shape[-1]):
+        code = code * n + h[..., i]
+    return code
+
+
+def outcome_codes(bet_type: str, top3: np.ndarray, n: int) -> np.ndarray:
+    """各サンプルで的中する組のコード（1 サンプルで複数当たる券種はその全部）。"""
+    if bet_type == "win":
+        return top3[:, 0]
+    if bet_type == "show":
+        return top3[:, : 2 if n <= 7 else 3].ravel()
+    if bet_type in ("quinella", "exacta"):
+        return encode_tickets(top3[:, :2], n, bet_type == "exacta")
+    if bet_type == "wide":
+        pairs = np.stack([top3[:, [0, 1]], top3[:, [0, 2]], top3[:, [1, 2]]], axis=1)
+        return encode_tickets(pairs, n, False).ravel()
+    if bet_type in ("trio", "trifecta"):
+        return encode_tickets(top3, n, bet_type == "trifecta")
+    raise ValueError(f"Unknown bet type: {bet_type!r} (expected one of {tuple(BET_TYPES)})")
+
+
+# ── single race ──────────────────────────────────────────────────────────────
+
+
+def simulate_strengths(
+    strength: np.ndarray,
+    tickets: Mapping[str, np.ndarray],
+    config: SimulationConfig = SimulationConfig(),
+    seed: int | np.random.SeedSequence | None = None,
+    race_id: str = "",
+    deadline: float | None = None,
+) -> SimulationResult:
+    """勝つ強さ strength (N,) のレースを batch_size ずつ引き、馬券ごとの的中回数を数える。
+
+    tickets は券種 -> (K, m) の馬の添字。収束（tol）・deadline（time.time() の絶対時刻、
+    config.deadline_sec より早ければこちら）・max_samples のいずれかで止まる。
+    """
+    t0 = time.time()
+    stop_at = t0 + config.deadline_sec if config.deadline_sec is not None else float("inf")
+    if deadline is not None:
+        stop_at = min(stop_at, deadline)
+    rng = np.random.default_rng(seed)
+    n = len(strength)
+
+    codes: dict[str, np.ndarray] = {}
+    counts: dict[str, np.ndarray] = {}
+    for bet_type, t in tickets.items():
+        size, ordered = BET_TYPES[bet_type]
+        t = np.asarray(t, dtype=np.int64).reshape(-1, size)
+        codes[bet_type] = encode_tickets(t, n, ordered)
+        counts[bet_type] = np.zeros(n**size, dtype=np.int64)
+
+    total = 0
+    stopped = "max_samples"
+    while total < config.max_samples:
+        batch = min(config.batch_size, config.max_samples - total)
+        top3 = sample_top3(strength, batch, rng, config.model, config.noise)
+        for bet_type in tickets:
+            counts[bet_type] += np.bincount(outcome_codes(bet_type, top3, n), minlength=len(counts[bet_type]))
+        total += batch
+
+        half = 0.0
+        for bet_type, c in codes.items():
+            if len(c):
+                lo, hi = wilson_interval(counts[bet_type][c], total, config.z)
+                half = max(half, float(np.max(hi - lo)) / 2)
+        if half <= config.tol:
+            stopped = "converged"
+            break
+        if time.time() >= stop_at:
+            stopped = "deadline"
+            break
+
+    estimates = {
+        bet_type: TicketEstimates(bet_type, np.asarray(tickets[bet_type]), counts[bet_type][c], total, config.z)
+        for bet_type, c in codes.items()
+    }
+    return SimulationResult(race_id, total, stopped, time.time() - t0, estimates)
+
+
+def race_strength(race: RaceCard) -> np.ndarray:
+    return win_strength_from_p_top3(np.array([h.p_top3 for h in race.horses]))
+
+
+def ticket_indices(race: RaceCard, tickets: Sequence[Sequence[str]]) -> np.ndarray:
+    """horse_id の組を RaceCard.horses の添字 (K, m) にする。"""
+    pos = {h.horse_id: i for i, h in enumerate(race.horses)}
+    try:
+        return np.array([[pos[h] for h in t] for t in tickets], dtype=np.int64)
+    except KeyError as e:
+        raise LookupError(f"horse_id {e.args[0]!r} is not in race {race.race_id}") from None
+
+
+def combo_tickets(combos: Sequence[TrifectaCombo]) -> dict[str, list[tuple[str, str, str]]]:
+    """make_trifecta_box の結果を 3 連複の馬券として渡す形にする。"""
+    return {"trio": [c.horse_ids for c in combos]}
+
+
+def simulate_race(
+    race: RaceCard,
+    tickets: Mapping[str, Sequence[Sequence[str]]],
+    config: SimulationConfig = SimulationConfig(),
+    seed: int | np.random.SeedSequence | None = None,
+    deadline: float | None = None,
+) -> SimulationResult:
+    """RaceCard の p_top3 から強さを出してシミュレートする。tickets は券種 -> horse_id の組。"""
+    idx = {bet_type: ticket_indices(race, t) for bet_type, t in tickets.items()}
+    return simulate_strengths(race_strength(race), idx, config, seed, race.race_id, deadline)
+
+
+# ── many races ───────────────────────────────────────────────────────────────
+
+
+def _simulate_task(args: tuple) -> SimulationResult:
+    return simulate_race(*args)
+
+
+def simulate_races(
+    races: Sequence[RaceCard],
+    tickets: Sequence[Mapping[str, Sequence[Sequence[str]]]],
+    config: SimulationConfig = SimulationConfig(),
+    seed: int = 0,
+    workers: int = 0,
+    deadline_sec: float | None = None,
+) -> list[SimulationResult]:
+    """複数レースをワーカープロセスで並列にシミュレートする（結果は races の順）。
+
+    各レースの乱数列は SeedSequence(seed).spawn() で分けるので、workers の数や
+    処理順によらず同じ seed なら同じ結果になる（deadline で止まった場合を除く）。
+    deadline_sec はバッチ全体の上限時間。
+    """
+    if len(races) != len(tickets):
+        raise ValueError(f"{len(races)} races but {len(tickets)} ticket sets")
+    seeds = np.random.SeedSequence(seed).spawn(len(races))
+    deadline = time.time() + deadline_sec if deadline_sec is not None else None
+    tasks = [(race, t, config, s, deadline) for race, t, s in zip(races, tickets, seeds)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        return [_simulate_task(t) for t in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_simulate_task, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
@@ -1,28 +1,98 @@
 from __future__ import annotations
 
-import itertools
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import combinations
+
+import numpy as np
 
 from keiba_scraping.domain.models import HorseEntry
+from keiba_scraping.logic.harville import triple_probabilities, win_strength_from_p_top3
+
+# score の種類: "product" は p_top3 の積（簡易スコア）、"harville" は Harville モデルでの 3 連複的中確率
+SCORINGS = ("product", "harville")
 
 
 @dataclass(frozen=True)
 class TrifectaCombo:
     horse_ids: tuple[str, str, str]
     horse_names: tuple[str, str, str]
-    # ここでは簡易スコア（組合せの強さ）として p_top3 の積を採用
+    # scoring="product" では p_top3 の積、"harville" では的中確率
     score: float
 
 
-def make_trifecta_box(horses: list[HorseEntry]) -> list[TrifectaCombo]:
-    combos: list[TrifectaCombo] = []
-    for a, b, c in itertools.combinations(horses, 3):
-        combos.append(
-            TrifectaCombo(
-                horse_ids=(a.horse_id, b.horse_id, c.horse_id),
-                horse_names=(a.name, b.name, c.name),
-                score=a.p_top3 * b.p_top3 * c.p_top3,
-            )
-        )
-    combos.sort(key=lambda x: x.score, reverse=True)
-    return combos
\ No newline at end of file
+@lru_cache(maxsize=32)
+def combination_indices(n: int) -> np.ndarray:
+    """n 頭から 3 頭を選ぶ全組合せの (C(n,3), 3) 添字。itertools.combinations と同じ順。"""
+    idx = np.array(list(combinations(range(n), 3)), dtype=np.intp).reshape(-1, 3)
+    idx.flags.writeable = False
+    return idx
+
+
+_PARTITION_MIN = 256
+
+
+def top_k_indices(scores: np.ndarray, k: int | None = None) -> np.ndarray:
+    """スコア降順の上位 k 件の位置。同点は位置の小さい方が先（安定ソートと同じ結果）。
+
+    候補が多いときは argpartition で k 件に絞ってから並べるので、全件ソートしない。
+    """
+    n = len(scores)
+    if k is None or k >= n:
+        return np.argsort(-scores, kind="stable")
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if n < _PARTITION_MIN:
+        # 件数が少ないと argpartition の前後処理の方が高くつく
+        return np.argsort(-scores, kind="stable")[:k]
+    threshold = scores[np.argpartition(-scores, k - 1)[:k]].min()
+    above = np.flatnonzero(scores > threshold)
+    ties = np.flatnonzero(scores == threshold)[: k - len(above)]
+    chosen = np.concatenate([above, ties])
+    return chosen[np.lexsort((chosen, -scores[chosen]))]
+
+
+def score_trifecta_box(
+    p_top3: np.ndarray,
+    top_k: int | None = None,
+    scoring: str = "product",
+    others_p_top3: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """3 連複 BOX を添字配列のまま一括計算する。
+
+    戻り値は (combos (K,3) 馬の添字, scores (K,))。スコア降順。
+    scoring="harville" では BOX に入れなかった馬の p_top3（others_p_top3）も含めた
+    出走馬全体で的中確率を出す。
+    """
+    p = np.asarray(p_top3, dtype=np.float64)
+    idx = combination_indices(len(p))
+    if scoring == "product":
+        scores = p[idx[:, 0]] * p[idx[:, 1]] * p[idx[:, 2]]
+    elif scoring == "harville":
+        field = p if others_p_top3 is None else np.concatenate([p, np.asarray(others_p_top3, dtype=np.float64)])
+        scores = triple_probabilities(win_strength_from_p_top3(field), idx)
+    else:
+        raise ValueError(f"Unknown scoring: {scoring!r} (expected one of {SCORINGS})")
+    order = top_k_indices(scores, top_k)
+    return idx[order], scores[order]
+
+
+def make_trifecta_box(
+    horses: list[HorseEntry],
+    top_k: int | None = None,
+    scoring: str = "product",
+    others: list[HorseEntry] | None = None,
+) -> list[TrifectaCombo]:
+    """score_trifecta_box の結果を TrifectaCombo のリストとして返す。others は BOX 外の出走馬。"""
+    combos, scores = score_trifecta_box(
+        np.array([h.p_top3 for h in horses]),
+        top_k,
+        scoring,
+        np.array([h.p_top3 for h in others]) if others else None,
+    )
+    ids = [h.horse_id for h in horses]
+    names = [h.name for h in horses]
+    return [
+        TrifectaCombo(horse_ids=(ids[a], ids[b], ids[c]), horse_names=(names[a], names[b], names[c]), score=score)
+        for (a, b, c), score in zip(combos.tolist(), scores.tolist())
+    ]
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+
+import numpy as np
+
+
+class LatencyStats:
+    """直近 window 件の所要時間（ms）の分位点。"""
+
+    def __init__(self, window: int = 10_000) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, ms: float) -> None:
+        with self._lock:
+            self._samples.append(ms)
+            self.count += 1
+
+    def to_dict(self) -> dict[str, float]:
+        with self._lock:
+            samples = np.array(self._samples)
+        if not len(samples):
+            return {"count": self.count}
+        p50, p90, p99 = np.percentile(samples, [50, 90, 99])
+        return {
+            "count": self.count,
+            "p50_ms": float(p50),
+            "p90_ms": float(p90),
+            "p99_ms": float(p99),
+            "max_ms": float(samples.max()),
+            "mean_ms": float(samples.mean()),
+        }
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, TypeVar
+
+# 区間（span）の計測。enable() するまでは span() が共有の何もしないオブジェクトを返すだけなので、
+# 組み込んだままでもほぼ 0 コスト（グローバル変数 1 回の参照）。
+#
+#   with span("get_race_card", race_id=race_id):
+#       ...
+#   counter("records", len(records))
+#
+# 入れ子は contextvars で追うので、スレッドごと・asyncio のタスクごとに別々の経路になる
+# （同時に走るタスクの区間が互いの親子にならない）。memory=True なら tracemalloc で
+# 区間ごとのピークメモリも取る（計測のオーバーヘッドは大きくなる。同時に走るタスクの分は区別できない）。
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass
+class SpanRecord:
+    name: str
+    # 親からの経路（"run_prediction/predict_race/get_race_card"）
+    path: str
+    start_ns: int
+    end_ns: int
+    tid: int
+    depth: int
+    # 子の区間を除いた時間
+    self_ns: int = 0
+    args: dict[str, Any] = field(default_factory=dict)
+    # tracemalloc: 区間中のピーク（絶対値）と、開始時点からの増分
+    peak_bytes: int | None = None
+    mem_delta_bytes: int | None = None
+
+    @property
+    def duration_ns(self) -> int:
+        return self.end_ns - self.start_ns
+
+
+@dataclass
+class _Frame:
+    name: str
+    path: str
+    start_ns: int
+    args: dict[str, Any]
+    # 開いたときの親。親の連鎖は変えないので、タスクが分かれても他のタスクの区間に影響しない
+    parent: _Frame | None = None
+    depth: int = 0
+    start_bytes: int = 0
+    child_ns: int = 0
+    # 子の区間で観測したピーク（子が終わるたびに reset_peak するので親はこれと合わせる）
+    child_peak: int = 0
+
+
+class Tracer:
+    def __init__(self, memory: bool = False) -> None:
+        self.memory = memory
+        self.spans: list[SpanRecord] = []
+        # (名前, 時刻 ns, スレッド, 値)。値は加算後の合計
+        self.counter_events: list[tuple[str, int, int, float]] = []
+        self.counters: dict[str, float] = {}
+        self.origin_ns = time.perf_counter_ns()
+        self.closed_ns: int | None = None
+        self._current: contextvars.ContextVar[_Frame | None] = contextvars.ContextVar("trace_frame", default=None)
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def push(self, name: str, args: dict[str, Any]) -> _Frame:
+        parent = self._current.get()
+        if parent is None:
+            frame = _Frame(name, name, 0, args)
+        else:
+            frame = _Frame(name, f"{parent.path}/{name}", 0, args, parent, parent.depth + 1)
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if parent is not None:
+                parent.child_peak = max(parent.child_peak, peak)
+            tracemalloc.reset_peak()
+            frame.start_bytes = current
+        self._current.set(frame)
+        frame.start_ns = time.perf_counter_ns()
+        return frame
+
+    def pop(self, frame: _Frame) -> None:
+        """push() が返した frame を閉じる（閉じる順はタスク・スレッドをまたいで前後してよい）。"""
+        end_ns = time.perf_counter_ns()
+        parent = frame.parent
+        self._current.set(parent)
+        duration = end_ns - frame.start_ns
+        # 同時に走った子の合計は親の時間を超えうるので 0 で止める
+        record = SpanRecord(frame.name, frame.path, frame.start_ns, end_ns, threading.get_ident(), frame.depth,
+                            max(0, duration - frame.child_ns), frame.args)
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, frame.child_peak)
+            record.peak_bytes = peak
+            record.mem_delta_bytes = current - frame.start_bytes
+            tracemalloc.reset_peak()
+        with self._lock:
+            # 親は別のスレッド（asyncio.to_thread など）の子からも足されるのでロックの中で
+            if parent is not None:
+                parent.child_ns += duration
+                if record.peak_bytes is not None:
+                    parent.child_peak = max(parent.child_peak, record.peak_bytes)
+            self.spans.append(record)
+
+    def count(self, name: str, value: float) -> None:
+        with self._lock:
+            total = self.counters[name] = self.counters.get(name, 0) + value
+            self.counter_events.append((name, time.perf_counter_ns(), threading.get_ident(), total))
+
+    def close(self) -> None:
+        self.closed_ns = self.closed_ns or time.perf_counter_ns()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    # ── export ───────────────────────────────────────────────────────────────
+
+    def summary(self) -> dict[str, Any]:
+        """経路ごとの集計（回数・合計・最大・自身の時間（子を除く）・ピークメモリ）と counter の合計。"""
+        stages: dict[str, dict[str, Any]] = {}
+        for s in self.spans:
+            st = stages.setdefault(s.path, {"count": 0, "total_ms": 0.0, "self_ms": 0.0, "max_ms": 0.0})
+            ms = s.duration_ns / 1e6
+            st["count"] += 1
+            st["total_ms"] += ms
+            st["self_ms"] += s.self_ns / 1e6
+            st["max_ms"] = max(st["max_ms"], ms)
+            if s.peak_bytes is not None:
+                st["peak_bytes"] = max(st.get("peak_bytes", 0), s.peak_bytes)
+                st["mem_delta_bytes"] = st.get("mem_delta_bytes", 0) + (s.mem_delta_bytes or 0)
+        for st in stages.values():
+            st["mean_ms"] = st["total_ms"] / st["count"]
+        return {
+            "wall_ms": ((self.closed_ns or time.perf_counter_ns()) - self.origin_ns) / 1e6,
+            "memory": self.memory,
+            "stages": stages,
+            "counters": dict(self.counters),
+        }
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """Chrome の trace event 形式（chrome://tracing / Perfetto で開ける）。時刻は µs。"""
+        pid = os.getpid()
+        events: list[dict[str, Any]] = []
+        for s in sorted(self.spans, key=lambda s: s.start_ns):
+            args = {k: v if isinstance(v, (int, float, str, bool)) or v is None else str(v) for k, v in s.args.items()}
+            if s.peak_bytes is not None:
+                args.update(peak_bytes=s.peak_bytes, mem_delta_bytes=s.mem_delta_bytes)
+            events.append({
+                "name": s.name, "cat": s.path.split("/", 1)[0], "ph": "X", "pid": pid, "tid": s.tid,
+                "ts": (s.start_ns - self.origin_ns) / 1000, "dur": s.duration_ns / 1000, "args": args,
+            })
+        for name, ts_ns, tid, total in self.counter_events:
+            events.append({"name": name, "ph": "C", "pid": pid, "tid": tid, "ts": (ts_ns - self.origin_ns) / 1000,
+                           "args": {name: total}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def format_summary(self) -> str:
+        """summary() を経路順の表にする（--profile の表示用）。"""
+        summary = self.summary()
+        lines = [f"{'stage':<48} {'count':>6} {'total ms':>10} {'self ms':>10} {'max ms':>9}"
+                 + (f" {'peak MiB':>9}" if self.memory else "")]
+        for path, st in sorted(summary["stages"].items()):
+            label = "  " * path.count("/") + path.rsplit("/", 1)[-1]
+            line = f"{label:<48} {st['count']:>6} {st['total_ms']:>10.2f} {st['self_ms']:>10.2f} {st['max_ms']:>9.2f}"
+            if "peak_bytes" in st:
+                line += f" {st['peak_bytes'] / 2**20:>9.2f}"
+            lines.append(line)
+        for name, value in sorted(summary["counters"].items()):
+            lines.append(f"counter {name} = {value:,g}")
+        lines.append(f"wall {summary['wall_ms']:.2f} ms")
+        return "\n".join(lines)
+
+    def write_json(self, path: str | Path) -> None:
+        _write(path, self.summary())
+
+    def write_chrome_trace(self, path: str | Path) -> None:
+        _write(path, self.chrome_trace())
+
+
+def _write(path: str | Path, obj: dict[str, Any]) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(obj, ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+
+
+# ── module API ───────────────────────────────────────────────────────────────
+
+_tracer: Tracer | None = None
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("_tracer", "_name", "_args", "_frame")
+
+    def __init__(self, tracer: Tracer, name: str, args: dict[str, Any]) -> None:
+        self._tracer = tracer
+        self._name = name
+        self._args = args
+        self._frame: _Frame | None = None
+
+    def __enter__(self) -> None:
+        self._frame = self._tracer.push(self._name, self._args)
+
+    def __exit__(self, *exc: object) -> None:
+        if self._frame is not None:
+            self._tracer.pop(self._frame)
+            self._frame = None
+
+
+def enable(memory: bool = False) -> Tracer:
+    """計測を始める（すでに有効なら今のものを返す）。"""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(memory=memory)
+    return _tracer
+
+
+def disable() -> Tracer | None:
+    """計測を止め、それまでの Tracer を返す（書き出しはこの後でできる）。"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.close()
+    return tracer
+
+
+def current() -> Tracer | None:
+    return _tracer
+
+
+def span(name: str, **args: Any) -> _Span | _NoopSpan:
+    tracer = _tracer
+    if tracer is None:
+        return _NOOP
+    return _Span(tracer, name, args)
+
+
+def counter(name: str, value: float = 1) -> None:
+    tracer = _tracer
+    if tracer is not None:
+        tracer.count(name, value)
+
+
+def traced(name: str | None = None) -> Callable[[F], F]:
+    """関数全体を 1 つの区間にするデコレータ（既定の名前は関数名）。"""
+
+    def decorate(fn: F) -> F:
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            tracer = _tracer
+            if tracer is None:
+                return fn(*args, **kwargs)
+            frame = tracer.push(label, {})
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                tracer.pop(frame)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+
+from keiba_scraping.jvdata.parser import RecordColumns, ascii_to_number, decode_bulk
+
+# 列ファイルは追記のみ。どの行が有効かは index/ と meta.json が決めるので、
+# commit 前に落ちても末尾に参照されない行が残るだけで既存データは壊れない。
+# 索引はバージョン付きのファイル名で書き、meta.json がどれを使うかを指す。
+# commit は meta.json の置き換え 1 回だけで、古い索引はその後で消す。
+
+RACE_COLUMNS: dict[str, str] = {
+    "race_id": "S16",
+    "date": "<i4",
+    "jyo_cd": "S2",
+    "race_num": "i1",
+    "kyori": "<i2",
+    "track_cd": "S2",
+    "syusso_tosu": "i1",
+    "hondai": "S60",  # Shift-JIS のまま
+    "runner_start": "<i8",
+    "runner_count": "<i4",
+}
+
+RUNNER_COLUMNS: dict[str, str] = {
+    "umaban": "i1",
+    "wakuban": "i1",
+    "ketto_num": "S10",
+    "bamei": "S36",  # Shift-JIS のまま
+    "odds": "<f4",
+    "ninki": "<i2",
+    "futan": "<f4",
+    "ijyo_cd": "S1",
+    "kakutei_jyuni": "i1",
+}
+
+
+def _fsync_write(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class RaceStore:
+    """race_id でソートした索引 + memmap の列ファイルによるローカル保存先。
+
+    get_race() は二分探索（O(log n)）で行を特定し、出走馬の列はコピーせずスライスで返す。
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self._maps: dict[str, np.ndarray] | None = None
+        self._index: tuple[np.ndarray, np.ndarray] | None = None
+        self.meta = self._load_meta()
+
+    # ── on-disk layout ───────────────────────────────────────────────────────
+
+    def _load_meta(self) -> dict:
+        path = self.root / "meta.json"
+        if path.exists():
+            return json.loads(path.read_text(encoding="utf-8"))
+        return {"version": 0, "races": 0, "runners": 0, "indexed": 0}
+
+    def _col_path(self, table: str, name: str) -> Path:
+        return self.root / table / f"{name}.bin"
+
+    def _index_path(self, name: str, version: int | None) -> Path:
+        # version なし（index キーが無い古い meta.json）は旧形式の index/<name>.bin
+        if version is None:
+            return self._col_path("index", name)
+        return self.root / "index" / f"{name}.{version}.bin"
+
+    def _column(self, table: str, name: str, dtype: str, count: int, path: Path | None = None) -> np.ndarray:
+        path = path or self._col_path(table, name)
+        if count == 0 or not path.exists():
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=(count,))
+
+    def _columns(self) -> dict[str, np.ndarray]:
+        if self._maps is None:
+            maps = {}
+            for name, dtype in RACE_COLUMNS.items():
+                maps[f"races.{name}"] = self._column("races", name, dtype, self.meta["races"])
+            for name, dtype in RUNNER_COLUMNS.items():
+                maps[f"runners.{name}"] = self._column("runners", name, dtype, self.meta["runners"])
+            self._maps = maps
+        return self._maps
+
+    def _sorted_index(self) -> tuple[np.ndarray, np.ndarray]:
+        """(ソート済み race_id, races の行番号)"""
+        if self._index is None:
+            n = self.meta["indexed"]
+            version = self.meta.get("index")
+            keys = self._column("index", "race_id", "S16", n, self._index_path("race_id", version))
+            rows = self._column("index", "race_row", "<i8", n, self._index_path("race_row", version))
+            self._index = (keys, rows)
+        return self._index
+
+    @property
+    def version(self) -> int:
+        return int(self.meta["version"])
+
+    def __len__(self) -> int:
+        return int(self.meta["indexed"])
+
+    # ── read ─────────────────────────────────────────────────────────────────
+
+    def find(self, race_id: str) -> int | None:
+        keys, rows = self._sorted_index()
+        key = race_id.encode("ascii")
+        i = int(np.searchsorted(keys, key))
+        if i < len(keys) and keys[i] == key:
+            return int(rows[i])
+        return None
+
+    def get_race(self, race_id: str) -> dict[str, object] | None:
+        """レース 1 件分の列。runners.* は memmap のゼロコピースライス。"""
+        row = self.find(race_id)
+        if row is None:
+            return None
+        cols = self._columns()
+        start = int(cols["races.runner_start"][row])
+        count = int(cols["races.runner_count"][row])
+        out: dict[str, object] = {name: cols[f"races.{name}"][row] for name in RACE_COLUMNS}
+        for name in RUNNER_COLUMNS:
+            out[f"runners.{name}"] = cols[f"runners.{name}"][start : start + count]
+        return out
+
+    def race_ids_between(self, date_from: int, date_to: int) -> list[str]:
+        """開催日 date_from〜date_to（YYYYMMDD、両端含む）の race_id（race_id 順 = 日付順）。"""
+        keys, _ = self._sorted_index()
+        lo = int(np.searchsorted(keys, str(date_from).encode("ascii")))
+        hi = int(np.searchsorted(keys, str(date_to + 1).encode("ascii")))
+        return [k.decode("ascii") for k in keys[lo:hi]]
+
+    # ── write ────────────────────────────────────────────────────────────────
+
+    def _append(self, table: str, columns: dict[str, str], values: dict[str, np.ndarray]) -> None:
+        (self.root / table).mkdir(parents=True, exist_ok=True)
+        for name, dtype in columns.items():
+            arr = np.ascontiguousarray(values[name], dtype=dtype)
+            path = self._col_path(table, name)
+            expected = self.meta[table] * np.dtype(dtype).itemsize
+            with open(path, "ab") as f:
+                # 前回 commit されなかった末尾の行は切り捨ててから追記する
+                if f.tell() != expected:
+                    f.truncate(expected)
+                    f.seek(expected)
+                f.write(arr.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+    def ingest(self, se: RecordColumns, ra: RecordColumns | None = None) -> int:
+        """SE（と任意で RA）の列を追記して索引を更新する。戻り値は書き込んだレース数。
+
+        既に保存済みのレースは馬番単位でマージする（同じ馬番は新しい SE が優先、
+        RA が無ければ保存済みのレース情報を引き継ぐ）。SE がまだ無いレースの RA は出走馬 0 頭の
+        レースとして保存し、後から来た SE とマージする。呼び出しが返った時点で fsync 済み。
+        """
+        ra_ids = ra.race_id if ra is not None and len(ra) else np.empty(0, dtype="S16")
+        if len(se) == 0 and len(ra_ids) == 0:
+            return 0
+
+        new_runners = {
+            "umaban": se["umaban"],
+            "wakuban": se["wakuban"],
+            "ketto_num": se.records["ketto_num"],
+            "bamei": se.records["bamei"],
+            "odds": se["odds"],
+            "ninki": se["ninki"],
+            "futan": se["futan"],
+            "ijyo_cd": se.records["ijyo_cd"],
+            "kakutei_jyuni": se["kakutei_jyuni"],
+        }
+        parts = [{k: np.asarray(v).astype(RUNNER_COLUMNS[k]) for k, v in new_runners.items()}]
+        key_parts = [se.race_id]
+
+        # 保存済みレースの出走馬を「古い行」として先頭に並べる
+        cols = self._columns()
+        old_race_rows: dict[bytes, int] = {}
+        for key in np.unique(np.concatenate([se.race_id, ra_ids])):
+            row = self.find(key.decode("ascii"))
+            if row is None:
+                continue
+            old_race_rows[bytes(key)] = row
+            start = int(cols["races.runner_start"][row])
+            count = int(cols["races.runner_count"][row])
+            parts.insert(0, {k: np.array(cols[f"runners.{k}"][start : start + count]) for k in RUNNER_COLUMNS})
+            key_parts.insert(0, np.full(count, key, dtype="S16"))
+        merged = {k: np.concatenate([p[k] for p in parts]) for k in RUNNER_COLUMNS}
+        race_keys = np.concatenate(key_parts)
+        umaban = merged["umaban"]
+
+        # race_id・馬番順に並べ、同じ馬番が複数あれば後（新しい方）を残す
+        order = np.lexsort((np.arange(len(race_keys)), umaban, race_keys))
+        last = np.ones(len(order), dtype=bool)
+        last[:-1] = (race_keys[order][1:] != race_keys[order][:-1]) | (umaban[order][1:] != umaban[order][:-1])
+        order = order[last]
+        runners = {k: v[order] for k, v in merged.items()}
+        uniq, first, counts = np.unique(race_keys[order], return_index=True, return_counts=True)
+        n_runners = len(order)
+        ra_only = np.setdiff1d(ra_ids, uniq)
+        if len(ra_only):
+            uniq = np.concatenate([uniq, ra_only])
+            first = np.concatenate([first, np.zeros(len(ra_only), dtype=first.dtype)])
+            counts = np.concatenate([counts, np.zeros(len(ra_only), dtype=counts.dtype)])
+            by_key = np.argsort(uniq, kind="stable")
+            uniq, first, counts = uniq[by_key], first[by_key], counts[by_key]
+
+        n = len(uniq)
+        key_u8 = uniq.astype("S16").view(np.uint8).reshape(n, 16)
+        races: dict[str, np.ndarray] = {
+            "race_id": uniq,
+            "date": ascii_to_number(key_u8[:, :8]).astype("<i4"),
+            "jyo_cd": np.ascontiguousarray(key_u8[:, 8:10]).view("S2").reshape(n),
+            "race_num": ascii_to_number(key_u8[:, 14:16]).astype("i1"),
+            "kyori": np.full(n, -1, dtype="<i2"),
+            "track_cd": np.full(n, b"", dtype="S2"),
+            "syusso_tosu": counts.astype("i1"),
+            "hondai": np.full(n, b"", dtype="S60"),
+            "runner_start": self.meta["runners"] + first,
+            "runner_count": counts.astype("<i4"),
+        }
+        for i, key in enumerate(uniq):
+            row = old_race_rows.get(bytes(key))
+            if row is not None:
+                for name in ("kyori", "track_cd", "hondai"):
+                    races[name][i] = cols[f"races.{name}"][row]
+                races["syusso_tosu"][i] = max(races["syusso_tosu"][i], cols["races.syusso_tosu"][row])
+        if ra is not None and len(ra):
+            pos = np.minimum(np.searchsorted(uniq, ra.race_id), n - 1)
+            hit = uniq[pos] == ra.race_id
+            races["kyori"][pos[hit]] = np.asarray(ra["kyori"])[hit]
+            races["track_cd"][pos[hit]] = ra.records["track_cd"][hit]
+            races["hondai"][pos[hit]] = ra.records["hondai"][hit]
+            tosu = np.asarray(ra["syusso_tosu"])
+            known = hit & (tosu > 0)
+            races["syusso_tosu"][pos[known]] = tosu[known]
+
+        # 追記するファイルの memmap を手放してから書く
+        del cols
+        self._maps = None
+
+        self._append("runners", RUNNER_COLUMNS, runners)
+        race_rows = self.meta["races"] + np.arange(n, dtype="<i8")
+        self._append("races", RACE_COLUMNS, races)
+
+        # 索引の再構築: 既存 + 新規をマージし、同じ race_id は新しい行を残す
+        old_keys, old_rows = self._sorted_index()
+        keys = np.concatenate([old_keys, uniq])
+        rows = np.concatenate([old_rows, race_rows])
+        # 置き換える索引ファイルの memmap を手放す（Windows では開いたままだと os.replace できない）
+        del old_keys, old_rows
+        self._index = None
+        order = np.lexsort((-rows, keys))
+        keys, rows = keys[order], rows[order]
+        keep = np.ones(len(keys), dtype=bool)
+        keep[1:] = keys[1:] != keys[:-1]
+        keys, rows = keys[keep], rows[keep]
+
+        # 新しい索引は別名で書き、meta.json の置き換えで切り替える（ここが commit）
+        version = self.meta["version"] + 1
+        (self.root / "index").mkdir(parents=True, exist_ok=True)
+        _fsync_write(self._index_path("race_id", version), keys.astype("S16").tobytes())
+        _fsync_write(self._index_path("race_row", version), rows.astype("<i8").tobytes())
+
+        meta = {
+            "version": version,
+            "races": self.meta["races"] + n,
+            "runners": self.meta["runners"] + n_runners,
+            "indexed": int(len(keys)),
+            "index": version,
+        }
+        _fsync_write(self.root / "meta.json", json.dumps(meta).encode("utf-8"))
+        self.meta = meta
+        self._maps = None
+        self._index = None
+        self._remove_stale_indexes()
+        return n
+
+    def _remove_stale_indexes(self) -> None:
+        """meta.json が指していない索引ファイル（前の版、commit されなかった版）を消す。"""
+        current = {self._index_path(name, self.meta.get("index")).name for name in ("race_id", "race_row")}
+        for path in (self.root / "index").glob("*.bin"):
+            if path.name not in current:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass  # Windows で他のプロセスが開いている。次の commit で消す
+
+    def ingest_records(self, records: Iterable[bytes | bytearray | memoryview]) -> int:
+        """生レコード（RA/SE 以外は無視）をまとめて解析して ingest する。"""
+        buffers: dict[bytes, bytearray] = {b"RA": bytearray(), b"SE": bytearray()}
+        for rec in records:
+            buf = buffers.get(bytes(rec[:2]))
+            if buf is not None:
+                buf += rec
+        se = decode_bulk(bytes(buffers[b"SE"]), "SE")
+        ra = decode_bulk(bytes(buffers[b"RA"]), "RA") if buffers[b"RA"] else None
+        return self.ingest(se, ra)
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from keiba_scraping.data.source import RaceCardSource
+from keiba_scraping.domain.models import HorseEntry, RaceCard
+from keiba_scraping.jvdata.parser import TEXT_ENCODING, p_top3_from_odds
+from keiba_scraping.store.race_store import RaceStore
+
+
+@dataclass
+class StoreRaceCardSource(RaceCardSource):
+    """ローカルの RaceStore から出馬表を返す。JV-Link / COM ブリッジには一切触れない。"""
+
+    store_dir: Path
+    store: RaceStore = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.store = RaceStore(self.store_dir)
+
+    def get_race_card(self, race_id: str) -> RaceCard:
+        race = self.store.get_race(race_id)
+        if race is None:
+            raise LookupError(f"race_id={race_id} is not in the local store ({self.store_dir})")
+
+        # 出走取消・発走除外は除く
+        runners_ok = ~np.isin(race["runners.ijyo_cd"], [b"1", b"2"])
+        ids = race["runners.ketto_num"][runners_ok]  # type: ignore[index]
+        names = race["runners.bamei"][runners_ok]  # type: ignore[index]
+        p = p_top3_from_odds(race["runners.odds"][runners_ok])  # type: ignore[index]
+
+        horses = [
+            HorseEntry(
+                horse_id=i.decode("ascii").strip(),
+                name=n.decode(TEXT_ENCODING, errors="replace").rstrip("　 "),
+                p_top3=float(x),
+            )
+            for i, n, x in zip(ids, names, p)
+        ]
+        return RaceCard(race_id=race_id, horses=horses)
+
+    def data_version(self) -> str | None:
+        # ingest のたびに上がる
+        return f"store-{self.store.version}"
+
+    def race_ids_between(self, date_from: int, date_to: int) -> list[str]:
+        return self.store.race_ids_between(date_from, date_to)
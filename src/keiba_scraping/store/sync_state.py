@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+from keiba_scraping.store.race_store import _fsync_write
+
+
+class SyncState:
+    """dataspec ごとの同期ウォーターマーク（前回 commit した JVOpen の lastfiletimestamp）。
+
+    commit() はデータ側の書き込みが fsync 済みになってから呼ぶこと。途中で落ちた場合は
+    古いウォーターマークから取り直すだけなので、取りこぼしは起きない。
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.entries: dict[str, dict] = {}
+        if self.path.exists():
+            self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+
+    def watermark(self, dataspec: str) -> str | None:
+        entry = self.entries.get(dataspec)
+        return entry["watermark"] if entry else None
+
+    def totals(self, dataspec: str) -> tuple[int, int]:
+        """これまでに commit したレコード数・バイト数の累計。"""
+        entry = self.entries.get(dataspec, {})
+        return int(entry.get("records", 0)), int(entry.get("bytes", 0))
+
+    def commit(self, dataspec: str, watermark: str, records: int, nbytes: int) -> dict:
+        prev_records, prev_bytes = self.totals(dataspec)
+        entry = {
+            "watermark": watermark,
+            "records": prev_records + records,
+            "bytes": prev_bytes + nbytes,
+            "runs": int(self.entries.get(dataspec, {}).get("runs", 0)) + 1,
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.entries[dataspec] = entry
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        _fsync_write(self.path, json.dumps(self.entries, indent=2).encode("utf-8"))
+        return entry
+
+
+class DrainCheckpoint:
+    """途中で落ちた drain の再開位置（dataspec・fromdate・option ごと）。
+
+    files は store への書き込みが fsync 済みになったファイル、file / offset は書きかけのファイルと
+    そのうち書き込み済みのレコード数。再開時は files を JVSkip し、file の先頭 offset 件は読み捨てる。
+    drain が最後まで終わったら clear() する。
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.entries: dict[str, dict] = {}
+        if self.path.exists():
+            self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+
+    @staticmethod
+    def key(dataspec: str, fromdate: str, option: str) -> str:
+        return f"{dataspec}|{fromdate}|{option}"
+
+    def get(self, key: str) -> dict | None:
+        return self.entries.get(key)
+
+    def save(self, key: str, files: list[str], file: str, offset: int, records: int, nbytes: int) -> dict:
+        """records / nbytes はこの drain で書き込み済みの累計。"""
+        entry = {
+            "files": files,
+            "file": file,
+            "offset": offset,
+            "records": records,
+            "bytes": nbytes,
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.entries[key] = entry
+        self._write()
+        return entry
+
+    def clear(self, key: str) -> None:
+        if self.entries.pop(key, None) is not None:
+            self._write()
+
+    def _write(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        _fsync_write(self.path, json.dumps(self.entries, indent=2, ensure_ascii=False).encode("utf-8"))
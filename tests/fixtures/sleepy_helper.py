@@ -0,0 +1,52 @@
+"""sleepy_helper.py – stand-in for jvrace_records.py that sleeps before answering.
+
+Used by tests/test_async_datalab_source.py.  Prints the same JSON line as
+jvrace_records.py (RA/SE records from tools/jvlink32/fake_jvdata.py) after
+sleeping, and leaves "<race_id>.start" / "<race_id>.done" files (with
+time.time() inside) in SLEEPY_HELPER_DIR so a test can see when it ran and
+whether it was killed before finishing.
+
+Env vars:
+  SLEEPY_HELPER_DIR     (required)  where the start/done files go
+  SLEEPY_HELPER_SEC     0.2         sleep before answering
+  SLEEPY_HELPER_DELAYS  (none)      per-race sleeps, "race_id=sec,race_id=sec"
+  SLEEPY_HELPER_FAIL    (none)      comma-separated race_ids answered at once with ok=false
+
+Usage
+-----
+python tests/fixtures/sleepy_helper.py 2024010606010111
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools" / "jvlink32"))
+
+from fake_jvdata import race_records
+
+
+def main() -> int:
+    race_id = sys.argv[1]
+    out_dir = Path(os.environ["SLEEPY_HELPER_DIR"])
+    (out_dir / f"{race_id}.start").write_text(repr(time.time()))
+
+    if race_id in os.environ.get("SLEEPY_HELPER_FAIL", "").split(","):
+        print(json.dumps({"ok": False, "race_id": race_id, "error": "injected failure"}))
+        return 1
+
+    delays = dict(x.split("=") for x in os.environ.get("SLEEPY_HELPER_DELAYS", "").split(",") if x)
+    time.sleep(float(delays.get(race_id, os.environ.get("SLEEPY_HELPER_SEC", "0.2"))))
+
+    recs = race_records(race_id)
+    print(json.dumps({"ok": True, "race_id": race_id, "records": recs["RA"] + recs["SE"]}))
+    (out_dir / f"{race_id}.done").write_text(repr(time.time()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+from keiba_scraping.datalab.async_source import AsyncDataLabRaceCardSource
+from keiba_scraping.profiling import trace
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+HELPER = "tests/fixtures/sleepy_helper.py"
+
+# 2024-01-07（日）中山 1〜6R
+RACE_IDS = [f"20240107060101{r:02d}" for r in range(1, 7)]
+
+
+@pytest.fixture
+def helper_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("SLEEPY_HELPER_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _source(max_concurrency: int = 2, timeout: float | None = 30.0) -> AsyncDataLabRaceCardSource:
+    return AsyncDataLabRaceCardSource(sys.executable, REPO_ROOT, max_concurrency, timeout, helper=HELPER)
+
+
+def _interval(helper_dir: Path, race_id: str) -> tuple[float, float]:
+    start = float((helper_dir / f"{race_id}.start").read_text())
+    return start, float((helper_dir / f"{race_id}.done").read_text())
+
+
+def test_results_follow_input_order(helper_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # 先のレースほど遅く返るようにして、完了順と入力順をずらす
+    delays = {race_id: 0.1 * (len(RACE_IDS) - i) for i, race_id in enumerate(RACE_IDS)}
+    monkeypatch.setenv("SLEEPY_HELPER_DELAYS", ",".join(f"{k}={v}" for k, v in delays.items()))
+
+    cards = asyncio.run(_source(max_concurrency=len(RACE_IDS)).get_race_cards(RACE_IDS))
+
+    assert [card.race_id for card in cards] == RACE_IDS
+    assert all(card.horses for card in cards)
+    done = sorted(RACE_IDS, key=lambda race_id: _interval(helper_dir, race_id)[1])
+    assert done != RACE_IDS
+
+
+def test_concurrency_is_bounded(helper_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("SLEEPY_HELPER_SEC", "0.4")
+
+    asyncio.run(_source(max_concurrency=2).get_race_cards(RACE_IDS))
+
+    # ヘルパーが動いていた区間の重なりの最大 = 実際の同時実行数（以下）
+    events = []
+    for race_id in RACE_IDS:
+        start, end = _interval(helper_dir, race_id)
+        events += [(start, 1), (end, -1)]
+    running = peak = 0
+    for _, step in sorted(events):
+        running += step
+        peak = max(peak, running)
+    assert peak == 2
+
+
+def test_timeout_kills_helper(helper_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    race_id = RACE_IDS[0]
+    monkeypatch.setenv("SLEEPY_HELPER_SEC", "2.0")
+
+    with pytest.raises(TimeoutError, match=race_id):
+        asyncio.run(_source(timeout=0.5).get_race_card(race_id))
+
+    # kill されていれば、眠り終えた後の .done は書かれない
+    assert (helper_dir / f"{race_id}.start").exists()
+    asyncio.run(asyncio.sleep(2.5))
+    assert not (helper_dir / f"{race_id}.done").exists()
+
+
+def test_failure_cancels_and_kills_the_rest(helper_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    bad = RACE_IDS[-1]
+    monkeypatch.setenv("SLEEPY_HELPER_SEC", "2.0")
+    monkeypatch.setenv("SLEEPY_HELPER_FAIL", bad)
+
+    with pytest.raises(RuntimeError, match="injected failure"):
+        asyncio.run(_source(max_concurrency=len(RACE_IDS)).get_race_cards(RACE_IDS))
+
+    asyncio.run(asyncio.sleep(2.5))
+    assert not list(helper_dir.glob("*.done"))
+
+
+def test_concurrent_subprocess_spans_are_siblings(helper_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    fast, slow = RACE_IDS[:2]
+    monkeypatch.setenv("SLEEPY_HELPER_DELAYS", f"{fast}=0.1,{slow}=1.0")
+    source = _source()
+
+    async def fetch(race_id: str) -> None:
+        with trace.span("fetch", race_id=race_id):
+            await source._run_32bit(HELPER, race_id)
+
+    async def main() -> None:
+        await asyncio.gather(fetch(slow), fetch(fast))
+
+    tracer = trace.enable()
+    try:
+        asyncio.run(main())
+    finally:
+        trace.disable()
+
+    subprocesses = [s for s in tracer.spans if s.name == "datalab.subprocess"]
+    assert [(s.path, s.depth) for s in subprocesses] == [("fetch/datalab.subprocess", 1)] * 2
+    fetches = {s.args["race_id"]: s for s in tracer.spans if s.name == "fetch"}
+    # 各 fetch の子はそのレースのヘルパーだけ（自身の時間はほぼ 0）
+    for race_id, s in fetches.items():
+        start, end = _interval(helper_dir, race_id)
+        assert s.self_ns < 0.1e9
+        assert s.duration_ns >= (end - start) * 1e9
+    assert fetches[fast].duration_ns < 1.0e9 <= fetches[slow].duration_ns
+    durations = sorted(s.duration_ns for s in subprocesses)
+    assert durations[0] < 1.0e9 <= durations[1]
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import csv
+import json
+from pathlib import Path
+
+import pytest
+
+from keiba_scraping.backtest.engine import RaceSettlement, Summary, run_backtest, settle
+from keiba_scraping.backtest.history import HistoricalRace, race_from_json, race_to_json, write_history
+from keiba_scraping.backtest.strategy import Bet, BoxStrategy
+from keiba_scraping.backtest.synthetic import synthetic_history
+from keiba_scraping.domain.models import HorseEntry, RaceCard
+
+
+def _race(race_id: str, date: int, trio: tuple[str, str, str], trio_yen: int = 1230) -> HistoricalRace:
+    horses = [HorseEntry(f"H{i}", f"Horse{i}", 0.9 - 0.1 * i) for i in range(1, 9)]
+    return race_from_json({
+        "race_id": race_id,
+        "date": date,
+        "horses": [[h.horse_id, h.name, h.p_top3] for h in horses],
+        "finish": list(trio),
+        "payouts": {"trio": [[list(trio), trio_yen]], "wide": [[[trio[0], trio[2]], 410]]},
+    })
+
+
+def buy_123(card: RaceCard) -> list[Bet]:
+    return [Bet("trio", ("H1", "H2", "H3"), 100)]
+
+
+def test_settle_hit_miss_and_stake() -> None:
+    race = _race("2024010606010101", 20240106, ("H1", "H2", "H3"))
+    bets = [
+        Bet("trio", ("H3", "H1", "H2"), 300),  # 順不同で的中、300 円なので 1230 × 3
+        Bet("trio", ("H1", "H2", "H4"), 100),  # 外れ
+        Bet("wide", ("H3", "H1"), 250),  # 410 × 2.5
+    ]
+
+    s = settle(race, bets)
+
+    assert (s.bets, s.hits, s.stake, s.payout) == (3, 2, 650, 3690 + 1025)
+    assert s.profit == 4715 - 650
+    assert (s.race_id, s.date, s.venue) == ("2024010606010101", 20240106, "06")
+
+
+def test_max_drawdown() -> None:
+    total = Summary()
+    for i, profit in enumerate([300, -100, -200, 400, -100, -500, 200]):
+        stake = 100
+        total.add(RaceSettlement(f"r{i}", 20240106, "06", 1, int(profit > 0), stake, profit + stake))
+
+    # 累積 300, 200, 0, 400, 300, -200, 0。最大の落ち込みは 400 -> -200
+    assert total.max_drawdown == 600
+    assert total.profit == 0
+
+
+def test_drawdown_is_taken_in_date_order(tmp_path: Path) -> None:
+    hit, miss = ("H1", "H2", "H3"), ("H4", "H5", "H6")
+    # 日付・race_id 順の収支: -100, -100, +500, -100, -100, -100, -100（最大ドローダウン 400）
+    by_date = [
+        _race("2024010606010101", 20240106, miss),
+        _race("2024010706010101", 20240107, miss),
+        _race("2024011306010101", 20240113, hit, trio_yen=600),
+        _race("2024011406010101", 20240114, miss),
+        _race("2024011406010102", 20240114, miss),
+        _race("2024012006010101", 20240120, miss),
+        _race("2024012106010101", 20240121, miss),
+    ]
+    # ファイルの順（的中が先頭）に足すと落ち込みは 600 になる
+    file_order = [by_date[i] for i in (2, 6, 4, 0, 5, 1, 3)]
+    path = tmp_path / "history.ndjson"
+    write_history(path, file_order)
+    out = tmp_path / "settled.csv"
+
+    report = run_backtest([path], buy_123, workers=1, out_path=str(out))
+
+    assert report.total.max_drawdown == 400
+    assert report.total.profit == -100
+    with open(out, newline="", encoding="utf-8") as f:
+        assert [row["race_id"] for row in csv.DictReader(f)] == [r.race_id for r in by_date]
+
+
+@pytest.fixture(scope="module")
+def history_file(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    lines = [json.dumps(race_to_json(race)) for race in synthetic_history(1500, seed=3)]
+    lines.insert(700, "{not json")
+    lines.insert(1200, json.dumps({"race_id": "2014020106010101"}))  # horses がない
+    path = tmp_path_factory.mktemp("backtest") / "history.ndjson"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def test_workers_give_identical_totals(history_file: Path) -> None:
+    strategy = BoxStrategy(select=5)
+
+    single = run_backtest([history_file], strategy, workers=1, chunk_size=200)
+    pooled = run_backtest([history_file], strategy, workers=2, chunk_size=200)
+
+    assert single.total.races == 1500
+    assert single.total.to_dict() == pooled.total.to_dict()
+    assert {v: s.to_dict() for v, s in single.by_venue.items()} == {v: s.to_dict() for v, s in pooled.by_venue.items()}
+    assert single.failed == pooled.failed == 2
+    assert single.errors == pooled.errors
+    assert [error.split(":")[0] for _, error in single.errors] == ["JSONDecodeError", "KeyError"]
+    assert [race_id for race_id, _ in single.errors] == ["", ""]
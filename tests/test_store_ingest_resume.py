@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from keiba_scraping.store.race_store import RACE_COLUMNS, RUNNER_COLUMNS, RaceStore
+from keiba_scraping.store.sync_state import DrainCheckpoint
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "tools" / "jvlink32"))
+
+import jvstore_ingest
+
+FROMDATE = "20240101000000"
+# fake_bridge の 1 プロセスが落ちるまでに返す件数（RA/SE は全体で 1400 件ほど）
+CRASH_AFTER = "500"
+
+
+def _use_fake_bridge(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("JVLINK_BRIDGE_EXE", str(REPO_ROOT / "tools" / "jvlink32" / "fake_bridge.py"))
+    monkeypatch.setenv("FAKE_BRIDGE_DATA", "races")
+    monkeypatch.setenv("FAKE_BRIDGE_DAYS", "14")
+    monkeypatch.delenv("FAKE_BRIDGE_CRASH_AFTER_RECORDS", raising=False)
+
+
+@pytest.fixture(autouse=True)
+def fake_bridge(monkeypatch: pytest.MonkeyPatch) -> None:
+    _use_fake_bridge(monkeypatch)
+    monkeypatch.setattr(jvstore_ingest, "RESTART_BACKOFF_SEC", 0.0)
+    # ファイルの途中でも再開位置が進むように小さくする
+    monkeypatch.setattr(jvstore_ingest, "CHECKPOINT_RECORDS", 400)
+
+
+def _ingest(root: Path, max_restarts: int = 0) -> tuple[RaceStore, DrainCheckpoint, dict]:
+    store = RaceStore(root)
+    checkpoint = DrainCheckpoint(root / "drain_checkpoint.json")
+    _, result = jvstore_ingest.ingest_drain(store, "RACE", FROMDATE, "1", checkpoint, max_restarts)
+    return store, checkpoint, result
+
+
+def _assert_same_races(store: RaceStore, expected: RaceStore) -> None:
+    race_ids = expected.race_ids_between(20240101, 20241231)
+    assert race_ids
+    assert store.race_ids_between(20240101, 20241231) == race_ids
+    for race_id in race_ids:
+        got, want = store.get_race(race_id), expected.get_race(race_id)
+        # runner_start は書き込んだ順で変わる
+        for name in [n for n in RACE_COLUMNS if n != "runner_start"] + [f"runners.{n}" for n in RUNNER_COLUMNS]:
+            assert np.array_equal(got[name], want[name]), (race_id, name)
+
+
+@pytest.fixture(scope="module")
+def clean_store(tmp_path_factory: pytest.TempPathFactory) -> RaceStore:
+    with pytest.MonkeyPatch.context() as mp:
+        _use_fake_bridge(mp)
+        store, _, result = _ingest(tmp_path_factory.mktemp("clean"))
+    assert result["ok"] and result["resume"]["restarts"] == 0
+    return store
+
+
+def test_crashes_are_resumed_within_one_drain(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, clean_store: RaceStore
+) -> None:
+    monkeypatch.setenv("FAKE_BRIDGE_CRASH_AFTER_RECORDS", CRASH_AFTER)
+
+    store, checkpoint, result = _ingest(tmp_path, max_restarts=5)
+
+    resume = result["resume"]
+    assert result["ok"] and result["drain"]["eof"]
+    assert resume["restarts"] >= 1
+    assert resume["saved_records"] > 0
+    assert checkpoint.get(DrainCheckpoint.key("RACE", FROMDATE, "1")) is None
+    _assert_same_races(store, clean_store)
+
+
+def test_checkpoint_resumes_the_next_run(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, clean_store: RaceStore
+) -> None:
+    monkeypatch.setenv("FAKE_BRIDGE_CRASH_AFTER_RECORDS", CRASH_AFTER)
+    with pytest.raises(RuntimeError):
+        _ingest(tmp_path)
+    key = DrainCheckpoint.key("RACE", FROMDATE, "1")
+    left = DrainCheckpoint(tmp_path / "drain_checkpoint.json").get(key)
+    assert left is not None and left["records"] > 0
+
+    monkeypatch.delenv("FAKE_BRIDGE_CRASH_AFTER_RECORDS")
+    store, checkpoint, result = _ingest(tmp_path)
+
+    assert result["ok"] and result["resume"]["resumed"]
+    assert result["resume"]["saved_records"] == left["records"]
+    assert checkpoint.get(key) is None
+    _assert_same_races(RaceStore(tmp_path), clean_store)
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Iterator
+
+import pytest
+
+from keiba_scraping.profiling import trace
+
+
+@pytest.fixture
+def tracer() -> Iterator[trace.Tracer]:
+    tracer = trace.enable()
+    try:
+        yield tracer
+    finally:
+        trace.disable()
+
+
+def _by_path(tracer: trace.Tracer) -> dict[str, list[trace.SpanRecord]]:
+    out: dict[str, list[trace.SpanRecord]] = {}
+    for s in tracer.spans:
+        out.setdefault(s.path, []).append(s)
+    return out
+
+
+def test_nested_spans(tracer: trace.Tracer) -> None:
+    with trace.span("outer"):
+        with trace.span("inner"):
+            pass
+        with trace.span("inner"):
+            pass
+
+    spans = _by_path(tracer)
+    assert sorted(spans) == ["outer", "outer/inner"]
+    (outer,) = spans["outer"]
+    inner = spans["outer/inner"]
+    assert outer.depth == 0 and [s.depth for s in inner] == [1, 1]
+    assert outer.self_ns == outer.duration_ns - sum(s.duration_ns for s in inner)
+
+
+def test_concurrent_tasks_get_their_own_paths(tracer: trace.Tracer) -> None:
+    async def fetch(name: str, sec: float) -> None:
+        with trace.span("fetch", race=name):
+            with trace.span("wait"):
+                await asyncio.sleep(sec)
+
+    async def main() -> None:
+        with trace.span("batch"):
+            await asyncio.gather(fetch("slow", 0.2), fetch("fast", 0.05))
+
+    asyncio.run(main())
+
+    spans = _by_path(tracer)
+    assert sorted(spans) == ["batch", "batch/fetch", "batch/fetch/wait"]
+    fetches = {s.args["race"]: s for s in spans["batch/fetch"]}
+    assert 0.2e9 <= fetches["slow"].duration_ns < 0.2e9 + 0.1e9
+    assert 0.05e9 <= fetches["fast"].duration_ns < 0.15e9
+    # 子（wait）の時間は自分のタスクの fetch からだけ引かれる
+    assert all(s.self_ns < 0.02e9 for s in spans["batch/fetch"])
+    assert [s.depth for s in spans["batch/fetch/wait"]] == [2, 2]
+
+
+def test_threads_do_not_share_frames(tracer: trace.Tracer) -> None:
+    started = threading.Barrier(2)
+
+    def work() -> None:
+        with trace.span("thread"):
+            started.wait()
+
+    threads = [threading.Thread(target=work) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert [s.path for s in tracer.spans] == ["thread", "thread"]
@@ -8,19 +8,56 @@
 //   JV_OPTION                   1               (JVOpen option)
 //   JV_SAVE_PATH                C:\ProgramData\JRA-VAN\Data
 //   JV_READ_MAX_WAIT_SEC        60
-//   JV_READ_INTERVAL_SEC        0.5
-//   JV_SLEEP_AFTER_OPEN_SEC     1.0   (delay after JVOpen before JVRead; set 0 to skip)
+//   JV_READ_INTERVAL_SEC        0.2   (longest wait between JVRead -3 retries, see "read scheduler")
+//   JV_READ_BACKOFF_MIN_SEC     0.01  (first wait after a -3 / after JVStatus moved)
+//   JV_READ_BACKOFF_JITTER      0.2   (each wait is scaled by a random 1 ± jitter)
+//   JV_SLEEP_AFTER_OPEN_SEC     0     (fixed delay after JVOpen before JVRead; legacy, 0 = none)
 //   JV_ENABLE_UI_PROPERTIES     1     (call JVSetUIProperties with safe defaults)
 //   JV_ENABLE_STATUS_POLL       1     (poll JVStatus after open until ready or timeout)
 //   JV_STATUS_POLL_MAX_WAIT_SEC 10
-//   JV_STATUS_POLL_INTERVAL_SEC 0.5
 //   JV_READ_REQUIRE_STATUS_ZERO 1     (gate JVRead: require JVStatus==0 before calling JVRead)
+//   JV_READ_MODE                first (stop at the first record) | drain (read until EOF)
+//   JV_RECORD_TYPES             RA,SE (drain: JVSkip files whose records have other type IDs)
+//   JV_SKIP_FILES               a.jvd,b.jvd (drain: JVSkip these files on their first record)
+//   JV_BRIDGE_MODE              oneshot (default) | server (see "server mode" below)
+//   JV_OUTPUT_FORMAT            json (default) | binary (drain: length-prefixed frames, see below)
 //
 // Debug:
 //   JVBRIDGE_DEBUG              1     (prints step logs to stderr)
 //
 // Outputs a single JSON line to stdout, then exits 0 on success / 1 on error.
-
+// In drain mode every record / file boundary / JVSkip is written as its own
+// JSON line ("type": "record" | "file_end" | "skip") as soon as it is read,
+// and the final line is the usual result object with "type": "result".
+//
+// With JV_OUTPUT_FORMAT=binary the drain stream is a sequence of frames
+// instead of JSON lines, each a 12-byte little-endian header + payload:
+//   u8 kind | 2 bytes record type | u8 0 | u32 filename id | u32 payload length
+//   kind 1 record   payload = raw Shift-JIS record bytes
+//        2 filename payload = UTF-8 name for "filename id" (sent before its first record)
+//        3 file_end (JVRead -1)   4 skip (payload = reason)
+//        5 result   payload = UTF-8 JSON result object (always the last frame)
+//
+// Server mode (JV_BRIDGE_MODE=server) keeps one JV-Link instance alive:
+// JVInit / JVSetSavePath / JVSetSaveFlag / JVSetPayFlag run once, a
+// {"type":"ready",...} line is written, then each stdin line is a JSON
+// command and gets exactly one JSON response line echoing its "id":
+//   {"id":1,"cmd":"open","dataspec":"RACE","fromdate":"20240101000000","option":1}
+//   {"id":2,"cmd":"read","max":500}      -> "events": [record|file_end|skip...], "drain"
+//   {"id":3,"cmd":"status"}              -> "status": JVStatus()
+//   {"id":4,"cmd":"skip"}                -> JVSkip the current file
+//   {"id":5,"cmd":"close"}               -> "close": JVClose()
+//   {"id":6,"cmd":"quit"}                -> exits after responding
+//
+// Read scheduler: there are no fixed sleeps between JVOpen and the first
+// record.  JVRead is called right away; on -3 (download in progress) the
+// bridge asks JVStatus (= files downloaded so far) and retries at once when
+// it moved, otherwise it waits JV_READ_BACKOFF_MIN_SEC, doubling up to
+// JV_READ_INTERVAL_SEC while nothing changes.  Every record or status change
+// resets the wait.  "schedule" in "read" / "drain" reports
+// first_record_ms (since JVOpen returned), idle_ms, waits and status_changes.
+
+using System.Diagnostics;
 using System.Reflection;
 using System.Runtime.InteropServices;
 using System.Text;
@@ -39,6 +76,10 @@ static double EnvDouble(string key, double fallback) =>
 static bool EnvBool(string key) =>
     Env(key, "0").Trim() == "1";
 
+static HashSet<string> EnvList(string key) =>
+    Env(key, "").Split(',', StringSplitOptions.RemoveEmptyEntries | StringSplitOptions.TrimEntries)
+                .ToHashSet(StringComparer.OrdinalIgnoreCase);
+
 static string[] GetReadArgsPreview(int size, string filename, string bufferPreview) => [
     size.ToString(),
     filename,
@@ -52,14 +93,20 @@ string fromdate              = Env("JV_FROMDATE",                "20240101000000
 int    option                = int.TryParse(Env("JV_OPTION", "1"), out var o) ? o : 1;
 string savePath              = Env("JV_SAVE_PATH",               @"C:\ProgramData\JRA-VAN\Data");
 double maxWaitSec            = EnvDouble("JV_READ_MAX_WAIT_SEC",        60.0);
-double intervalSec           = EnvDouble("JV_READ_INTERVAL_SEC",         0.5);
-double sleepAfterOpenSec     = EnvDouble("JV_SLEEP_AFTER_OPEN_SEC",      1.0);
+double intervalSec           = EnvDouble("JV_READ_INTERVAL_SEC",         0.2);
+double backoffMinSec         = EnvDouble("JV_READ_BACKOFF_MIN_SEC",      0.01);
+double backoffJitter         = EnvDouble("JV_READ_BACKOFF_JITTER",       0.2);
+double sleepAfterOpenSec     = EnvDouble("JV_SLEEP_AFTER_OPEN_SEC",      0.0);
 bool   enableUiProperties    = EnvBool("JV_ENABLE_UI_PROPERTIES");
 bool   enableStatusPoll      = EnvBool("JV_ENABLE_STATUS_POLL");
 double statusPollMaxWaitSec  = EnvDouble("JV_STATUS_POLL_MAX_WAIT_SEC", 10.0);
-double statusPollIntervalSec = EnvDouble("JV_STATUS_POLL_INTERVAL_SEC",  0.5);
 bool   requireStatusZero     = EnvBool("JV_READ_REQUIRE_STATUS_ZERO");
 bool   debugSteps            = EnvBool("JVBRIDGE_DEBUG");
+bool   drainMode             = Env("JV_READ_MODE", "first").Trim().ToLowerInvariant() == "drain";
+bool   serverMode            = Env("JV_BRIDGE_MODE", "oneshot").Trim().ToLowerInvariant() == "server";
+bool   binaryOutput          = Env("JV_OUTPUT_FORMAT", "json").Trim().ToLowerInvariant() == "binary";
+var    recordTypes           = EnvList("JV_RECORD_TYPES");
+var    skipFiles             = EnvList("JV_SKIP_FILES");
 
 // CLI args override env vars (positional: dataspec fromdate option)
 if (args.Length >= 1) dataspec = args[0];
@@ -99,6 +146,153 @@ var jsonOptions = new JsonSerializerOptions
 
 Console.OutputEncoding = Encoding.UTF8;
 
+// ── drain mode (JV_READ_MODE=drain) ──────────────────────────────────────────
+
+void EmitLine(object evt)
+{
+    Console.Out.WriteLine(JsonSerializer.Serialize(evt, evt.GetType(), jsonOptions));
+    Console.Out.Flush();
+}
+
+BinaryFrameWriter? frameWriter = drainMode && binaryOutput ? new BinaryFrameWriter(Console.OpenStandardOutput()) : null;
+
+// One scheduler per JVOpen: its clock starts when JVOpen returns.
+ReadScheduler NewScheduler() => new(backoffMinSec, intervalSec, backoffJitter);
+
+// Drain: read until JVRead returns 0 (EOF), one JSON line (or frame) per event.
+DrainInfo DrainRecords(IJVLink jv, ReadScheduler scheduler)
+{
+    var reader = new JVRecordReader(jv, maxWaitSec, scheduler, recordTypes, skipFiles, D);
+    reader.Read(int.MaxValue, frameWriter is not null ? frameWriter.Emit : EmitLine);
+    return reader.Info;
+}
+
+// ── server mode (JV_BRIDGE_MODE=server) ──────────────────────────────────────
+
+int ServeCommands()
+{
+    D("SERVER: new JVLinkClass()");
+    IJVLink jv = new JVLinkClass();
+    JVRecordReader? reader = null;
+    try
+    {
+        var setup = new SetupInfo
+        {
+            Init     = jv.JVInit("0"),
+            SavePath = jv.JVSetSavePath(savePath),
+            SaveFlag = jv.JVSetSaveFlag(1),
+            PayFlag  = jv.JVSetPayFlag(0),
+        };
+        if (enableUiProperties)
+        {
+            try { setup.UiProperties = jv.JVSetUIProperties(); }
+            catch (Exception uiEx) { setup.UiProperties = -9999; D("SERVER: JVSetUIProperties exception: " + uiEx); }
+        }
+        EmitLine(new ServerResponse { Type = "ready", Ok = setup.Init == 0, Setup = setup });
+
+        string? line;
+        while ((line = Console.In.ReadLine()) is not null)
+        {
+            if (string.IsNullOrWhiteSpace(line)) continue;
+
+            ServerRequest? req;
+            try
+            {
+                req = JsonSerializer.Deserialize<ServerRequest>(line, jsonOptions);
+            }
+            catch (JsonException jsonEx)
+            {
+                EmitLine(new ServerResponse { Ok = false, Error = "bad request: " + jsonEx.Message });
+                continue;
+            }
+            if (req is null) continue;
+
+            var resp = new ServerResponse { Id = req.Id, Cmd = req.Cmd, Ok = true };
+            D($"SERVER: cmd={req.Cmd} id={req.Id}");
+            try
+            {
+                switch (req.Cmd)
+                {
+                    case "open":
+                    {
+                        if (reader is not null) { jv.JVClose(); reader = null; }
+                        string ds = req.Dataspec ?? dataspec;
+                        string fd = req.Fromdate ?? fromdate;
+                        int    op = req.Option ?? option;
+                        int rc = 0, dc = 0;
+                        int openRet = jv.JVOpen(ds, fd, op, ref rc, ref dc, out string ts);
+                        resp.Open = new OpenInfo
+                        {
+                            Dataspec = ds, Fromdate = fd, Option = op, Ret = openRet,
+                            Readcount = rc, Downloadcount = dc, Lastfiletimestamp = ts,
+                        };
+                        if (openRet < 0)
+                        {
+                            resp.Ok = false;
+                            resp.Error = $"JVOpen returned {openRet}";
+                        }
+                        else
+                        {
+                            var types = req.RecordTypes is null ? recordTypes
+                                : req.RecordTypes.Split(',', StringSplitOptions.RemoveEmptyEntries | StringSplitOptions.TrimEntries)
+                                                 .ToHashSet(StringComparer.OrdinalIgnoreCase);
+                            reader = new JVRecordReader(jv, maxWaitSec, NewScheduler(), types, skipFiles, D);
+                        }
+                        break;
+                    }
+                    case "read":
+                        if (reader is null) { resp.Ok = false; resp.Error = "read before open"; break; }
+                        resp.Events = [];
+                        reader.Read(req.Max ?? 1000, resp.Events.Add);
+                        resp.Drain = reader.Info;
+                        if (reader.Info.Error is not null) { resp.Ok = false; resp.Error = reader.Info.Error; }
+                        break;
+                    case "status":
+                        resp.Status = jv.JVStatus();
+                        break;
+                    case "skip":
+                        if (reader is null) { resp.Ok = false; resp.Error = "skip before open"; break; }
+                        reader.Skip();
+                        break;
+                    case "close":
+                        if (reader is not null) { resp.Close = jv.JVClose(); reader = null; }
+                        break;
+                    case "ping":
+                        break;
+                    case "quit":
+                        EmitLine(resp);
+                        return 0;
+                    default:
+                        resp.Ok = false;
+                        resp.Error = $"unknown cmd: {req.Cmd}";
+                        break;
+                }
+            }
+            catch (COMException comEx)
+            {
+                resp.Ok = false;
+                resp.Hresult = $"0x{(uint)comEx.ErrorCode:X8}";
+                resp.Error = comEx.Message;
+                D("SERVER: COMException: " + comEx);
+            }
+            EmitLine(resp);
+        }
+        return 0;
+    }
+    finally
+    {
+        if (reader is not null) jv.JVClose();
+        Marshal.FinalReleaseComObject(jv);
+    }
+}
+
+if (serverMode)
+{
+    int serverExit = 1;
+    StaRunner.Run(() => serverExit = ServeCommands());
+    return serverExit;
+}
+
 // ── COM activation ───────────────────────────────────────────────────────────
 
 var result = new BridgeResult();
@@ -173,6 +367,7 @@ try
         D($"STEP open: before JVOpen dataspec={dataspec}, fromdate={fromdate}, option={option}");
 
         int openRet = jv.JVOpen(dataspec, fromdate, option, ref readcount, ref downloadcount, out lastts);
+        var scheduler = NewScheduler();
 
         D($"STEP open: after  JVOpen ret={openRet}, readcount={readcount}, downloadcount={downloadcount}, lastts={lastts}");
 
@@ -200,7 +395,7 @@ try
             if (sleepAfterOpenSec > 0)
             {
                 D($"STEP post_open_sleep: sleeping {sleepAfterOpenSec}s");
-                Thread.Sleep((int)(sleepAfterOpenSec * 1000));
+                scheduler.Sleep(sleepAfterOpenSec);
             }
 
             var statusSnapshots = new List<StatusSnapshot>();
@@ -238,7 +433,7 @@ try
                     });
 
                     if (statusRet == 0) break;
-                    Thread.Sleep((int)(statusPollIntervalSec * 1000));
+                    if (!scheduler.StatusChanged(statusRet)) scheduler.Wait();
                 }
 
                 result.StatusPoll = statusSnapshots;
@@ -259,7 +454,20 @@ try
                 }
             }
 
-            if (proceedToRead)
+            if (proceedToRead && drainMode)
+            {
+                result.Stage = "read";
+                D("STEP read: entering JVRead drain loop");
+
+                result.Drain = DrainRecords(jv, scheduler);
+                if (result.Drain.Error is not null)
+                {
+                    result.Error = result.Drain.Error;
+                    D("STEP read: drain failed; " + result.Error);
+                }
+            }
+
+            if (proceedToRead && !drainMode)
             {
                 result.Stage = "read";
                 D("STEP read: entering JVRead loop");
@@ -274,6 +482,7 @@ try
                 int size = 0;
                 string buff = "";
                 string filename = "";
+                int statusRet = 0;
                 var deadline = DateTime.UtcNow.AddSeconds(maxWaitSec);
                 var attempts = new List<AttemptInfo>();
 
@@ -322,8 +531,14 @@ try
                         ReadArgsValuesPreview = GetReadArgsPreview(size, filename, buff),
                     });
 
-                    if (readRet == 0 && size > 0) { found = true; break; }
-                    if (readRet == -3) { Thread.Sleep((int)(intervalSec * 1000)); continue; }
+                    if (readRet > 0 || (readRet == 0 && size > 0)) { scheduler.FirstRecord(); found = true; break; }
+                    if (readRet == -3)
+                    {
+                        statusRet = jv.JVStatus();
+                        if (statusRet < 0) break;
+                        if (!scheduler.StatusChanged(statusRet)) scheduler.Wait();
+                        continue;
+                    }
                     break;
                 }
 
@@ -335,9 +550,15 @@ try
                     Filename = filename,
                     BuffHead = buff.Length > 200 ? buff[..200] : buff,
                     AttemptsTail = attempts.Count > 10 ? attempts[^10..] : attempts,
+                    Schedule = scheduler.Snapshot(),
                 };
 
-                if (!found && readRet != 0)
+                if (statusRet < 0)
+                {
+                    result.Error = $"JVStatus returned {statusRet} while JVRead returned -3";
+                    D("STEP read: " + result.Error);
+                }
+                else if (!found && readRet != 0)
                 {
                     result.Error = $"JVRead returned {readRet}; size={size}; filename={filename}";
                     D("STEP read: not found; " + result.Error);
@@ -380,13 +601,18 @@ catch (Exception ex)
     D("CATCH Exception: " + ex);
 }
 
-Console.WriteLine(JsonSerializer.Serialize(result, jsonOptions));
+if (drainMode) result.Type = "result";
+if (frameWriter is not null)
+    frameWriter.WriteResult(JsonSerializer.SerializeToUtf8Bytes(result, jsonOptions));
+else
+    Console.WriteLine(JsonSerializer.Serialize(result, jsonOptions));
 return result.Ok ? 0 : 1;
 
 // ── record types ─────────────────────────────────────────────────────────────
 
 record BridgeResult
 {
+    public string?               Type              { get; set; }
     public bool                  Ok                { get; set; }
     public string?               Stage             { get; set; }
     public string?               Error             { get; set; }
@@ -396,6 +622,7 @@ record BridgeResult
     public OpenInfo?             Open              { get; set; }
     public List<StatusSnapshot>? StatusPoll        { get; set; }
     public ReadInfo?             Read              { get; set; }
+    public DrainInfo?            Drain             { get; set; }
     public int?                  Close             { get; set; }
 }
 
@@ -436,6 +663,7 @@ record ReadInfo
     public string            BuffHead     { get; set; } = "";
     public string?           DecodeError  { get; set; }
     public List<AttemptInfo> AttemptsTail { get; set; } = [];
+    public ScheduleInfo?     Schedule     { get; set; }
 }
 
 record AttemptInfo
@@ -451,6 +679,412 @@ record AttemptInfo
     public string[] ReadArgsValuesPreview { get; set; } = [];
 }
 
+record DrainInfo
+{
+    public bool    Eof             { get; set; }
+    public int     Ret             { get; set; }
+    public int     Records         { get; set; }
+    public long    Bytes           { get; set; }
+    public int     Files           { get; set; }
+    public int     SkippedFiles    { get; set; }
+    public int     FilteredRecords { get; set; }
+    public int     PendingRetries  { get; set; }
+    public string  LastFilename    { get; set; } = "";
+    public string? Error           { get; set; }
+    public ScheduleInfo? Schedule  { get; set; }
+}
+
+record ScheduleInfo
+{
+    public double? FirstRecordMs { get; set; }
+    public double  IdleMs        { get; set; }
+    public int     Waits         { get; set; }
+    public int     StatusChanges { get; set; }
+    public int?    LastStatus    { get; set; }
+}
+
+record ServerRequest
+{
+    public long    Id          { get; set; }
+    public string  Cmd         { get; set; } = "";
+    public string? Dataspec    { get; set; }
+    public string? Fromdate    { get; set; }
+    public int?    Option      { get; set; }
+    public int?    Max         { get; set; }
+    public string? RecordTypes { get; set; }
+}
+
+record ServerResponse
+{
+    public string        Type    { get; set; } = "response";
+    public long          Id      { get; set; }
+    public string?       Cmd     { get; set; }
+    public bool          Ok      { get; set; }
+    public string?       Error   { get; set; }
+    public string?       Hresult { get; set; }
+    public SetupInfo?    Setup   { get; set; }
+    public OpenInfo?     Open    { get; set; }
+    public List<object>? Events  { get; set; }
+    public DrainInfo?    Drain   { get; set; }
+    public int?          Status  { get; set; }
+    public int?          Close   { get; set; }
+}
+
+// Drain-mode stream events (one JSON line each).
+
+record RecordEvent
+{
+    public string Type       { get; } = "record";
+    public int    Seq        { get; set; }
+    public string Filename   { get; set; } = "";
+    public int    Size       { get; set; }
+    public string RecordType { get; set; } = "";
+    public string Data       { get; set; } = "";
+}
+
+record FileEndEvent
+{
+    public string Type     { get; } = "file_end";
+    public string Filename { get; set; } = "";
+}
+
+record SkipEvent
+{
+    public string Type       { get; } = "skip";
+    public string Filename   { get; set; } = "";
+    public string RecordType { get; set; } = "";
+    public string Reason     { get; set; } = "";
+}
+
+// ── Record reader (drain mode and server "read") ─────────────────────────────
+// Keeps the per-open JVRead state so reading can stop after N records and
+// resume later.  JVRead return values (JV-Link spec):
+//   > 0  record read (value = byte length)   0  EOF
+//   -1   file boundary                       -3  download in progress
+
+sealed class JVRecordReader
+{
+    const int JvReadBufferSize = 1 * 1024 * 1024; // 1 MB
+    const int JvFilenameSize   = 260;             // MAX_PATH
+
+    readonly IJVLink         _jv;
+    readonly IJVLinkSafe     _jvSafe;
+    readonly double          _maxWaitSec;
+    readonly ReadScheduler   _scheduler;
+    readonly HashSet<string> _recordTypes;
+    readonly HashSet<string> _skipFiles;
+    readonly Action<string>  _log;
+    readonly string          _buffTemplate     = new('\0', JvReadBufferSize);
+    readonly string          _filenameTemplate = new('\0', JvFilenameSize);
+
+    string _currentFile = "";
+    bool   _atFileStart = true;   // next record is the first one of a new file
+    bool   _fileSkipped;
+
+    public DrainInfo Info { get; } = new();
+
+    public JVRecordReader(IJVLink jv, double maxWaitSec, ReadScheduler scheduler,
+                          HashSet<string> recordTypes, HashSet<string> skipFiles, Action<string> log)
+    {
+        _jv          = jv;
+        // IJVLinkSafe shares the IJVLink GUID so JVRead receives pre-allocated BSTRs.
+        _jvSafe      = (IJVLinkSafe)(object)jv;
+        _maxWaitSec  = maxWaitSec;
+        _scheduler   = scheduler;
+        _recordTypes = recordTypes;
+        _skipFiles   = skipFiles;
+        _log         = log;
+    }
+
+    // Reads until maxRecords records were emitted, EOF, or an error.
+    // Returns false once the stream is finished (EOF or error).
+    public bool Read(int maxRecords, Action<object> emit)
+    {
+        int emitted  = 0;
+        var deadline = DateTime.UtcNow.AddSeconds(_maxWaitSec);
+
+        while (emitted < maxRecords && !Info.Eof && Info.Error is null)
+        {
+            string buff     = _buffTemplate;
+            int    size     = 0;
+            string filename = _filenameTemplate;
+
+            int readRet = _jvSafe.JVRead(ref buff, ref size, ref filename);
+            Info.Ret = readRet;
+
+            if (readRet > 0)
+            {
+                deadline = DateTime.UtcNow.AddSeconds(_maxWaitSec);
+                _scheduler.FirstRecord();
+
+                int fnEnd = filename.IndexOf('\0');
+                if (fnEnd >= 0) filename = filename[..fnEnd];
+
+                if (size <= 0) size = readRet;
+                if (size <= buff.Length) buff = buff[..size];
+                int bEnd = buff.IndexOf('\0');
+                if (bEnd >= 0) buff = buff[..bEnd];
+
+                string recordType = buff.Length >= 2 ? buff[..2] : buff;
+
+                if (_atFileStart)
+                {
+                    _atFileStart  = false;
+                    _fileSkipped  = false;
+                    _currentFile  = filename;
+                    Info.LastFilename = filename;
+
+                    string? skipReason =
+                        _skipFiles.Contains(filename) ? "skip_files" :
+                        _recordTypes.Count > 0 && !_recordTypes.Contains(recordType) ? "record_type" :
+                        null;
+
+                    if (skipReason is not null)
+                    {
+                        _log($"STEP drain: JVSkip file={filename} reason={skipReason}");
+                        Skip();
+                        emit(new SkipEvent { Filename = filename, RecordType = recordType, Reason = skipReason });
+                        continue;
+                    }
+                }
+
+                if (_recordTypes.Count > 0 && !_recordTypes.Contains(recordType))
+                {
+                    Info.FilteredRecords++;
+                    continue;
+                }
+
+                Info.Records++;
+                Info.Bytes += size;
+                emitted++;
+                emit(new RecordEvent
+                {
+                    Seq        = Info.Records,
+                    Filename   = filename,
+                    Size       = size,
+                    RecordType = recordType,
+                    Data       = buff,
+                });
+                continue;
+            }
+
+            if (readRet == 0)
+            {
+                Info.Eof = true;
+                _log($"STEP drain: EOF records={Info.Records}, files={Info.Files}");
+                break;
+            }
+
+            if (readRet == -1)
+            {
+                deadline = DateTime.UtcNow.AddSeconds(_maxWaitSec);
+                _scheduler.Progress();
+                if (!_atFileStart && !_fileSkipped)
+                {
+                    Info.Files++;
+                    emit(new FileEndEvent { Filename = _currentFile });
+                }
+                _atFileStart = true;
+                continue;
+            }
+
+            if (readRet == -3)
+            {
+                if (DateTime.UtcNow >= deadline)
+                {
+                    Info.Error = $"JVRead kept returning -3 for {_maxWaitSec}s";
+                    break;
+                }
+                Info.PendingRetries++;
+                int status = _jv.JVStatus();
+                if (status < 0)
+                {
+                    Info.Error = $"JVStatus returned {status} while JVRead returned -3";
+                    break;
+                }
+                if (!_scheduler.StatusChanged(status)) _scheduler.Wait();
+                continue;
+            }
+
+            Info.Error = $"JVRead returned {readRet}; last filename={_currentFile}";
+        }
+
+        Info.Schedule = _scheduler.Snapshot();
+        return !Info.Eof && Info.Error is null;
+    }
+
+    // JVSkip the rest of the current file.
+    public void Skip()
+    {
+        _jv.JVSkip();
+        Info.SkippedFiles++;
+        _fileSkipped = true;
+        _atFileStart = true;
+    }
+}
+
+// ── Read scheduler ───────────────────────────────────────────────────────────
+// Decides how long to wait after JVRead -3.  JVStatus returns the number of
+// files downloaded so far, so a change means the next JVRead can succeed:
+// retry at once.  While it stays put, wait minSec * 2^n (capped at maxSec),
+// scaled by 1 ± jitter so concurrent bridges do not poll in lockstep.
+
+sealed class ReadScheduler
+{
+    readonly double    _minSec;
+    readonly double    _maxSec;
+    readonly double    _jitter;
+    readonly Random    _rng   = new();
+    readonly Stopwatch _clock = Stopwatch.StartNew();   // started right after JVOpen
+
+    double  _delaySec;
+    int?    _lastStatus;
+    double? _firstRecordMs;
+    double  _idleMs;
+    int     _waits;
+    int     _statusChanges;
+
+    public ReadScheduler(double minSec, double maxSec, double jitter)
+    {
+        _minSec   = Math.Max(minSec, 0.001);
+        _maxSec   = Math.Max(maxSec, _minSec);
+        _jitter   = Math.Clamp(jitter, 0.0, 1.0);
+        _delaySec = _minSec;
+    }
+
+    // True when JVStatus moved since the last call (the first call only records it).
+    public bool StatusChanged(int status)
+    {
+        if (_lastStatus == status) return false;
+        bool changed = _lastStatus is not null;
+        _lastStatus = status;
+        if (!changed) return false;
+        _statusChanges++;
+        _delaySec = _minSec;
+        return true;
+    }
+
+    // A record or file boundary arrived: the next -3 starts from the shortest wait.
+    public void Progress() => _delaySec = _minSec;
+
+    public void FirstRecord()
+    {
+        _firstRecordMs ??= _clock.Elapsed.TotalMilliseconds;
+        Progress();
+    }
+
+    public void Wait()
+    {
+        Sleep(_delaySec * (1.0 + _jitter * (2.0 * _rng.NextDouble() - 1.0)));
+        _delaySec = Math.Min(_delaySec * 2.0, _maxSec);
+    }
+
+    // Counted as idle time (also used for the legacy JV_SLEEP_AFTER_OPEN_SEC).
+    public void Sleep(double sec)
+    {
+        long t0 = Stopwatch.GetTimestamp();
+        Thread.Sleep(TimeSpan.FromSeconds(sec));
+        _idleMs += Stopwatch.GetElapsedTime(t0).TotalMilliseconds;
+        _waits++;
+    }
+
+    public ScheduleInfo Snapshot() => new()
+    {
+        FirstRecordMs = _firstRecordMs is double ms ? Math.Round(ms, 3) : null,
+        IdleMs        = Math.Round(_idleMs, 3),
+        Waits         = _waits,
+        StatusChanges = _statusChanges,
+        LastStatus    = _lastStatus,
+    };
+}
+
+// ── Binary frame output (JV_OUTPUT_FORMAT=binary) ─────────────────────────────
+// Writes drain events as length-prefixed frames (layout in the header comment)
+// so the reader can hand out raw Shift-JIS bytes without JSON parsing.
+
+sealed class BinaryFrameWriter
+{
+    public const byte KindRecord   = 1;
+    public const byte KindFilename = 2;
+    public const byte KindFileEnd  = 3;
+    public const byte KindSkip     = 4;
+    public const byte KindResult   = 5;
+    const int HeaderSize = 12;
+
+    readonly Stream                  _out;
+    readonly Encoding                _sjis;
+    readonly Dictionary<string, uint> _fileIds = new(StringComparer.Ordinal);
+    readonly byte[]                  _header = new byte[HeaderSize];
+    byte[]                           _payload = new byte[64 * 1024];
+
+    public BinaryFrameWriter(Stream stdout)
+    {
+        _out = new BufferedStream(stdout, 256 * 1024);
+        Encoding.RegisterProvider(CodePagesEncodingProvider.Instance);
+        _sjis = Encoding.GetEncoding(932);
+    }
+
+    uint FileId(string filename)
+    {
+        if (_fileIds.TryGetValue(filename, out var id)) return id;
+        id = (uint)_fileIds.Count + 1;
+        _fileIds[filename] = id;
+        int n = Encoding.UTF8.GetBytes(filename, 0, filename.Length, EnsurePayload(filename.Length * 3), 0);
+        WriteFrame(KindFilename, "", id, n);
+        return id;
+    }
+
+    byte[] EnsurePayload(int size)
+    {
+        if (_payload.Length < size) _payload = new byte[Math.Max(size, _payload.Length * 2)];
+        return _payload;
+    }
+
+    void WriteFrame(byte kind, string recordType, uint fileId, int length)
+    {
+        _header[0] = kind;
+        _header[1] = recordType.Length > 0 ? (byte)recordType[0] : (byte)0;
+        _header[2] = recordType.Length > 1 ? (byte)recordType[1] : (byte)0;
+        _header[3] = 0;
+        BitConverter.TryWriteBytes(_header.AsSpan(4, 4), fileId);
+        BitConverter.TryWriteBytes(_header.AsSpan(8, 4), (uint)length);
+        _out.Write(_header, 0, HeaderSize);
+        if (length > 0) _out.Write(_payload, 0, length);
+    }
+
+    public void Emit(object evt)
+    {
+        switch (evt)
+        {
+            case RecordEvent r:
+            {
+                uint id = FileId(r.Filename);
+                int n = _sjis.GetBytes(r.Data, 0, r.Data.Length, EnsurePayload(_sjis.GetMaxByteCount(r.Data.Length)), 0);
+                WriteFrame(KindRecord, r.RecordType, id, n);
+                break;
+            }
+            case FileEndEvent f:
+                WriteFrame(KindFileEnd, "", FileId(f.Filename), 0);
+                _out.Flush();
+                break;
+            case SkipEvent k:
+            {
+                uint id = FileId(k.Filename);
+                int n = Encoding.UTF8.GetBytes(k.Reason, 0, k.Reason.Length, EnsurePayload(k.Reason.Length * 3), 0);
+                WriteFrame(KindSkip, k.RecordType, id, n);
+                break;
+            }
+        }
+    }
+
+    public void WriteResult(byte[] json)
+    {
+        json.CopyTo(EnsurePayload(json.Length), 0);
+        WriteFrame(KindResult, "", 0, json.Length);
+        _out.Flush();
+    }
+}
+
 // ── Safe COM interface for JVRead ────────────────────────────────────────────
 // Defines JVRead with [MarshalAs(UnmanagedType.BStr)] ref string parameters so
 // the CLR passes pre-allocated BSTR buffers rather than null pointers.  The
@@ -0,0 +1,98 @@
+"""bench_bridge_latency.py – per-call bridge spawn vs a warm server session.
+
+Each "lookup" opens a dataspec, reads every record and closes, the way a
+race-card fetch would.  The spawn path starts a fresh bridge per lookup
+(iter_bridge, drain mode); the warm path reuses one BridgeSessionPool.
+
+Usage
+-----
+# Real bridge (Windows):
+python tools/jvlink32/bench_bridge_latency.py --lookups 20
+
+# Offline with the stand-in; --fake-startup-sec models CLR + COM + JVInit cost:
+python tools/jvlink32/bench_bridge_latency.py --fake --fake-startup-sec 0.3
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+_HERE = Path(__file__).resolve().parent
+
+
+def _summary(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    return {
+        "n": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "total_s": sum(samples),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lookups", type=int, default=20)
+    parser.add_argument("--dataspec", default="RACE")
+    parser.add_argument("--fromdate", default="20240101000000")
+    parser.add_argument("--option", type=int, default=1)
+    parser.add_argument("--fake", action="store_true", help="Use fake_bridge.py instead of JVLinkBridge.exe.")
+    parser.add_argument("--fake-startup-sec", type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.fake:
+        os.environ["JVLINK_BRIDGE_EXE"] = str(_HERE / "fake_bridge.py")
+        os.environ["FAKE_BRIDGE_STARTUP_SEC"] = str(args.fake_startup_sec)
+
+    from bridge_client import BridgeSessionPool
+    from jvread_via_bridge import iter_bridge
+
+    spawn: list[float] = []
+    records = 0
+    for _ in range(args.lookups):
+        t0 = time.perf_counter()
+        for ev in iter_bridge(args.dataspec, args.fromdate, str(args.option)):
+            records += ev.get("type") == "record"
+        spawn.append(time.perf_counter() - t0)
+
+    warm: list[float] = []
+    with BridgeSessionPool(size=1) as pool:
+        t0 = time.perf_counter()
+        with pool.session():
+            pass
+        first_session_s = time.perf_counter() - t0
+        for _ in range(args.lookups):
+            t0 = time.perf_counter()
+            with pool.session() as s:
+                for ev in s.iter_records(args.dataspec, args.fromdate, args.option):
+                    records += ev.get("type") == "record"
+            warm.append(time.perf_counter() - t0)
+
+    report = {
+        "bridge": os.environ.get("JVLINK_BRIDGE_EXE", "JVLinkBridge.exe"),
+        "lookups": args.lookups,
+        "records_read": records,
+        "spawn_per_call": _summary(spawn),
+        "warm_session": _summary(warm),
+        "warm_session_startup_ms": first_session_s * 1000,
+    }
+    report["speedup_mean"] = report["spawn_per_call"]["mean_ms"] / max(report["warm_session"]["mean_ms"], 1e-9)
+
+    print(f"{'mode':<16}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for key in ("spawn_per_call", "warm_session"):
+        r = report[key]
+        print(f"{key:<16}{r['mean_ms']:>10.2f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}")
+    print(f"warm session start-up (once): {first_session_s * 1000:.2f} ms, speedup x{report['speedup_mean']:.1f}")
+    print(json.dumps(report), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,89 @@
+"""bench_framing.py – JSON lines vs binary frames on synthetic records.
+
+Builds the exact byte stream each bridge output format produces for N
+synthetic RA/SE records (with Shift-JIS text), then times how fast Python
+turns it back into raw record bytes:
+
+  json    json.loads per line + str.encode("cp932") (fixed byte offsets need bytes)
+  binary  FrameReader (readinto + memoryview, no decoding)
+
+Usage
+-----
+python tools/jvlink32/bench_framing.py --records 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import time
+
+from bridge_frames import KIND_RECORD, FrameReader, FrameWriter
+from fake_bridge import make_record
+
+
+def synthetic_events(n: int) -> list[dict]:
+    events = []
+    for i in range(n):
+        rt = "RA" if i % 16 == 0 else "SE"
+        data = make_record(rt, "20240101000000", i // 1000, i)
+        # Put a full-width name where SE keeps 馬名 (offset 40, 36 bytes).
+        data = data[:40] + "テストホース" + data[52:]
+        events.append({"type": "record", "seq": i + 1, "filename": f"{rt}{i // 1000:04d}.jvd",
+                       "size": len(data.encode("cp932")), "record_type": rt, "data": data})
+        if i % 1000 == 999:
+            events.append({"type": "file_end", "filename": f"{rt}{i // 1000:04d}.jvd"})
+    return events
+
+
+def bench_json(blob: bytes) -> tuple[int, int]:
+    records = nbytes = 0
+    for line in io.BytesIO(blob):
+        ev = json.loads(line)
+        if ev["type"] == "record":
+            raw = ev["data"].encode("cp932")
+            records += 1
+            nbytes += len(raw)
+    return records, nbytes
+
+
+def bench_binary(blob: bytes) -> tuple[int, int]:
+    records = nbytes = 0
+    for kind, _rt, _fid, payload in FrameReader(io.BufferedReader(io.BytesIO(blob))):
+        if kind == KIND_RECORD:
+            records += 1
+            nbytes += len(payload)
+    return records, nbytes
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    events = synthetic_events(args.records)
+    result = {"type": "result", "ok": True}
+
+    json_blob = ("\n".join(json.dumps(e, ensure_ascii=False) for e in events + [result]) + "\n").encode("utf-8")
+    out = io.BytesIO()
+    writer = FrameWriter(out)
+    for e in events:
+        writer.emit(e)
+    writer.write_result(result)
+    binary_blob = out.getvalue()
+
+    print(f"{'format':<8}{'stream MB':>11}{'records/s':>14}{'payload MB/s':>14}")
+    for name, fn, blob in (("json", bench_json, json_blob), ("binary", bench_binary, binary_blob)):
+        best = float("inf")
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            records, nbytes = fn(blob)
+            best = min(best, time.perf_counter() - t0)
+        print(f"{name:<8}{len(blob) / 1e6:>11.1f}{records / best:>14,.0f}{nbytes / best / 1e6:>14.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,102 @@
+"""bench_read_scheduler.py – fixed sleeps vs the JVStatus-driven read scheduler.
+
+Drains one dataspec through the bridge twice per scenario: once with the old
+fixed timings (1.0 s after JVOpen, JVRead -3 retried every 0.5 s) and once
+with the adaptive defaults.  With --fake the download progress is scripted
+through FAKE_BRIDGE_DOWNLOAD_SEC, so the numbers are reproducible on Linux.
+
+Usage
+-----
+# Offline with the stand-in (first file downloaded after 0.3 s, then one per second):
+python tools/jvlink32/bench_read_scheduler.py --fake --files 3 --first-download-sec 0.3 --download-step-sec 1.0
+
+# Real bridge (Windows):
+python tools/jvlink32/bench_read_scheduler.py --runs 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+_HERE = Path(__file__).resolve().parent
+
+MODES = {
+    "fixed": {
+        "JV_SLEEP_AFTER_OPEN_SEC": "1.0",
+        "JV_READ_BACKOFF_MIN_SEC": "0.5",
+        "JV_READ_INTERVAL_SEC": "0.5",
+        "JV_READ_BACKOFF_JITTER": "0",
+    },
+    "adaptive": {},
+}
+
+
+def _drain(dataspec: str, fromdate: str, option: str, env: dict[str, str]) -> dict:
+    from jvread_via_bridge import iter_bridge
+
+    t0 = time.perf_counter()
+    first_record_s = None
+    records = 0
+    result: dict = {}
+    for ev in iter_bridge(dataspec, fromdate, option, extra_env=env):
+        if ev.get("type") == "record":
+            records += 1
+            if first_record_s is None:
+                first_record_s = time.perf_counter() - t0
+        elif ev.get("type") == "result":
+            result = ev
+    schedule = (result.get("drain") or {}).get("schedule") or {}
+    return {
+        "wall_ms": (time.perf_counter() - t0) * 1000,
+        "client_first_record_ms": (first_record_s or 0.0) * 1000,
+        "first_record_ms": schedule.get("first_record_ms", 0.0),
+        "idle_ms": schedule.get("idle_ms", 0.0),
+        "waits": schedule.get("waits", 0),
+        "records": records,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--dataspec", default="RACE")
+    parser.add_argument("--fromdate", default="20240101000000")
+    parser.add_argument("--option", type=int, default=1)
+    parser.add_argument("--fake", action="store_true", help="Use fake_bridge.py instead of JVLinkBridge.exe.")
+    parser.add_argument("--files", type=int, default=3, help="--fake: number of files to download.")
+    parser.add_argument("--first-download-sec", type=float, default=0.3,
+                        help="--fake: the first file finishes downloading this long after JVOpen.")
+    parser.add_argument("--download-step-sec", type=float, default=1.0,
+                        help="--fake: each further file takes this much longer.")
+    args = parser.parse_args()
+
+    scenarios: dict[str, dict[str, str]] = {"": {}}
+    if args.fake:
+        os.environ["JVLINK_BRIDGE_EXE"] = str(_HERE / "fake_bridge.py")
+        os.environ["FAKE_BRIDGE_FILES"] = str(args.files)
+        steps = ",".join(f"{args.first_download_sec + i * args.download_step_sec:g}" for i in range(args.files))
+        scenarios = {"local": {}, "downloading": {"FAKE_BRIDGE_DOWNLOAD_SEC": steps}}
+
+    report: dict[str, dict] = {}
+    for scenario, scenario_env in scenarios.items():
+        for mode, mode_env in MODES.items():
+            runs = [_drain(args.dataspec, args.fromdate, str(args.option), {**scenario_env, **mode_env})
+                    for _ in range(args.runs)]
+            key = f"{scenario}/{mode}" if scenario else mode
+            report[key] = {k: statistics.fmean(r[k] for r in runs) for k in runs[0]}
+
+    print(f"{'scenario/mode':<22}{'wall ms':>10}{'1st rec ms':>12}{'idle ms':>10}{'waits':>7}")
+    for key, r in report.items():
+        print(f"{key:<22}{r['wall_ms']:>10.1f}{r['first_record_ms']:>12.1f}{r['idle_ms']:>10.1f}{r['waits']:>7.1f}")
+    print(json.dumps(report), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
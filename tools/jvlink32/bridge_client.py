@@ -0,0 +1,261 @@
+"""bridge_client.py – warm JVLinkBridge sessions (JV_BRIDGE_MODE=server).
+
+run_bridge() spawns one bridge per call, paying CLR start-up, COM
+activation and JVInit/JVSetSavePath/JVSetSaveFlag/JVSetPayFlag every time.
+BridgeSession keeps one bridge process running and talks to it over
+stdin/stdout: one JSON command line in, one JSON response line out, matched
+by "id" (see the "server mode" comment at the top of Program.cs).
+BridgeSessionPool hands out warm sessions to many lookups.
+
+Usage
+-----
+from bridge_client import BridgeSessionPool
+
+with BridgeSessionPool(size=2) as pool:
+    with pool.session() as s:
+        for ev in s.iter_records("RACE", "20240101000000", 1, record_types="RA,SE"):
+            ...
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import queue
+import subprocess
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from jvread_via_bridge import _bridge_args, _find_bridge, describe_exit_code
+
+
+class BridgeError(RuntimeError):
+    """A bridge command failed (ok=false) or the bridge process went away."""
+
+    def __init__(self, message: str, response: dict | None = None):
+        super().__init__(message)
+        self.response = response or {}
+
+
+class BridgeSession:
+    """One long-lived bridge process in server mode."""
+
+    def __init__(
+        self,
+        extra_env: dict[str, str] | None = None,
+        timeout_sec: float = 120.0,
+    ):
+        env = os.environ.copy()
+        if extra_env:
+            env.update(extra_env)
+        env["JV_BRIDGE_MODE"] = "server"
+
+        self.timeout_sec = timeout_sec
+        self._next_id = 1
+        self._lines: queue.Queue[str | None] = queue.Queue()
+        self._stderr: list[str] = []
+        self._proc = subprocess.Popen(
+            _bridge_args(_find_bridge(), None, None, None),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            env=env,
+            bufsize=1,
+        )
+        # Reader threads: a queue gives request() a timeout on every platform
+        # (Windows pipes cannot be select()ed) and never lets stderr fill up.
+        threading.Thread(target=self._pump_stdout, daemon=True).start()
+        threading.Thread(target=lambda: self._stderr.extend(self._proc.stderr), daemon=True).start()
+
+        self.ready = self._next_line()
+        if self.ready.get("type") != "ready":
+            self.shutdown()
+            raise BridgeError(f"Unexpected first line from bridge: {self.ready!r}", self.ready)
+        if self.ready.get("ok") is False:
+            # JVInit failed: the session could never read anything, so do not hand it out.
+            self.shutdown()
+            setup = self.ready.get("setup") or {}
+            raise BridgeError(f"Bridge start-up failed (JVInit={setup.get('init')}): {self.ready!r}", self.ready)
+
+    def _pump_stdout(self) -> None:
+        for line in self._proc.stdout:
+            self._lines.put(line)
+        self._lines.put(None)
+
+    def _next_line(self) -> dict:
+        while True:
+            try:
+                line = self._lines.get(timeout=self.timeout_sec)
+            except queue.Empty:
+                raise BridgeError(f"No response from bridge within {self.timeout_sec}s") from None
+            if line is None:
+                self._proc.wait()
+                stderr_text = "".join(self._stderr).strip()
+                raise BridgeError(
+                    f"Bridge exited with code {describe_exit_code(self._proc.returncode)}.\n"
+                    f"stderr: {stderr_text or '(empty)'}"
+                )
+            if line.strip():
+                return json.loads(line)
+
+    @property
+    def alive(self) -> bool:
+        return self._proc.poll() is None
+
+    def request(self, cmd: str, **params: Any) -> dict:
+        """Send one command and return its response (raises on ok=false)."""
+        req_id = self._next_id
+        self._next_id += 1
+        try:
+            self._proc.stdin.write(json.dumps({"id": req_id, "cmd": cmd, **params}, ensure_ascii=False) + "\n")
+            self._proc.stdin.flush()
+        except OSError as exc:
+            raise BridgeError(f"Bridge stdin closed: {exc}") from exc
+
+        resp = self._next_line()
+        if resp.get("id") != req_id:
+            raise BridgeError(f"Response id {resp.get('id')} does not match request id {req_id}", resp)
+        if not resp.get("ok"):
+            raise BridgeError(f"Bridge {cmd} failed: {resp.get('error')}", resp)
+        return resp
+
+    def open(self, dataspec: str, fromdate: str, option: int = 1, record_types: str | None = None) -> dict:
+        params: dict[str, Any] = {"dataspec": dataspec, "fromdate": fromdate, "option": option}
+        if record_types is not None:
+            params["record_types"] = record_types
+        return self.request("open", **params)["open"]
+
+    def read_batch(self, max_records: int = 1000) -> tuple[list[dict], dict]:
+        """Return (events, drain summary); drain["eof"] is True at the end."""
+        resp = self.request("read", max=max_records)
+        return resp.get("events", []), resp.get("drain", {})
+
+    def status(self) -> int:
+        return int(self.request("status")["status"])
+
+    def skip(self) -> None:
+        self.request("skip")
+
+    def close(self) -> int | None:
+        return self.request("close").get("close")
+
+    def iter_records(
+        self,
+        dataspec: str,
+        fromdate: str,
+        option: int = 1,
+        record_types: str | None = None,
+        batch: int = 1000,
+    ) -> Iterator[dict]:
+        """open -> read batches until EOF -> close, yielding drain-mode events."""
+        self.open(dataspec, fromdate, option, record_types)
+        try:
+            while True:
+                events, drain = self.read_batch(batch)
+                yield from events
+                if drain.get("eof"):
+                    break
+        finally:
+            if self.alive:
+                self.close()
+
+    def shutdown(self) -> None:
+        if self.alive:
+            try:
+                self.request("quit")
+            except BridgeError:
+                pass
+        try:
+            self._proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self._proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
+
+    def __enter__(self) -> BridgeSession:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.shutdown()
+
+
+class BridgeSessionPool:
+    """Up to `size` warm BridgeSessions shared by many callers (thread-safe).
+
+    Sessions are started lazily and returned to the pool after use; a session
+    whose process died, or whose command failed mid-read, is replaced.
+    """
+
+    def __init__(self, size: int = 1, extra_env: dict[str, str] | None = None, timeout_sec: float = 120.0):
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        self.size = size
+        self._extra_env = extra_env
+        self._timeout_sec = timeout_sec
+        self._idle: list[BridgeSession] = []
+        self._created = 0
+        self._cond = threading.Condition()
+        self.spawned = 0
+
+    def _acquire(self) -> BridgeSession:
+        with self._cond:
+            # Wait for an idle session or a free slot (notified by _release/_discard).
+            self._cond.wait_for(lambda: self._idle or self._created < self.size)
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+            self.spawned += 1
+        try:
+            return BridgeSession(self._extra_env, self._timeout_sec)
+        except BaseException:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, session: BridgeSession) -> None:
+        with self._cond:
+            self._idle.append(session)
+            self._cond.notify()
+
+    def _discard(self, session: BridgeSession) -> None:
+        session.shutdown()
+        with self._cond:
+            self._created -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def session(self) -> Iterator[BridgeSession]:
+        s = self._acquire()
+        if not s.alive:
+            self._discard(s)
+            s = self._acquire()
+        try:
+            yield s
+        except BaseException:
+            # State of the JV-Link instance is unknown (open session, half-read file).
+            self._discard(s)
+            raise
+        if s.alive:
+            self._release(s)
+        else:
+            self._discard(s)
+
+    def shutdown(self) -> None:
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for s in idle:
+            self._discard(s)
+
+    def __enter__(self) -> BridgeSessionPool:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.shutdown()
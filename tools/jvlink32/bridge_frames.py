@@ -0,0 +1,170 @@
+"""bridge_frames.py – binary record framing between JVLinkBridge and Python.
+
+With JV_READ_MODE=drain and JV_OUTPUT_FORMAT=binary the bridge writes
+length-prefixed frames instead of JSON lines (layout documented at the top
+of JVLinkBridge/Program.cs):
+
+    u8 kind | 2s record type | u8 0 | u32 filename id | u32 payload length
+
+FrameReader reads them with readinto() into one reusable bytearray and hands
+out memoryview slices of the raw Shift-JIS record bytes, so a bulk pull does
+no JSON parsing and no per-record string copies.  A payload view is only
+valid until the next frame is read; copy it (bytes(view)) to keep it.
+
+Usage
+-----
+from bridge_frames import KIND_RECORD, iter_bridge_frames
+
+for kind, record_type, filename, payload in iter_bridge_frames("RACE", "20240101000000", "1"):
+    if kind == KIND_RECORD and record_type == b"RA":
+        parse(payload)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import subprocess
+import threading
+from collections.abc import Iterator
+from typing import BinaryIO
+
+from jvread_via_bridge import _bridge_args, _find_bridge, describe_exit_code
+
+KIND_RECORD = 1
+KIND_FILENAME = 2
+KIND_FILE_END = 3
+KIND_SKIP = 4
+KIND_RESULT = 5
+
+HEADER = struct.Struct("<B2sxII")
+
+
+def write_frame(out: BinaryIO, kind: int, record_type: bytes, file_id: int, payload: bytes = b"") -> None:
+    out.write(HEADER.pack(kind, record_type, file_id, len(payload)))
+    if payload:
+        out.write(payload)
+
+
+class FrameWriter:
+    """Python counterpart of BinaryFrameWriter in Program.cs (used by fake_bridge.py)."""
+
+    def __init__(self, out: BinaryIO):
+        self._out = out
+        self._file_ids: dict[str, int] = {}
+
+    def _file_id(self, filename: str) -> int:
+        fid = self._file_ids.get(filename)
+        if fid is None:
+            fid = self._file_ids[filename] = len(self._file_ids) + 1
+            write_frame(self._out, KIND_FILENAME, b"", fid, filename.encode("utf-8"))
+        return fid
+
+    def emit(self, event: dict) -> None:
+        etype = event["type"]
+        if etype == "record":
+            fid = self._file_id(event["filename"])
+            write_frame(self._out, KIND_RECORD, event["record_type"].encode("ascii"), fid,
+                        event["data"].encode("cp932"))
+        elif etype == "file_end":
+            write_frame(self._out, KIND_FILE_END, b"", self._file_id(event["filename"]))
+            self._out.flush()
+        elif etype == "skip":
+            fid = self._file_id(event["filename"])
+            write_frame(self._out, KIND_SKIP, event["record_type"].encode("ascii"), fid,
+                        event["reason"].encode("utf-8"))
+
+    def write_result(self, result: dict) -> None:
+        write_frame(self._out, KIND_RESULT, b"", 0, json.dumps(result, ensure_ascii=False).encode("utf-8"))
+        self._out.flush()
+
+
+class FrameReader:
+    """Iterates (kind, record_type, filename_id, payload memoryview) frames."""
+
+    def __init__(self, stream: BinaryIO, initial_capacity: int = 64 * 1024):
+        self._stream = stream
+        self._header = bytearray(HEADER.size)
+        self._header_view = memoryview(self._header)
+        self._buf = bytearray(initial_capacity)
+        self._view = memoryview(self._buf)
+        self.filenames: dict[int, str] = {}
+        self.result: dict | None = None
+
+    def _read_exact(self, view: memoryview) -> bool:
+        got = 0
+        n = len(view)
+        while got < n:
+            r = self._stream.readinto(view[got:])
+            if not r:
+                if got == 0:
+                    return False
+                raise EOFError(f"Truncated frame: got {got} of {n} bytes")
+            got += r
+        return True
+
+    def __iter__(self) -> Iterator[tuple[int, bytes, int, memoryview]]:
+        unpack = HEADER.unpack_from
+        while self._read_exact(self._header_view):
+            kind, record_type, file_id, length = unpack(self._header)
+            if length > len(self._buf):
+                self._buf = bytearray(max(length, len(self._buf) * 2))
+                self._view = memoryview(self._buf)
+            payload = self._view[:length]
+            if length and not self._read_exact(payload):
+                raise EOFError("Truncated frame payload")
+
+            if kind == KIND_FILENAME:
+                self.filenames[file_id] = str(payload, "utf-8")
+                continue
+            if kind == KIND_RESULT:
+                self.result = json.loads(str(payload, "utf-8"))
+            yield kind, record_type, file_id, payload
+
+
+def iter_bridge_frames(
+    dataspec: str | None = None,
+    fromdate: str | None = None,
+    option: str | None = None,
+    extra_env: dict[str, str] | None = None,
+) -> Iterator[tuple[int, bytes, str, memoryview]]:
+    """Binary-framed counterpart of jvread_via_bridge.iter_bridge().
+
+    Yields (kind, record_type, filename, payload).  The last frame is
+    KIND_RESULT whose payload is the JSON result object.
+    """
+    env = os.environ.copy()
+    if extra_env:
+        env.update(extra_env)
+    env["JV_READ_MODE"] = "drain"
+    env["JV_OUTPUT_FORMAT"] = "binary"
+
+    proc = subprocess.Popen(
+        _bridge_args(_find_bridge(), dataspec, fromdate, option),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=env,
+        bufsize=256 * 1024,
+    )
+    stderr_chunks: list[bytes] = []
+    stderr_thread = threading.Thread(target=lambda: stderr_chunks.extend(proc.stderr), daemon=True)
+    stderr_thread.start()
+
+    reader = FrameReader(proc.stdout)
+    try:
+        for kind, record_type, file_id, payload in reader:
+            yield kind, record_type, reader.filenames.get(file_id, ""), payload
+        proc.wait()
+        stderr_thread.join()
+        if reader.result is None:
+            stderr_text = b"".join(stderr_chunks).decode("utf-8", "replace").strip()
+            raise RuntimeError(
+                f"JVLinkBridge exited with code {describe_exit_code(proc.returncode)} before its result frame.\n"
+                f"stderr: {stderr_text or '(empty)'}"
+            )
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
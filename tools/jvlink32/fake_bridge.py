@@ -0,0 +1,589 @@
+"""fake_bridge.py – stand-in for JVLinkBridge.exe that runs anywhere.
+
+Emits exactly what JVLinkBridge writes to stdout (same env vars, same
+positional args, same JSON fields) from synthetic records, so the Python
+side of the bridge can be exercised on Linux without JV-Link.  Supports the
+oneshot, drain (JV_READ_MODE=drain, JSON lines or JV_OUTPUT_FORMAT=binary
+frames) and server (JV_BRIDGE_MODE=server) modes.
+
+With FAKE_BRIDGE_DATA=races the records are real RA / SE / HR layouts
+(fake_jvdata.py), so it also stands in behind DataLabRaceCardSource and
+jvstore_ingest.py.  Latency, JVOpen / JVRead error codes and process crashes
+(exit code 0xC0000409, no result line) can be injected for load tests.
+
+Usage
+-----
+JVLINK_BRIDGE_EXE=tools/jvlink32/fake_bridge.py \\
+JV_READ_MODE=drain python tools/jvlink32/jvread_via_bridge.py RACE 20240101000000 1
+
+# Race cards through the DataLab source (any Python stands in for the 32-bit one):
+KEIBA_PYTHON32=python JVLINK_BRIDGE_EXE=tools/jvlink32/fake_bridge.py FAKE_BRIDGE_DATA=races \\
+python scripts/predict.py --source datalab --race-id 2024010606010111
+
+Fake-only env vars:
+  FAKE_BRIDGE_FILES             3        number of .jvd files
+  FAKE_BRIDGE_RECORDS_PER_FILE  5        records per file
+  FAKE_BRIDGE_FILE_TYPES        RA,SE    record type of each file (cycled)
+  FAKE_BRIDGE_RECORD_SIZE       0        bytes per record (0: type default)
+  FAKE_BRIDGE_RECORD_DELAY_SEC  0        sleep before each record
+  FAKE_BRIDGE_PENDING_READS     0        JVRead -3 returns before the first record
+  FAKE_BRIDGE_DOWNLOAD_SEC      (none)   comma-separated seconds after JVOpen at
+                                         which each file finishes downloading
+                                         (e.g. 0.3,0.3,1.2; files past the list are
+                                         already local).  Until then JVRead returns
+                                         -3 on that file and JVStatus counts only
+                                         the files that are done
+  FAKE_BRIDGE_STARTUP_SEC       0        simulated CLR/COM/JVInit start-up cost
+  FAKE_BRIDGE_FILE_TIMESTAMPS   (none)   comma-separated YYYYMMDDhhmmss, one file
+                                         each; JVOpen only returns the files newer
+                                         than fromdate (-1 if none) and reports the
+                                         newest one as lastfiletimestamp.  A range
+                                         fromdate "YYYYMMDDhhmmss-YYYYMMDDhhmmss" also
+                                         drops the files after its end
+  FAKE_BRIDGE_DATA              synthetic  synthetic (filler records, settings above)
+                                         | races (RA/SE/HR files per race day)
+  FAKE_BRIDGE_DAYS              14       races: days from fromdate to generate (a
+                                         range fromdate covers its own span instead);
+                                         only the RACE dataspec has data
+  FAKE_BRIDGE_VENUES            06,09    races: venue codes held every Sat/Sun
+
+Latency and failures (rates are per call; FAKE_BRIDGE_SEED makes them repeatable):
+  FAKE_BRIDGE_OPEN_SEC          0        JVOpen latency
+  FAKE_BRIDGE_OPEN_FAIL_RATE    0        JVOpen returns FAKE_BRIDGE_OPEN_FAIL_CODE (-504)
+  FAKE_BRIDGE_READ_FAIL_RATE    0        JVRead returns FAKE_BRIDGE_READ_FAIL_CODE (-403)
+  FAKE_BRIDGE_CRASH_RATE        0        JVRead kills the process with
+                                         FAKE_BRIDGE_CRASH_CODE (0xC0000409; only
+                                         the low 8 bits, 9, survive on POSIX)
+  FAKE_BRIDGE_CRASH_AFTER_RECORDS (none) crash on the JVRead after this many records
+                                         (counted over the process, all opens)
+  FAKE_BRIDGE_SEED              (none)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+# JV-Data record lengths including the trailing CRLF.
+RECORD_SIZES = {"RA": 1272, "SE": 555, "HR": 719, "O1": 962, "O2": 2042, "O3": 2654}
+
+
+def _env(key: str, fallback: str) -> str:
+    v = os.environ.get(key, "")
+    return v if v else fallback
+
+
+def _env_list(key: str) -> set[str]:
+    return {x.strip().upper() for x in os.environ.get(key, "").split(",") if x.strip()}
+
+
+class Faults:
+    """Injected latency / error codes / crashes (FAKE_BRIDGE_* above), shared by every open of the process."""
+
+    def __init__(self) -> None:
+        seed = _env("FAKE_BRIDGE_SEED", "")
+        self.rng = random.Random(int(seed)) if seed else random.Random()
+        self.open_sec = float(_env("FAKE_BRIDGE_OPEN_SEC", "0"))
+        self.open_fail_rate = float(_env("FAKE_BRIDGE_OPEN_FAIL_RATE", "0"))
+        self.open_fail_code = int(_env("FAKE_BRIDGE_OPEN_FAIL_CODE", "-504"))
+        self.read_fail_rate = float(_env("FAKE_BRIDGE_READ_FAIL_RATE", "0"))
+        self.read_fail_code = int(_env("FAKE_BRIDGE_READ_FAIL_CODE", "-403"))
+        self.crash_rate = float(_env("FAKE_BRIDGE_CRASH_RATE", "0"))
+        crash_after = _env("FAKE_BRIDGE_CRASH_AFTER_RECORDS", "")
+        self.crash_after = int(crash_after) if crash_after else None
+        self.crash_code = int(_env("FAKE_BRIDGE_CRASH_CODE", "0xC0000409"), 0)
+        self.records = 0
+
+    def _hit(self, rate: float) -> bool:
+        return rate > 0 and self.rng.random() < rate
+
+    def on_open(self) -> int:
+        if self.open_sec > 0:
+            time.sleep(self.open_sec)
+        return self.open_fail_code if self._hit(self.open_fail_rate) else 0
+
+    def on_read(self) -> int:
+        if (self.crash_after is not None and self.records >= self.crash_after) or self._hit(self.crash_rate):
+            self.crash()
+        return self.read_fail_code if self._hit(self.read_fail_rate) else 0
+
+    def crash(self) -> None:
+        # 本物と同じく、書きかけのバッファも結果行も出さずに落ちる
+        code = self.crash_code & 0xFFFFFFFF
+        if os.name == "nt":
+            os._exit(code - (1 << 32) if code >= 1 << 31 else code)
+        os._exit(code & 0xFF)
+
+
+_FAULTS: Faults | None = None
+
+
+def faults() -> Faults:
+    global _FAULTS
+    if _FAULTS is None:
+        _FAULTS = Faults()
+    return _FAULTS
+
+
+class FakeJVLink:
+    """Minimal in-memory JV-Link with the JVRead return-code semantics."""
+
+    def __init__(self, files: list[tuple[str, list[str]]], pending_reads: int = 0, record_delay: float = 0.0,
+                 last_timestamp: str | None = None, download_sec: list[float] | None = None,
+                 faults: Faults | None = None):
+        self._files = files
+        self._faults = faults
+        self._last_ts = last_timestamp
+        self._pending = pending_reads
+        self._delay = record_delay
+        self._download_sec = (download_sec or [])[: len(files)]
+        self._opened_at = 0.0
+        self._file_idx = 0
+        self._rec_idx = 0
+
+    def JVOpen(self, dataspec: str, fromdate: str, option: int) -> tuple[int, int, int, str]:
+        if self._faults is not None and (err := self._faults.on_open()):
+            return err, 0, 0, ""
+        if self._last_ts is not None and not self._files:
+            # 該当データなし
+            return -1, 0, 0, ""
+        self._opened_at = time.monotonic()
+        readcount = len(self._files)
+        downloadcount = sum(1 for sec in self._download_sec if sec > 0)
+        return 0, readcount, downloadcount, self._last_ts or fromdate[:8] + "235959"
+
+    def _downloaded(self, file_idx: int) -> bool:
+        if file_idx >= len(self._download_sec):
+            return True
+        return time.monotonic() - self._opened_at >= self._download_sec[file_idx]
+
+    def JVStatus(self) -> int:
+        """Files downloaded so far (the real JVStatus counts only the downloadcount ones)."""
+        return sum(1 for i, sec in enumerate(self._download_sec) if sec > 0 and self._downloaded(i))
+
+    def JVRead(self) -> tuple[int, str, int, str]:
+        if self._faults is not None and (err := self._faults.on_read()):
+            return err, "", 0, ""
+        if self._pending > 0:
+            self._pending -= 1
+            return -3, "", 0, ""
+        if self._file_idx >= len(self._files):
+            return 0, "", 0, ""
+        if not self._downloaded(self._file_idx):
+            return -3, "", 0, ""
+        filename, records = self._files[self._file_idx]
+        if self._rec_idx >= len(records):
+            self._file_idx += 1
+            self._rec_idx = 0
+            return -1, "", 0, filename
+        if self._delay > 0:
+            time.sleep(self._delay)
+        buff = records[self._rec_idx]
+        self._rec_idx += 1
+        if self._faults is not None:
+            self._faults.records += 1
+        size = len(buff.encode("cp932"))
+        return size, buff, size, filename
+
+    def JVSkip(self) -> None:
+        self._file_idx += 1
+        self._rec_idx = 0
+
+    def JVClose(self) -> int:
+        return 0
+
+
+def make_record(record_type: str, fromdate: str, file_no: int, rec_no: int, size: int = 0) -> str:
+    size = size or RECORD_SIZES.get(record_type, 512)
+    # 種別ID(2) データ区分(1) 作成日(8) 開催年月日(8) 場(2) 回(2) 日目(2) R(2)
+    head = f"{record_type}7{fromdate[:8]}{fromdate[:8]}{file_no % 10 + 1:02d}0101{rec_no % 12 + 1:02d}"
+    return (head + " " * max(size - len(head) - 2, 0))[: size - 2] + "\r\n"
+
+
+def _date_range(fromdate: str) -> tuple[str, str]:
+    """JVOpen の fromdate: "YYYYMMDDhhmmss" または範囲 "YYYYMMDDhhmmss-YYYYMMDDhhmmss"。"""
+    since, _, until = fromdate.partition("-")
+    return since, until or "99999999999999"
+
+
+def build_files(dataspec: str, fromdate: str) -> list[tuple[str, list[str]]]:
+    per_file = int(_env("FAKE_BRIDGE_RECORDS_PER_FILE", "5"))
+    types = [t.strip().upper() for t in _env("FAKE_BRIDGE_FILE_TYPES", "RA,SE").split(",") if t.strip()]
+    size = int(_env("FAKE_BRIDGE_RECORD_SIZE", "0"))
+    since, until = _date_range(fromdate)
+    stamps = _file_timestamps()
+    if not stamps:
+        stamps = [since] * int(_env("FAKE_BRIDGE_FILES", "3"))
+    elif since:
+        # 番号はタイムスタンプ全体での位置のまま（実行ごとにレースキーが変わらないように）
+        stamps = [ts if since < ts <= until else "" for ts in stamps]
+
+    files = []
+    for f, ts in enumerate(stamps):
+        if not ts:
+            continue
+        rt = types[f % len(types)]
+        filename = f"{rt}{dataspec[:2]}{ts[:8]}{f:02d}.jvd"
+        files.append((filename, [make_record(rt, ts, f, r, size) for r in range(per_file)]))
+    return files
+
+
+def _file_timestamps() -> list[str]:
+    return sorted(t.strip() for t in os.environ.get("FAKE_BRIDGE_FILE_TIMESTAMPS", "").split(",") if t.strip())
+
+
+def build_race_files(dataspec: str, fromdate: str) -> tuple[list[tuple[str, list[str]]], str]:
+    """FAKE_BRIDGE_DATA=races: (fromdate より新しいファイル, 最新ファイルのタイムスタンプ)."""
+    from fake_jvdata import build_race_files as build
+
+    venues = [v.strip() for v in _env("FAKE_BRIDGE_VENUES", "06,09").split(",") if v.strip()]
+    seed = int(_env("FAKE_BRIDGE_SEED", "0"))
+    since, until = _date_range(fromdate)
+    days = int(_env("FAKE_BRIDGE_DAYS", "14"))
+    if "-" in fromdate:
+        days = (datetime.strptime(until[:8], "%Y%m%d") - datetime.strptime(since[:8], "%Y%m%d")).days + 1
+    built = [f for f in build(dataspec, since, days, venues, seed) if since < f[2] <= until]
+    return [(name, records) for name, records, _ in built], (built[-1][2] if built else "")
+
+
+def open_fake_jvlink(dataspec: str, fromdate: str) -> FakeJVLink:
+    if _env("FAKE_BRIDGE_DATA", "synthetic").strip().lower() == "races":
+        files, last_timestamp = build_race_files(dataspec, fromdate)
+    else:
+        since, until = _date_range(fromdate)
+        stamps = _file_timestamps()
+        newer = [ts for ts in stamps if since < ts <= until]
+        files = build_files(dataspec, fromdate)
+        last_timestamp = (newer[-1] if newer else "") if stamps else None
+    return FakeJVLink(
+        files,
+        pending_reads=int(_env("FAKE_BRIDGE_PENDING_READS", "0")),
+        record_delay=float(_env("FAKE_BRIDGE_RECORD_DELAY_SEC", "0")),
+        last_timestamp=last_timestamp,
+        download_sec=[float(x) for x in os.environ.get("FAKE_BRIDGE_DOWNLOAD_SEC", "").split(",") if x.strip()],
+        faults=faults(),
+    )
+
+
+def emit(obj: dict) -> None:
+    sys.stdout.write(json.dumps(obj, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+
+class ReadScheduler:
+    """Mirrors ReadScheduler in JVLinkBridge/Program.cs (create it right after JVOpen)."""
+
+    def __init__(self, min_sec: float, max_sec: float, jitter: float):
+        self._min_sec = max(min_sec, 0.001)
+        self._max_sec = max(max_sec, self._min_sec)
+        self._jitter = min(max(jitter, 0.0), 1.0)
+        self._delay_sec = self._min_sec
+        self._started = time.monotonic()
+        self._last_status: int | None = None
+        self._first_record_ms: float | None = None
+        self._idle_ms = 0.0
+        self._waits = 0
+        self._status_changes = 0
+
+    def status_changed(self, status: int) -> bool:
+        if self._last_status == status:
+            return False
+        changed = self._last_status is not None
+        self._last_status = status
+        if not changed:
+            return False
+        self._status_changes += 1
+        self._delay_sec = self._min_sec
+        return True
+
+    def progress(self) -> None:
+        self._delay_sec = self._min_sec
+
+    def first_record(self) -> None:
+        if self._first_record_ms is None:
+            self._first_record_ms = (time.monotonic() - self._started) * 1000
+        self.progress()
+
+    def wait(self) -> None:
+        self.sleep(self._delay_sec * (1.0 + self._jitter * (2.0 * random.random() - 1.0)))
+        self._delay_sec = min(self._delay_sec * 2.0, self._max_sec)
+
+    def sleep(self, sec: float) -> None:
+        t0 = time.monotonic()
+        time.sleep(sec)
+        self._idle_ms += (time.monotonic() - t0) * 1000
+        self._waits += 1
+
+    def snapshot(self) -> dict:
+        out = {"idle_ms": round(self._idle_ms, 3), "waits": self._waits, "status_changes": self._status_changes}
+        if self._first_record_ms is not None:
+            out["first_record_ms"] = round(self._first_record_ms, 3)
+        if self._last_status is not None:
+            out["last_status"] = self._last_status
+        return out
+
+
+def new_scheduler() -> ReadScheduler:
+    return ReadScheduler(float(_env("JV_READ_BACKOFF_MIN_SEC", "0.01")), float(_env("JV_READ_INTERVAL_SEC", "0.2")),
+                         float(_env("JV_READ_BACKOFF_JITTER", "0.2")))
+
+
+class RecordReader:
+    """Mirrors JVRecordReader in JVLinkBridge/Program.cs."""
+
+    def __init__(self, jv: FakeJVLink, max_wait_sec: float, scheduler: ReadScheduler,
+                 record_types: set[str], skip_files: set[str]):
+        self._jv = jv
+        self._max_wait_sec = max_wait_sec
+        self._scheduler = scheduler
+        self._record_types = record_types
+        self._skip_files = skip_files
+        self._current_file = ""
+        self._at_file_start = True
+        self._file_skipped = False
+        self.info = {"eof": False, "ret": 0, "records": 0, "bytes": 0, "files": 0, "skipped_files": 0,
+                     "filtered_records": 0, "pending_retries": 0, "last_filename": ""}
+
+    def read(self, max_records: int, emit) -> bool:
+        info = self.info
+        emitted = 0
+        deadline = time.monotonic() + self._max_wait_sec
+
+        while emitted < max_records and not info["eof"] and "error" not in info:
+            ret, buff, size, filename = self._jv.JVRead()
+            info["ret"] = ret
+
+            if ret > 0:
+                deadline = time.monotonic() + self._max_wait_sec
+                self._scheduler.first_record()
+                record_type = buff[:2]
+                if self._at_file_start:
+                    self._at_file_start = False
+                    self._file_skipped = False
+                    self._current_file = filename
+                    info["last_filename"] = filename
+                    reason = (
+                        "skip_files" if filename in self._skip_files
+                        else "record_type" if self._record_types and record_type not in self._record_types
+                        else None
+                    )
+                    if reason:
+                        self.skip()
+                        emit({"type": "skip", "filename": filename, "record_type": record_type, "reason": reason})
+                        continue
+                if self._record_types and record_type not in self._record_types:
+                    info["filtered_records"] += 1
+                    continue
+                info["records"] += 1
+                info["bytes"] += size
+                emitted += 1
+                emit({"type": "record", "seq": info["records"], "filename": filename, "size": size,
+                      "record_type": record_type, "data": buff})
+                continue
+
+            if ret == 0:
+                info["eof"] = True
+                break
+
+            if ret == -1:
+                deadline = time.monotonic() + self._max_wait_sec
+                self._scheduler.progress()
+                if not self._at_file_start and not self._file_skipped:
+                    info["files"] += 1
+                    emit({"type": "file_end", "filename": self._current_file})
+                self._at_file_start = True
+                continue
+
+            if ret == -3:
+                if time.monotonic() >= deadline:
+                    info["error"] = f"JVRead kept returning -3 for {self._max_wait_sec}s"
+                    break
+                info["pending_retries"] += 1
+                status = self._jv.JVStatus()
+                if status < 0:
+                    info["error"] = f"JVStatus returned {status} while JVRead returned -3"
+                    break
+                if not self._scheduler.status_changed(status):
+                    self._scheduler.wait()
+                continue
+
+            info["error"] = f"JVRead returned {ret}; last filename={self._current_file}"
+
+        info["schedule"] = self._scheduler.snapshot()
+        return not info["eof"] and "error" not in info
+
+    def skip(self) -> None:
+        self._jv.JVSkip()
+        self.info["skipped_files"] += 1
+        self._file_skipped = True
+        self._at_file_start = True
+
+
+def _skip_files() -> set[str]:
+    return {x.strip() for x in os.environ.get("JV_SKIP_FILES", "").split(",") if x.strip()}
+
+
+def serve(max_wait_sec: float) -> int:
+    """JV_BRIDGE_MODE=server: one JSON command per stdin line, one response line each."""
+    setup = {"init": 0, "save_path": 0, "save_flag": 0, "pay_flag": 0}
+    emit({"type": "ready", "id": 0, "ok": True, "setup": setup})
+
+    jv: FakeJVLink | None = None
+    reader: RecordReader | None = None
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            req = json.loads(line)
+        except json.JSONDecodeError as exc:
+            emit({"type": "response", "id": 0, "ok": False, "error": f"bad request: {exc}"})
+            continue
+
+        cmd = req.get("cmd", "")
+        resp: dict = {"type": "response", "id": req.get("id", 0), "cmd": cmd, "ok": True}
+        if cmd == "open":
+            dataspec = req.get("dataspec") or _env("JV_DATASPEC", "RACE")
+            fromdate = req.get("fromdate") or _env("JV_FROMDATE", "20240101000000")
+            option = int(req.get("option") or _env("JV_OPTION", "1"))
+            jv = open_fake_jvlink(dataspec, fromdate)
+            ret, readcount, downloadcount, lastts = jv.JVOpen(dataspec, fromdate, option)
+            resp["open"] = {"dataspec": dataspec, "fromdate": fromdate, "option": option, "ret": ret,
+                            "readcount": readcount, "downloadcount": downloadcount, "lastfiletimestamp": lastts}
+            if ret < 0:
+                resp.update(ok=False, error=f"JVOpen returned {ret}")
+                reader = None
+            else:
+                types = req.get("record_types")
+                record_types = ({x.strip().upper() for x in types.split(",") if x.strip()}
+                                if types is not None else _env_list("JV_RECORD_TYPES"))
+                reader = RecordReader(jv, max_wait_sec, new_scheduler(), record_types, _skip_files())
+        elif cmd == "read":
+            if reader is None:
+                resp.update(ok=False, error="read before open")
+            else:
+                events: list[dict] = []
+                reader.read(int(req.get("max") or 1000), events.append)
+                resp["events"] = events
+                resp["drain"] = dict(reader.info)
+                if "error" in reader.info:
+                    resp.update(ok=False, error=reader.info["error"])
+        elif cmd == "status":
+            resp["status"] = jv.JVStatus() if jv is not None else 0
+        elif cmd == "skip":
+            if reader is None:
+                resp.update(ok=False, error="skip before open")
+            else:
+                reader.skip()
+        elif cmd == "close":
+            if jv is not None and reader is not None:
+                resp["close"] = jv.JVClose()
+            jv, reader = None, None
+        elif cmd == "ping":
+            pass
+        elif cmd == "quit":
+            emit(resp)
+            return 0
+        else:
+            resp.update(ok=False, error=f"unknown cmd: {cmd}")
+        emit(resp)
+    return 0
+
+
+def read_first(jv: FakeJVLink, max_wait_sec: float, scheduler: ReadScheduler) -> dict:
+    deadline = time.monotonic() + max_wait_sec
+    attempts = []
+    ret, buff, size, filename = -9999, "", 0, ""
+    status = 0
+    found = False
+    while time.monotonic() < deadline:
+        ret, buff, size, filename = jv.JVRead()
+        attempts.append({"ret": ret, "size": size, "filename": filename, "buff_head": buff[:30]})
+        if ret > 0:
+            scheduler.first_record()
+            found = True
+            break
+        if ret == -3:
+            status = jv.JVStatus()
+            if status < 0:
+                break
+            if not scheduler.status_changed(status):
+                scheduler.wait()
+            continue
+        break
+    out = {"found": found, "ret": ret, "size": size, "filename": filename,
+           "buff_head": buff[:200], "attempts_tail": attempts[-10:], "schedule": scheduler.snapshot()}
+    if status < 0:
+        out["status_error"] = f"JVStatus returned {status} while JVRead returned -3"
+    return out
+
+
+def main() -> int:
+    dataspec = sys.argv[1] if len(sys.argv) > 1 else _env("JV_DATASPEC", "RACE")
+    fromdate = sys.argv[2] if len(sys.argv) > 2 else _env("JV_FROMDATE", "20240101000000")
+    option = int(sys.argv[3]) if len(sys.argv) > 3 else int(_env("JV_OPTION", "1"))
+    max_wait_sec = float(_env("JV_READ_MAX_WAIT_SEC", "60"))
+    sleep_after_open_sec = float(_env("JV_SLEEP_AFTER_OPEN_SEC", "0"))
+    drain_mode = _env("JV_READ_MODE", "first").strip().lower() == "drain"
+
+    # Stands in for CLR startup + COM activation + JVInit/JVSetSavePath/...
+    startup_sec = float(_env("FAKE_BRIDGE_STARTUP_SEC", "0"))
+    if startup_sec > 0:
+        time.sleep(startup_sec)
+
+    if _env("JV_BRIDGE_MODE", "oneshot").strip().lower() == "server":
+        return serve(max_wait_sec)
+
+    frame_writer = None
+    if drain_mode and _env("JV_OUTPUT_FORMAT", "json").strip().lower() == "binary":
+        from bridge_frames import FrameWriter
+
+        frame_writer = FrameWriter(sys.stdout.buffer)
+
+    jv = open_fake_jvlink(dataspec, fromdate)
+    result: dict = {"ok": False, "stage": "open",
+                    "setup": {"init": 0, "save_path": 0, "save_flag": 0, "pay_flag": 0}}
+
+    open_ret, readcount, downloadcount, lastts = jv.JVOpen(dataspec, fromdate, option)
+    scheduler = new_scheduler()
+    result["open"] = {"dataspec": dataspec, "fromdate": fromdate, "option": option, "ret": open_ret,
+                      "readcount": readcount, "downloadcount": downloadcount, "lastfiletimestamp": lastts}
+
+    if open_ret >= 0 and sleep_after_open_sec > 0:
+        scheduler.sleep(sleep_after_open_sec)
+
+    if open_ret < 0:
+        result["error"] = f"JVOpen returned {open_ret}"
+    elif drain_mode:
+        result["stage"] = "read"
+        reader = RecordReader(jv, max_wait_sec, scheduler, _env_list("JV_RECORD_TYPES"), _skip_files())
+        reader.read(sys.maxsize, frame_writer.emit if frame_writer else emit)
+        result["drain"] = reader.info
+        if "error" in result["drain"]:
+            result["error"] = result["drain"]["error"]
+    else:
+        result["stage"] = "read"
+        result["read"] = read_first(jv, max_wait_sec, scheduler)
+        if "status_error" in result["read"]:
+            result["error"] = result["read"].pop("status_error")
+        elif not result["read"]["found"] and result["read"]["ret"] != 0:
+            result["error"] = f"JVRead returned {result['read']['ret']}"
+
+    result["close"] = jv.JVClose()
+    result["ok"] = "error" not in result
+    if result["ok"]:
+        result["stage"] = "close"
+    if drain_mode:
+        result = {"type": "result", **result}
+    if frame_writer:
+        frame_writer.write_result(result)
+    else:
+        emit(result)
+    return 0 if result["ok"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,63 @@
+"""helper_worker.py – keep a 32-bit helper running for keiba_scraping.datalab.worker_pool.
+
+A helper that would otherwise be started once per call (jvrace_records.py)
+calls serve(handle) in --worker mode and then answers requests over
+stdin/stdout, one JSON line each:
+
+    <- {"type": "ready", "pid": 1234}                  once, after start-up
+    -> {"id": 1, "args": ["2024010506010111"]}
+    <- {"type": "response", "id": 1, "payload": {...}}  handle(args)
+    <- {"type": "heartbeat"}                            every KEIBA_WORKER_HEARTBEAT_SEC
+
+Heartbeats come from a separate thread, so they keep flowing while a request
+is being served; the supervisor treats silence as a hung worker.  Output is
+ASCII-only JSON, so the parent does not depend on the console code page.
+The worker exits when stdin is closed.
+
+Usage
+-----
+from helper_worker import serve
+
+if "--worker" in sys.argv:
+    raise SystemExit(serve(lambda args: fetch(args[0])))
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+from collections.abc import Callable
+
+
+def serve(handle: Callable[[list[str]], dict]) -> int:
+    heartbeat_sec = float(os.environ.get("KEIBA_WORKER_HEARTBEAT_SEC", "1.0"))
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def send(obj: dict) -> None:
+        line = json.dumps(obj) + "\n"
+        with lock:
+            sys.stdout.write(line)
+            sys.stdout.flush()
+
+    def beat() -> None:
+        while not stop.wait(heartbeat_sec):
+            send({"type": "heartbeat"})
+
+    send({"type": "ready", "pid": os.getpid()})
+    threading.Thread(target=beat, daemon=True).start()
+    try:
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            req = json.loads(line)
+            try:
+                payload = handle([str(a) for a in req.get("args", [])])
+            except Exception as exc:
+                payload = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+            send({"type": "response", "id": req.get("id"), "payload": payload})
+    finally:
+        stop.set()
+    return 0
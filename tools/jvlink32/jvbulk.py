@@ -0,0 +1,296 @@
+"""jvbulk.py – partitioned, parallel bulk download through JVLinkBridge.
+
+Splits a backfill (several dataspecs x years) into partitions – one dataspec
+x one year or month, passed to JVOpen as a range fromdate
+"YYYYMMDDhhmmss-YYYYMMDDhhmmss" – and drains them on a bounded pool of bridge
+processes, each with its own JV_SAVE_PATH.  Records are buffered up to
+--run-mb per bridge, sorted by (race key, record type) and spilled as a run
+to a spool file, so memory stays bounded however large a partition is; all
+runs of all partitions are then merged in that order into one output file of
+raw JV-Data records (CRLF-terminated, as in the .jvd files).  One JSON line
+per partition is printed as it finishes (records, bytes, seconds, records/s,
+MB/s), then a summary line.
+
+JV-Link may serialize downloads internally, so both the number of bridges
+(--concurrency) and the bridges per dataspec (--per-dataspec) are limits you
+can lower; "parallelism" in the summary shows what was actually gained.
+
+Usage
+-----
+python tools/jvlink32/jvbulk.py RACE --from-year 2020 --to-year 2023 --out D:\\keiba\\race_2020_2023.jvd
+
+# Monthly partitions, at most 3 bridges and 2 per dataspec, setup data:
+python tools/jvlink32/jvbulk.py RACE BLOD --from-year 2023 --split month --concurrency 3 \\
+    --per-dataspec 2 --option 4 --save-root D:\\jvbulk --out D:\\keiba\\2023.jvd
+
+# Offline with the stand-in:
+JVLINK_BRIDGE_EXE=tools/jvlink32/fake_bridge.py FAKE_BRIDGE_DATA=races \\
+python tools/jvlink32/jvbulk.py RACE --from-year 2023 --to-year 2024 --out /tmp/race.jvd
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import os
+import struct
+import sys
+import tempfile
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+from bridge_frames import KIND_RECORD, KIND_RESULT, iter_bridge_frames
+
+# JVOpen の戻り値: 該当データなし
+JVOPEN_NO_DATA = -1
+SPLITS = ("year", "month")
+# 1 ブリッジがソート前に溜める量。超えたら並べて spool に書き出す
+RUN_MB = 256
+_LEN = struct.Struct("<I")
+
+
+@dataclass(frozen=True)
+class Partition:
+    dataspec: str
+    start: date
+    end: date  # この日を含む
+
+    @property
+    def name(self) -> str:
+        return f"{self.dataspec}_{self.start:%Y%m%d}_{self.end:%Y%m%d}"
+
+    @property
+    def fromdate(self) -> str:
+        return f"{self.start:%Y%m%d}000000-{self.end:%Y%m%d}235959"
+
+
+def make_partitions(dataspecs: list[str], from_year: int, to_year: int, split: str = "year") -> list[Partition]:
+    if split not in SPLITS:
+        raise ValueError(f"split must be one of {SPLITS}, got {split!r}")
+    if to_year < from_year:
+        raise ValueError(f"to_year ({to_year}) is before from_year ({from_year})")
+    parts = []
+    for dataspec in dataspecs:
+        for year in range(from_year, to_year + 1):
+            if split == "year":
+                parts.append(Partition(dataspec, date(year, 1, 1), date(year, 12, 31)))
+                continue
+            for month in range(1, 13):
+                start = date(year, month, 1)
+                end = (date(year + month // 12, month % 12 + 1, 1)) - timedelta(days=1)
+                parts.append(Partition(dataspec, start, end))
+    return parts
+
+
+def record_key(record: bytes) -> tuple[bytes, bytes]:
+    """マージ順: レースキー（開催年月日〜R の 16 バイト）、レコード種別。"""
+    return record[11:27], record[:2]
+
+
+def _read_spool(path: Path) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while head := f.read(_LEN.size):
+            (n,) = _LEN.unpack(head)
+            yield f.read(n)
+
+
+def _spill(records: list[bytes], path: Path) -> None:
+    records.sort(key=record_key)
+    with open(path, "wb") as f:
+        for rec in records:
+            f.write(_LEN.pack(len(rec)))
+            f.write(rec)
+    records.clear()
+
+
+def drain_partition(
+    part: Partition,
+    option: str,
+    spool_dir: Path,
+    save_root: Path,
+    record_types: str | None = None,
+    run_bytes: int = RUN_MB * 2**20,
+) -> dict:
+    """1 パーティションを吸い出し、run_bytes ずつキー順に並べて spool_dir/<name>.<n>.spool に書く。"""
+    save_path = save_root / part.name
+    save_path.mkdir(parents=True, exist_ok=True)
+    env = {"JV_SAVE_PATH": str(save_path)}
+    if record_types:
+        env["JV_RECORD_TYPES"] = record_types
+
+    records: list[bytes] = []
+    buffered = count = nbytes = 0
+    runs: list[Path] = []
+    result: dict = {}
+    t0 = time.perf_counter()
+    for kind, _, _, payload in iter_bridge_frames(part.dataspec, part.fromdate, option, env):
+        if kind == KIND_RECORD:
+            records.append(bytes(payload))
+            count += 1
+            buffered += len(payload)
+            if buffered >= run_bytes:
+                runs.append(spool_dir / f"{part.name}.{len(runs)}.spool")
+                _spill(records, runs[-1])
+                nbytes += buffered
+                buffered = 0
+        elif kind == KIND_RESULT:
+            result = json.loads(bytes(payload))
+    sec = time.perf_counter() - t0
+
+    report: dict = {"partition": part.name, "dataspec": part.dataspec, "fromdate": part.fromdate}
+    opened = result.get("open") or {}
+    drain = result.get("drain") or {}
+    if opened.get("ret") == JVOPEN_NO_DATA:
+        return {**report, "ok": True, "no_data": True, "records": 0, "bytes": 0, "sec": round(sec, 3)}
+    if not result.get("ok") or not drain.get("eof"):
+        error = result.get("error") or "drain did not reach EOF"
+        return {**report, "ok": False, "records": count, "sec": round(sec, 3), "error": error}
+
+    if records:
+        runs.append(spool_dir / f"{part.name}.{len(runs)}.spool")
+        _spill(records, runs[-1])
+        nbytes += buffered
+    return {
+        **report,
+        "ok": True,
+        "records": count,
+        "bytes": nbytes,
+        "runs": len(runs),
+        "sec": round(sec, 3),
+        "records_per_s": round(count / sec, 1) if sec > 0 else 0.0,
+        "mb_per_s": round(nbytes / 2**20 / sec, 3) if sec > 0 else 0.0,
+        "spools": [str(p) for p in runs],
+    }
+
+
+def run_bulk(
+    parts: list[Partition],
+    out_path: str | Path,
+    option: str = "1",
+    concurrency: int = 2,
+    per_dataspec: int = 0,
+    save_root: str | Path | None = None,
+    record_types: str | None = None,
+    on_partition: Callable[[dict], None] | None = None,
+    run_mb: int = RUN_MB,
+) -> dict:
+    """parts を最大 concurrency 本（dataspec ごとに per_dataspec 本、0 は無制限）のブリッジで吸い出してマージする。
+
+    ブリッジ 1 本あたりのメモリは run_mb 程度まで（パーティションは複数の run に分けて spool に書き、最後にまとめてマージ）。
+
+    失敗したパーティションは出力に含めず、summary の "failed" に名前を残す（ok=False）。
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be >= 1")
+    if per_dataspec < 0:
+        raise ValueError("per_dataspec must be >= 0")
+    if run_mb < 1:
+        raise ValueError("run_mb must be >= 1")
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    t0 = time.perf_counter()
+    reports: dict[Partition, dict] = {}
+    spools: dict[Partition, list[Path]] = {}
+    with tempfile.TemporaryDirectory(prefix="jvbulk_", dir=out_path.parent) as tmp:
+        spool_dir = Path(tmp)
+        root = Path(save_root) if save_root else spool_dir / "save"
+        pending = list(parts)
+        running: dict[Future, Partition] = {}
+        per_ds: Counter[str] = Counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            while pending or running:
+                # 上限の範囲で、並び順に起動できるものから起動する
+                for part in list(pending):
+                    if len(running) >= concurrency:
+                        break
+                    if per_dataspec and per_ds[part.dataspec] >= per_dataspec:
+                        continue
+                    pending.remove(part)
+                    per_ds[part.dataspec] += 1
+                    fut = pool.submit(drain_partition, part, option, spool_dir, root, record_types, run_mb * 2**20)
+                    running[fut] = part
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    part = running.pop(fut)
+                    per_ds[part.dataspec] -= 1
+                    try:
+                        report = fut.result()
+                    except Exception as exc:
+                        # ブリッジの異常終了だけでなく spool の書き込み失敗（ディスク満杯）や壊れた result も、
+                        # 他のブリッジを止めずにこのパーティションの失敗として残す
+                        report = {"partition": part.name, "dataspec": part.dataspec, "fromdate": part.fromdate,
+                                  "ok": False, "error": f"{type(exc).__name__}: {exc}"}
+                    if "spools" in report:
+                        spools[part] = [Path(p) for p in report.pop("spools")]
+                    reports[part] = report
+                    if on_partition is not None:
+                        on_partition(report)
+        download_sec = time.perf_counter() - t0
+
+        t1 = time.perf_counter()
+        tmp_out = out_path.with_name(out_path.name + ".tmp")
+        records = 0
+        with open(tmp_out, "wb") as f:
+            runs = [_read_spool(path) for p in parts for path in spools.get(p, ())]
+            for rec in heapq.merge(*runs, key=record_key):
+                f.write(rec)
+                records += 1
+        os.replace(tmp_out, out_path)
+        merge_sec = time.perf_counter() - t1
+
+    ordered = [reports[p] for p in parts]
+    nbytes = sum(r.get("bytes", 0) for r in ordered if r["ok"])
+    busy_sec = sum(r.get("sec", 0.0) for r in ordered)
+    wall = time.perf_counter() - t0
+    return {
+        "ok": all(r["ok"] for r in ordered),
+        "out": str(out_path),
+        "partitions": len(parts),
+        "failed": [r["partition"] for r in ordered if not r["ok"]],
+        "records": records,
+        "bytes": nbytes,
+        "download_sec": round(download_sec, 3),
+        "merge_sec": round(merge_sec, 3),
+        "wall_sec": round(wall, 3),
+        "records_per_s": round(records / wall, 1) if wall > 0 else 0.0,
+        "mb_per_s": round(nbytes / 2**20 / wall, 3) if wall > 0 else 0.0,
+        # パーティションの所要時間の合計 / 実時間。JV-Link が直列化していれば 1 に近づく
+        "parallelism": round(busy_sec / download_sec, 2) if download_sec > 0 else 0.0,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dataspecs", nargs="+", help="JVOpen dataspecs, e.g. RACE BLOD.")
+    parser.add_argument("--from-year", type=int, required=True)
+    parser.add_argument("--to-year", type=int, help="Last year (inclusive, default: --from-year).")
+    parser.add_argument("--split", default="year", choices=SPLITS, help="Partition size.")
+    parser.add_argument("--option", default="1", help="JVOpen option (4 = setup data).")
+    parser.add_argument("--concurrency", type=int, default=2, help="Bridge processes at a time.")
+    parser.add_argument("--per-dataspec", type=int, default=0, help="Bridges per dataspec at a time (0 = no limit).")
+    parser.add_argument("--save-root", help="JV_SAVE_PATH root; each partition gets <root>/<partition>.")
+    parser.add_argument("--record-types", help="JV_RECORD_TYPES for every bridge, e.g. RA,SE.")
+    parser.add_argument("--run-mb", type=int, default=RUN_MB, help="Records buffered per bridge before a sorted spill.")
+    parser.add_argument("--out", required=True, help="Merged output (raw JV-Data records in key order).")
+    args = parser.parse_args()
+
+    parts = make_partitions(args.dataspecs, args.from_year, args.to_year or args.from_year, args.split)
+
+    def progress(report: dict) -> None:
+        print(json.dumps({"type": "partition", **report}, ensure_ascii=False), flush=True)
+
+    summary = run_bulk(parts, args.out, args.option, args.concurrency, args.per_dataspec, args.save_root,
+                       args.record_types, progress, args.run_mb)
+    print(json.dumps({"type": "summary", **summary}, ensure_ascii=False))
+    return 0 if summary["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""jvrace_records.py – fetch the RA/SE records of one race through JVLinkBridge.
+
+Called by DataLabRaceCardSource (keiba_scraping.datalab.source) with the
+16-digit JV race key (開催年月日 + 場 + 回 + 日目 + R), e.g. 2024010506010111.
+Drains the RACE dataspec from a few days before the race date and prints a
+single JSON line: {"ok": ..., "race_id": ..., "records": ["RA...", "SE...", ...]}.
+
+With --worker it stays running and answers one race key per request
+(helper_worker.serve), for keiba_scraping.datalab.worker_pool.
+
+Usage
+-----
+python tools/jvlink32/jvrace_records.py 2024010506010111
+python tools/jvlink32/jvrace_records.py --worker
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+from helper_worker import serve
+from jvread_via_bridge import iter_bridge
+
+# JVOpen の fromdate は「この日時以降に更新されたデータ」なので、開催日より少し前から読む
+LOOKBACK_DAYS = int(os.environ.get("JV_RACE_LOOKBACK_DAYS", "7"))
+
+
+def fetch_race(race_id: str) -> tuple[dict, int]:
+    """(出力する JSON, 終了コード)。"""
+    if len(race_id) != 16 or not race_id.isdigit():
+        return {"ok": False, "error": "usage: jvrace_records.py <16-digit race key>"}, 2
+    race_date = datetime.strptime(race_id[:8], "%Y%m%d")
+    fromdate = (race_date - timedelta(days=LOOKBACK_DAYS)).strftime("%Y%m%d000000")
+
+    records: list[str] = []
+    result: dict = {}
+    try:
+        for ev in iter_bridge("RACE", fromdate, "1", extra_env={"JV_RECORD_TYPES": "RA,SE"}):
+            if ev["type"] == "record" and ev["data"][11:27] == race_id:
+                records.append(ev["data"])
+            elif ev["type"] == "result":
+                result = ev
+    except (FileNotFoundError, RuntimeError) as exc:
+        return {"ok": False, "race_id": race_id, "error": str(exc)}, 2
+
+    out = {
+        "ok": bool(result.get("ok")),
+        "race_id": race_id,
+        "records": records,
+        "open": result.get("open"),
+        "drain": result.get("drain"),
+    }
+    if not out["ok"]:
+        out["error"] = result.get("error")
+    return out, 0 if out["ok"] else 1
+
+
+def main() -> int:
+    if sys.argv[1:] == ["--worker"]:
+        return serve(lambda args: fetch_race(args[0] if args else "")[0])
+    out, code = fetch_race(sys.argv[1] if len(sys.argv) > 1 else "")
+    print(json.dumps(out, ensure_ascii=False))
+    return code
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -16,19 +16,27 @@ set JV_FROMDATE=20240101000000
 set JV_OPTION=1
 set JV_SAVE_PATH=C:\\ProgramData\\JRA-VAN\\Data
 set JV_READ_MAX_WAIT_SEC=60
-set JV_READ_INTERVAL_SEC=0.5
+set JV_READ_INTERVAL_SEC=0.2
+set JV_READ_BACKOFF_MIN_SEC=0.01
 
 # Diagnostics / robustness env vars:
 set JV_SLEEP_AFTER_OPEN_SEC=1.0
 set JV_ENABLE_UI_PROPERTIES=1
 set JV_ENABLE_STATUS_POLL=1
 set JV_STATUS_POLL_MAX_WAIT_SEC=10
-set JV_STATUS_POLL_INTERVAL_SEC=0.5
 python tools/jvlink32/jvread_via_bridge.py
 
 # Or pass positional args (dataspec fromdate option):
 python tools/jvlink32/jvread_via_bridge.py RACE 20240101000000 1
 
+# Drain the whole dataspec, one JSON line per record as it is read:
+set JV_READ_MODE=drain
+set JV_RECORD_TYPES=RA,SE
+python tools/jvlink32/jvread_via_bridge.py RACE 20240101000000 1
+
+# Use another executable (e.g. fake_bridge.py on Linux) instead of the bridge:
+set JVLINK_BRIDGE_EXE=tools/jvlink32/fake_bridge.py
+
 Build the bridge first (PowerShell, x86):
   cd tools/jvlink32/JVLinkBridge
   dotnet build -c Release
@@ -40,6 +48,8 @@ import json
 import os
 import subprocess
 import sys
+import threading
+from collections.abc import Iterator
 from pathlib import Path
 
 # ---------------------------------------------------------------------------
@@ -56,7 +66,26 @@ _CANDIDATES = [
 ]
 
 
+# NTSTATUS exit codes of a crashed bridge (JVRead is known to raise the first one).
+_CRASH_CODES = {
+    0xC0000409: "STATUS_STACK_BUFFER_OVERRUN",
+    0xC0000005: "STATUS_ACCESS_VIOLATION",
+    0xC0000374: "STATUS_HEAP_CORRUPTION",
+}
+
+
+def describe_exit_code(code: int | None) -> str:
+    """e.g. "3221226505 (0xC0000409 STATUS_STACK_BUFFER_OVERRUN)"; other codes as they are."""
+    if code is None:
+        return "None"
+    name = _CRASH_CODES.get(code & 0xFFFFFFFF)
+    return f"{code} (0x{code & 0xFFFFFFFF:08X} {name})" if name else str(code)
+
+
 def _find_bridge() -> Path:
+    override = os.environ.get("JVLINK_BRIDGE_EXE")
+    if override:
+        return Path(override).resolve()
     for p in _CANDIDATES:
         if p.exists():
             return p
@@ -68,6 +97,23 @@ def _find_bridge() -> Path:
     )
 
 
+def _bridge_args(
+    bridge_exe: Path,
+    dataspec: str | None,
+    fromdate: str | None,
+    option: str | None,
+) -> list[str]:
+    # A .py stand-in (fake_bridge.py) is run with the current interpreter.
+    args: list[str] = [sys.executable, str(bridge_exe)] if bridge_exe.suffix == ".py" else [str(bridge_exe)]
+    if dataspec:
+        args.append(dataspec)
+    if fromdate:
+        args.append(fromdate)
+    if option:
+        args.append(option)
+    return args
+
+
 def run_bridge(
     dataspec: str | None = None,
     fromdate: str | None = None,
@@ -81,13 +127,7 @@ def run_bridge(
     if extra_env:
         env.update(extra_env)
 
-    args: list[str] = [str(bridge_exe)]
-    if dataspec:
-        args.append(dataspec)
-    if fromdate:
-        args.append(fromdate)
-    if option:
-        args.append(option)
+    args = _bridge_args(bridge_exe, dataspec, fromdate, option)
 
     proc = subprocess.run(
         args,
@@ -101,7 +141,7 @@ def run_bridge(
 
     if proc.returncode not in (0, 1):
         raise RuntimeError(
-            f"JVLinkBridge exited with unexpected code {proc.returncode}.\n"
+            f"JVLinkBridge exited with unexpected code {describe_exit_code(proc.returncode)}.\n"
             f"stderr: {stderr_text or '(empty)'}"
         )
 
@@ -128,12 +168,108 @@ def run_bridge(
     return result
 
 
+def iter_bridge(
+    dataspec: str | None = None,
+    fromdate: str | None = None,
+    option: str | None = None,
+    extra_env: dict[str, str] | None = None,
+) -> Iterator[dict]:
+    """Run JVLinkBridge in drain mode and yield its events while it runs.
+
+    Each yielded dict is one stdout line of the bridge: ``type`` is
+    ``"record"``, ``"file_end"`` (JVRead -1), ``"skip"`` (JVSkip) or, last,
+    ``"result"`` (the usual result object with a ``drain`` summary).
+    Closing the generator early terminates the bridge process.
+    """
+    bridge_exe = _find_bridge()
+    env = os.environ.copy()
+    if extra_env:
+        env.update(extra_env)
+    env["JV_READ_MODE"] = "drain"
+
+    proc = subprocess.Popen(
+        _bridge_args(bridge_exe, dataspec, fromdate, option),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        env=env,
+    )
+
+    # Drain stderr on a thread so JVBRIDGE_DEBUG output cannot fill the pipe.
+    stderr_chunks: list[str] = []
+    stderr_thread = threading.Thread(
+        target=lambda: stderr_chunks.extend(proc.stderr), daemon=True
+    )
+    stderr_thread.start()
+
+    got_result = False
+    try:
+        for line in proc.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise RuntimeError(f"JVLinkBridge emitted a non-JSON line: {line!r}") from exc
+
+            if event.get("type") == "result":
+                got_result = True
+                proc.wait()
+                stderr_thread.join()
+                stderr_text = "".join(stderr_chunks).strip()
+                if stderr_text:
+                    event.setdefault("stderr", stderr_text)
+            yield event
+
+        proc.wait()
+        stderr_thread.join()
+        if not got_result:
+            stderr_text = "".join(stderr_chunks).strip()
+            raise RuntimeError(
+                f"JVLinkBridge exited with code {describe_exit_code(proc.returncode)} before its result line.\n"
+                f"stderr: {stderr_text or '(empty)'}"
+            )
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+
+
+def _main_drain(dataspec: str | None, fromdate: str | None, option: str | None) -> int:
+    result: dict = {}
+    try:
+        for event in iter_bridge(dataspec=dataspec, fromdate=fromdate, option=option):
+            if event.get("type") == "result":
+                result = event
+            print(json.dumps(event, ensure_ascii=False), flush=True)
+    except FileNotFoundError as exc:
+        print(json.dumps({"ok": False, "error": str(exc)}, ensure_ascii=False))
+        return 2
+    except RuntimeError as exc:
+        print(json.dumps({"ok": False, "error": str(exc)}, ensure_ascii=False))
+        return 2
+
+    if not result.get("ok"):
+        print(
+            f"[jvread_via_bridge] Bridge drain failed at stage={result.get('stage')!r}: {result.get('error', '')}",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
 def main() -> int:
     # Positional CLI args override env vars
     dataspec = sys.argv[1] if len(sys.argv) > 1 else None
     fromdate = sys.argv[2] if len(sys.argv) > 2 else None
     option   = sys.argv[3] if len(sys.argv) > 3 else None
 
+    if os.environ.get("JV_READ_MODE", "").strip().lower() == "drain":
+        return _main_drain(dataspec, fromdate, option)
+
     try:
         result = run_bridge(dataspec=dataspec, fromdate=fromdate, option=option)
     except FileNotFoundError as exc:
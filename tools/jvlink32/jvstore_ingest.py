@@ -0,0 +1,203 @@
+"""jvstore_ingest.py – drain RA/SE records through JVLinkBridge into the local RaceStore.
+
+Pulls the dataspec with binary frames (bridge_frames.iter_bridge_frames) and
+appends the records to keiba_scraping.store.RaceStore in batches, flushed at
+file boundaries.  Afterwards `scripts/predict.py --source store` serves race
+cards from disk without touching JV-Link.
+
+Every batch also moves a checkpoint in <store>/drain_checkpoint.json (the
+committed files plus the record offset into the file being read).  If the
+bridge crashes (0xC0000409 / RPC_E_SERVERFAULT), it is restarted up to
+JV_RESUME_MAX_RESTARTS times; the committed files are JVSkip'ed through
+JV_SKIP_FILES instead of being read again.  A run that gives up leaves the
+checkpoint behind, so running the same command again resumes too.  The
+"resume" object in the output reports how many records that saved.
+
+Run it with the normal (64-bit) venv Python where `pip install -e .` was done;
+only JVLinkBridge.exe itself needs to be x86.
+
+Usage
+-----
+python tools/jvlink32/jvstore_ingest.py RACE 20240101000000 1
+
+# Store directory (default: <repo>/data/store) / records per commit:
+set KEIBA_STORE_DIR=D:\\keiba\\store
+set JV_STORE_BATCH_RECORDS=50000
+
+# Checkpoint at least every N records, even inside a file / restarts after a crash:
+set JV_CHECKPOINT_RECORDS=200000
+set JV_RESUME_MAX_RESTARTS=3
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from bridge_frames import KIND_FILE_END, KIND_RECORD, KIND_RESULT, iter_bridge_frames
+
+from keiba_scraping.store.race_store import RaceStore
+from keiba_scraping.store.sync_state import DrainCheckpoint
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BATCH_RECORDS = int(os.environ.get("JV_STORE_BATCH_RECORDS", "50000"))
+# 大きなファイルの途中でも、この件数溜まったら書き込んで再開位置を進める
+CHECKPOINT_RECORDS = int(os.environ.get("JV_CHECKPOINT_RECORDS", "200000"))
+MAX_RESTARTS = int(os.environ.get("JV_RESUME_MAX_RESTARTS", "3"))
+RESTART_BACKOFF_SEC = float(os.environ.get("JV_RESUME_BACKOFF_SEC", "1.0"))
+
+
+class _Drain:
+    """再起動をまたいだ 1 回の drain の進み具合（DrainCheckpoint に保存するのと同じ内容）。"""
+
+    def __init__(self, store: RaceStore, checkpoint: DrainCheckpoint | None, key: str, start: dict | None):
+        start = start or {}
+        self.store = store
+        self.checkpoint = checkpoint
+        self.key = key
+        self.files: list[str] = list(start.get("files", []))
+        self.file = str(start.get("file", ""))
+        self.offset = int(start.get("offset", 0))
+        self.records = int(start.get("records", 0))
+        self.bytes = int(start.get("bytes", 0))
+        self.races = 0
+        self.pending: list[bytes] = []
+        self.ended: list[str] = []
+        self.current = ""
+        self.current_records = 0
+        # 再開しなければ読み直していた分
+        self.saved_records = 0
+        self.saved_bytes = 0
+        self.skipped_files = 0
+        self.reread_records = 0
+
+    def run(self, dataspec: str, fromdate: str, option: str) -> dict:
+        # 書き込み済みのファイルは JVSkip、書きかけのファイルは先頭 offset 件を読み捨てる
+        env = {"JV_RECORD_TYPES": "RA,SE"}
+        if self.files:
+            env["JV_SKIP_FILES"] = ",".join(self.files)
+        resume_file, resume_offset = self.file, self.offset
+        self.saved_records += self.records
+        self.saved_bytes += self.bytes
+        self.skipped_files += len(self.files)
+        self.current, self.current_records = "", 0
+
+        result: dict = {}
+        try:
+            for kind, _, filename, payload in iter_bridge_frames(dataspec, fromdate, option, env):
+                if kind == KIND_RECORD:
+                    if filename != self.current:
+                        self.current, self.current_records = filename, 0
+                    self.current_records += 1
+                    if filename == resume_file and self.current_records <= resume_offset:
+                        self.reread_records += 1
+                        continue
+                    self.pending.append(bytes(payload))
+                    if len(self.pending) >= CHECKPOINT_RECORDS:
+                        self.commit()
+                elif kind == KIND_FILE_END:
+                    self.ended.append(filename)
+                    self.current, self.current_records = "", 0
+                    if len(self.pending) >= BATCH_RECORDS:
+                        self.commit()
+                elif kind == KIND_RESULT:
+                    result = json.loads(bytes(payload))
+        finally:
+            # ブリッジが落ちても、受け取れたところまでは書き込んで再開位置を進める
+            self.commit()
+        return result
+
+    def commit(self) -> None:
+        if not self.pending and not self.ended:
+            return
+        if self.pending:
+            self.races += self.store.ingest_records(self.pending)
+            self.records += len(self.pending)
+            self.bytes += sum(len(r) for r in self.pending)
+            self.pending.clear()
+        self.files.extend(self.ended)
+        self.ended.clear()
+        self.file, self.offset = self.current, self.current_records
+        if self.checkpoint is not None:
+            self.checkpoint.save(self.key, self.files, self.file, self.offset, self.records, self.bytes)
+
+
+def ingest_drain(
+    store: RaceStore,
+    dataspec: str,
+    fromdate: str,
+    option: str,
+    checkpoint: DrainCheckpoint | None = None,
+    max_restarts: int = 0,
+) -> tuple[int, dict]:
+    """dataspec を吸い出して store に追記する。戻り値は (書き込んだレース数, ブリッジの result)。
+
+    ファイル境界で BATCH_RECORDS 件以上、ファイルの途中でも CHECKPOINT_RECORDS 件溜まれば ingest する
+    （返った時点で fsync 済み）。checkpoint を渡すと ingest のたびに再開位置を保存し、保存済みの位置が
+    あればそこから読む。ブリッジが落ちたら（RuntimeError）max_restarts 回まで再開位置から起動し直す。
+    result["resume"] に再起動回数と、再開で読み直さずに済んだ件数（saved_*）を入れる。
+    """
+    key = DrainCheckpoint.key(dataspec, fromdate, option)
+    start = checkpoint.get(key) if checkpoint is not None else None
+    drain = _Drain(store, checkpoint, key, start)
+    restarts = 0
+    while True:
+        try:
+            result = drain.run(dataspec, fromdate, option)
+            break
+        except RuntimeError as exc:
+            if restarts >= max_restarts:
+                if restarts:
+                    raise RuntimeError(f"{exc}\ngave up after {restarts} restarts") from exc
+                raise
+            restarts += 1
+            time.sleep(RESTART_BACKOFF_SEC * 2 ** (restarts - 1))
+
+    if checkpoint is not None and (result.get("drain") or {}).get("eof"):
+        checkpoint.clear(key)
+    result["resume"] = {
+        "resumed": start is not None,
+        "restarts": restarts,
+        "records": drain.records,
+        "bytes": drain.bytes,
+        "saved_records": drain.saved_records,
+        "saved_bytes": drain.saved_bytes,
+        "skipped_files": drain.skipped_files,
+        "reread_records": drain.reread_records,
+    }
+    return drain.races, result
+
+
+def main() -> int:
+    dataspec = sys.argv[1] if len(sys.argv) > 1 else "RACE"
+    fromdate = sys.argv[2] if len(sys.argv) > 2 else "20240101000000"
+    option = sys.argv[3] if len(sys.argv) > 3 else "1"
+    store = RaceStore(os.environ.get("KEIBA_STORE_DIR") or REPO_ROOT / "data" / "store")
+    checkpoint = DrainCheckpoint(store.root / "drain_checkpoint.json")
+
+    try:
+        races, result = ingest_drain(store, dataspec, fromdate, option, checkpoint, MAX_RESTARTS)
+    except (FileNotFoundError, RuntimeError) as exc:
+        print(json.dumps({"ok": False, "error": str(exc)}, ensure_ascii=False))
+        return 2
+
+    out = {
+        "ok": bool(result.get("ok")),
+        "races": races,
+        "store": str(store.root),
+        "store_version": store.version,
+        "indexed": len(store),
+        "drain": result.get("drain"),
+        "resume": result.get("resume"),
+    }
+    if not out["ok"]:
+        out["error"] = result.get("error")
+    print(json.dumps(out, ensure_ascii=False))
+    return 0 if out["ok"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())